@@ -1,9 +1,123 @@
 import random
-
-piece_score = {"K": 0, "Q": 10, "R": 5, "B": 3, "N": 3, "P": 1}
+import threading
+import time
+from game.evaluation import PIECE_VALUES, CENTIPAWNS, evaluate_mop_up, evaluate_pawn_structure
+from artificial_intelligence.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND, NO_MOVE
+from artificial_intelligence.pawn_hash_table import PawnHashTable
+from artificial_intelligence.move_ordering import MoveOrderer, MAX_PLY
+from artificial_intelligence.opening_book import OpeningBook, DEFAULT_BOOK_PATH
+from artificial_intelligence.endgame_bitbase import EndgameBitbases, DEFAULT_BITBASE_PATH, WIN, DRAW
+
+piece_score = PIECE_VALUES
 CHECKMATE_SCORE = 1000
 STALEMATE_SCORE = 0
 DEPTH = 2
+MAX_DEPTH = 32
+TIME_BUDGET = None  # seconds per move, None searches to DEPTH
+NODE_BUDGET = None  # nodes per move, None searches to DEPTH
+TRANSPOSITION_TABLE_SIZE_MB = 16
+WORKERS = 1  # processes searching the root moves, 1 searches in the calling process
+DELTA_MARGIN = 2  # captures that can not lift the score above alpha by this much are skipped
+USE_OPENING_BOOK = True
+NULL_MOVE_PRUNING = True
+NULL_MOVE_REDUCTION = 2  # the null move is searched to depth - 1 - NULL_MOVE_REDUCTION
+LATE_MOVE_REDUCTIONS = True
+LATE_MOVE_INDEX = 3  # quiet moves ordered after this many moves are searched shallower first
+LATE_MOVE_REDUCTION = 1  # plies taken off a late move, it is searched again in full when it beats alpha
+NULL_WINDOW = 1 / CENTIPAWNS  # width of the windows that only test a bound
+PRINCIPAL_VARIATION_SEARCH = True
+ASPIRATION_WINDOWS = True
+ASPIRATION_WINDOW = 0.5  # pawns on either side of the previous iteration's score
+ASPIRATION_WIDENING = 4  # a failed side of the window grows this many times before the search is repeated
+USE_ENDGAME_BITBASES = True
+BITBASE_WIN_SCORE = 100  # pawns added to a bitbase win, more than any material but less than a checkmate
+USE_PAWN_STRUCTURE = True
+PAWN_HASH_SIZE_MB = 1
+
+transposition_table = TranspositionTable(TRANSPOSITION_TABLE_SIZE_MB)
+pawn_hash_table = PawnHashTable(PAWN_HASH_SIZE_MB)
+move_orderer = MoveOrderer(piece_score)
+opening_book = OpeningBook(DEFAULT_BOOK_PATH)
+endgame_bitbases = EndgameBitbases(DEFAULT_BITBASE_PATH)
+search_statistics = None  # optional collector, see artificial_intelligence.search_statistics
+search_depth = DEPTH
+nodes_searched = 0
+search_score = 0
+completed_depth = 0
+search_deadline = None
+node_limit = None
+principal_variation_moves = {}
+principal_variation = []  # moves expected from the root, the first one is the best move
+bitbase_root = False  # True while the searched position itself is in the endgame bitbases
+stop_event = threading.Event()  # set from another thread to stop the running search
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget of the move is spent or a stop was requested.
+    """
+
+
+def set_transposition_table_size(size_mb):
+    """Replaces the transposition table with an empty one of the given size
+
+    Args:
+        size_mb (float): memory cap of the table in MB.
+    """
+    global transposition_table
+    transposition_table = TranspositionTable(size_mb)
+
+
+def set_pawn_hash_table_size(size_mb):
+    """Replaces the pawn hash table with an empty one of the given size
+
+    Args:
+        size_mb (float): memory cap of the table in MB.
+    """
+    global pawn_hash_table
+    pawn_hash_table = PawnHashTable(size_mb)
+
+
+def set_move_orderer(orderer):
+    """Plugs a different move ordering stage into the alpha beta search
+
+    Args:
+        orderer (MoveOrderer): object with order_moves, record_cutoff and new_search methods.
+    """
+    global move_orderer
+    move_orderer = orderer
+
+
+def set_opening_book(path):
+    """Replaces the opening book consulted by find_best_move
+
+    Args:
+        path (str): book file built by tools.build_book, None for no book.
+    """
+    global opening_book
+    opening_book.close()
+    opening_book = OpeningBook(path)
+
+
+def set_endgame_bitbases(path):
+    """Replaces the endgame bitbases probed by the alpha beta search
+
+    Args:
+        path (str): bitbase file built by tools.build_bitbases, None for no bitbases.
+    """
+    global endgame_bitbases
+    endgame_bitbases.close()
+    endgame_bitbases = EndgameBitbases(path)
+
+
+def set_search_statistics(collector):
+    """Plugs a statistics collector into the iterative deepening search
+
+    Args:
+        collector (SearchStatistics): object with start_search, end_iteration and end_search methods,
+            None to stop collecting.
+    """
+    global search_statistics
+    search_statistics = collector
 
 
 def find_random_move(valid_moves):
@@ -89,19 +203,45 @@ def score_material(board):
 '''
 
 
-def find_best_move(game_context, valid_moves):
+def find_best_move(game_context, valid_moves, time_budget=TIME_BUDGET, node_budget=NODE_BUDGET, workers=WORKERS,
+                   progress_callback=None):
     """Different implementations for finding the best move for the AI.
 
+    The opening book is consulted first, the search only runs for positions it does not know.
+
     Args:
         game_context (GameContext): context of the game
         valid_moves (list): list of possible moves
+        time_budget (float, optional): seconds the search may take. Defaults to TIME_BUDGET.
+        node_budget (int, optional): nodes the search may visit. Defaults to NODE_BUDGET.
+        workers (int, optional): processes splitting the root moves. Defaults to WORKERS.
+        progress_callback (function, optional): see find_move_iterative_deepening. Defaults to None.
 
     Returns:
         Move: object containing the next move
     """
-    global next_move
+    global next_move, nodes_searched, search_score, completed_depth, principal_variation
     next_move = None
+    if USE_OPENING_BOOK:
+        next_move = opening_book.choose_move(game_context, valid_moves)
+        if next_move is not None:
+            # A book move is played without searching, completed_depth 0 tells it apart.
+            nodes_searched = 0
+            search_score = 0
+            completed_depth = 0
+            principal_variation = [next_move]
+            return next_move
+    transposition_table.new_search()
+    move_orderer.new_search()
+    # Shuffled first so that equally scored moves are still picked at random by the stable ordering sort.
     random.shuffle(valid_moves)
+    max_depth = DEPTH if time_budget is None and node_budget is None else MAX_DEPTH
+    if workers > 1 and len(valid_moves) > 1:
+        # Imported here, the parallel search module imports this one.
+        from artificial_intelligence.parallel_search import find_move_parallel
+        next_move = find_move_parallel(game_context, valid_moves, workers, max_depth, time_budget, node_budget)
+        return next_move
+
     # uncomment below for min max
     # find_move_min_max(game_context, valid_moves, DEPTH)  
     
@@ -109,10 +249,154 @@ def find_best_move(game_context, valid_moves):
     # find_move_nega_max(game_context, valid_moves, DEPTH, 1 if game_context.white_to_move else -1) 
 
     # uncomment below for nega max alpha beta pruning
-    find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, DEPTH, -CHECKMATE_SCORE, CHECKMATE_SCORE, 1 if game_context.white_to_move else -1)
+    # find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, DEPTH, -CHECKMATE_SCORE, CHECKMATE_SCORE, 1 if game_context.white_to_move else -1)
+
+    # iterative deepening over nega max alpha beta pruning
+    find_move_iterative_deepening(game_context, valid_moves, max_depth, time_budget, node_budget, progress_callback)
     return next_move
 
 
+def find_move_iterative_deepening(game_context, valid_moves, max_depth, time_budget=None, node_budget=None,
+                                  progress_callback=None):
+    """Searches depth 1, 2, 3... with alpha beta pruning until max depth or the budget is reached.
+
+    Depth 1 always completes unless stop_event is set, so there is a move even for a tiny budget. An
+    interrupted iteration is discarded and the best move of the last completed one is kept. The principal
+    variation of every iteration is searched first in the next one. The score, depth and principal variation
+    of the last completed iteration are left in search_score, completed_depth and principal_variation.
+
+    From depth 2 on the root is searched with an aspiration window around the previous iteration's score.
+    When the score falls outside, the failed side of the window is widened and the iteration is repeated.
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        max_depth (int): deepest iteration to search.
+        time_budget (float, optional): seconds the search may take. Defaults to None.
+        node_budget (int, optional): nodes the search may visit. Defaults to None.
+        progress_callback (function, optional): called after every completed iteration with the depth, best
+            move, score, nodes searched so far and principal variation. Defaults to None.
+
+    Returns:
+        Move: best move of the last completed iteration.
+    """
+    global next_move, search_depth, nodes_searched, search_deadline, node_limit, principal_variation_moves, \
+        search_score, completed_depth, principal_variation, bitbase_root
+    start_time = time.perf_counter()
+    stack_length = len(game_context.search_undo_stack)
+    # Search moves do not reset the game over flags, the root's own ones are put back at the end.
+    checkmate, stalemate = game_context.checkmate, game_context.stalemate
+    statistics = search_statistics
+    if statistics is not None:
+        statistics.start_search(game_context)
+    try:
+        turn_multiplier = 1 if game_context.white_to_move else -1
+        nodes_searched = 0
+        principal_variation_moves = {}
+        principal_variation = []
+        best_move = None
+        completed_depth = 0
+        bitbase_root = USE_ENDGAME_BITBASES and endgame_bitbases.probe(game_context) is not None
+
+        for depth in range(1, max_depth + 1):
+            search_depth = depth
+            next_move = None
+            if depth > 1:
+                search_deadline = None if time_budget is None else start_time + time_budget
+                node_limit = node_budget
+            window = ASPIRATION_WINDOW
+            alpha, beta = -CHECKMATE_SCORE, CHECKMATE_SCORE
+            if ASPIRATION_WINDOWS and depth > 1:
+                alpha, beta = max(search_score - window, -CHECKMATE_SCORE), min(search_score + window, CHECKMATE_SCORE)
+            try:
+                while True:
+                    score = find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, depth, alpha, beta,
+                                                                  turn_multiplier)
+                    if score <= alpha and alpha > -CHECKMATE_SCORE:
+                        window *= ASPIRATION_WIDENING
+                        alpha = max(alpha - window, -CHECKMATE_SCORE)
+                    elif score >= beta and beta < CHECKMATE_SCORE:
+                        window *= ASPIRATION_WIDENING
+                        beta = min(beta + window, CHECKMATE_SCORE)
+                    else:
+                        break
+            except SearchTimeout:
+                while len(game_context.search_undo_stack) > stack_length:
+                    if game_context.search_undo_stack[-1][0] is None:
+                        game_context.undo_null_move()
+                    else:
+                        game_context.undo_search_move()
+                break
+            finally:
+                search_deadline = None
+                node_limit = None
+
+            best_move = next_move
+            search_score = score
+            completed_depth = depth
+            variation = extract_principal_variation(game_context, depth)
+            principal_variation_moves = {key: move.move_id for key, move in variation}
+            principal_variation = [move for _, move in variation]
+            if statistics is not None:
+                statistics.end_iteration(depth, nodes_searched)
+            if progress_callback is not None:
+                progress_callback(depth, best_move, score, nodes_searched, principal_variation)
+            if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                break
+            if node_budget is not None and nodes_searched >= node_budget:
+                break
+    finally:
+        # An exception, e.g. a failed consistency check, must not leave the timing wrappers installed.
+        if statistics is not None:
+            statistics.unwrap()
+
+    game_context.checkmate, game_context.stalemate = checkmate, stalemate
+    if statistics is not None:
+        statistics.end_search(game_context, best_move, completed_depth, nodes_searched)
+    search_depth = DEPTH
+    next_move = best_move
+    return best_move
+
+
+def extract_principal_variation(game_context, length):
+    """Follows the best moves stored in the transposition table from the current position
+
+    Args:
+        game_context (GameContext): context of the game
+        length (int): maximum number of moves to follow.
+
+    Returns:
+        list: (Zobrist key of the position, move played there) for every move of the variation.
+    """
+    variation = []
+    visited_keys = set()
+    for _ in range(length):
+        move_id = transposition_table.best_move_id(game_context.zobrist_key)
+        move = next((move for move in game_context.get_valid_moves() if move.move_id == move_id), None)
+        if move is None or game_context.zobrist_key in visited_keys:
+            break
+        visited_keys.add(game_context.zobrist_key)
+        variation.append((game_context.zobrist_key, move))
+        game_context.make_search_move(move)
+    for _ in range(len(variation)):
+        game_context.undo_search_move()
+    return variation
+
+
+
+def count_node():
+    """Counts a visited node and stops the search when its budget is spent or a stop was requested
+
+    Raises:
+        SearchTimeout: when the search has to stop.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if stop_event.is_set() or (node_limit is not None and nodes_searched > node_limit) or \
+            (search_deadline is not None and time.perf_counter() > search_deadline):
+        raise SearchTimeout()
+
+
 def find_move_min_max(game_context, valid_moves, depth, white_moving):
     """Min max (recurse) to find the best available move
 
@@ -144,9 +428,10 @@ def find_move_min_max(game_context, valid_moves, depth, white_moving):
     else:
         min_score = CHECKMATE_SCORE
         for move in valid_moves:
+            game_context.make_move(move)
             next_moves = game_context.get_valid_moves()
             score = find_move_min_max(game_context, next_moves, depth - 1, True)
-            if score > min_score:
+            if score < min_score:
                 min_score = score
                 if depth == DEPTH:
                     next_move = move
@@ -175,7 +460,7 @@ def find_move_nega_max(game_context, valid_moves, depth, turn_multiplier):
     for move in valid_moves:
         game_context.make_move(move)
         next_moves = game_context.get_valid_moves()
-        score = -find_move_min_max(game_context, next_moves, depth - 1, -turn_multiplier)
+        score = -find_move_nega_max(game_context, next_moves, depth - 1, -turn_multiplier)
         if score > max_score:
             max_score = score
             if depth == DEPTH:
@@ -185,9 +470,22 @@ def find_move_nega_max(game_context, valid_moves, depth, turn_multiplier):
     return max_score
 
 
-def find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, depth, alpha, beta, turn_multiplier):
+def find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, depth, alpha, beta, turn_multiplier,
+                                          allow_null_move=True):
     """Find the best move using nega max alpha beta pruning algorithm
 
+    Below the root two selective techniques save time. Null move pruning lets the side to move pass and
+    searches the opponent's reply shallower; when even that fails high the node is cut. It is skipped in
+    check and without pieces other than pawns, where passing may really be the best move (zugzwang). Late
+    move reductions search quiet moves ordered late a ply shallower with a null window and search them
+    again in full only when they beat alpha.
+
+    With principal variation search only the first move, expected to be the best, gets the full window. The
+    others are searched with a null window that only proves them worse than alpha, and are searched again
+    with the full window when they turn out better.
+
+    Positions below the root found in the endgame bitbases are scored at once from the stored result.
+
     Args:
         game_context (GameContext): context of the game
         valid_moves (list): list of possible moves
@@ -195,26 +493,158 @@ def find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, depth, alph
         alpha (int): alpha border value
         beta (int): beta border value
         turn_multiplier (int): multiplier for the score losee function.
+        allow_null_move (bool, optional): False right after a null move. Defaults to True.
 
     Returns:
         int: score for a given move
     """
     global next_move
+    count_node()
+    if USE_ENDGAME_BITBASES and valid_moves and depth != search_depth:
+        result = endgame_bitbases.probe(game_context)
+        # When the root itself is a bitbase endgame won positions are searched on, or the mate would never be
+        # found, and the bitbase only replaces the static score at the horizon.
+        if result is not None and (result == DRAW or depth == 0 or not bitbase_root):
+            return score_bitbase_result(game_context, result, turn_multiplier)
     if depth == 0:
-        return turn_multiplier * score_board(game_context)
-    
+        return find_move_quiescence(game_context, alpha, beta, turn_multiplier, valid_moves)
+
+    alpha_original = alpha
+    hash_move_id = NO_MOVE
+    entry = transposition_table.probe(game_context.zobrist_key)
+    if entry is not None:
+        entry_depth, bound, entry_score, hash_move_id = entry
+        # The root has to pick next_move, so it never returns a stored score.
+        if entry_depth >= depth and depth != search_depth:
+            if bound == EXACT:
+                return entry_score
+            elif bound == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_score
+
+    in_check = game_context.in_check()
+    if not valid_moves:
+        return -CHECKMATE_SCORE if in_check else STALEMATE_SCORE
+    if NULL_MOVE_PRUNING and allow_null_move and depth != search_depth and depth > NULL_MOVE_REDUCTION \
+            and not in_check and beta < CHECKMATE_SCORE and game_context.has_non_pawn_material() \
+            and turn_multiplier * score_static(game_context) >= beta:
+        game_context.make_null_move()
+        null_moves = game_context.get_valid_moves()
+        score = -find_move_nega_max_alpha_beta_pruning(game_context, null_moves, depth - 1 - NULL_MOVE_REDUCTION,
+                                                       -beta, -beta + NULL_WINDOW, -turn_multiplier, False)
+        game_context.undo_null_move()
+        if score >= beta:
+            return beta
+
+    # The previous iteration's principal variation goes before the stored best move.
+    hash_move_id = principal_variation_moves.get(game_context.zobrist_key, hash_move_id)
+    ply = search_depth - depth
+    move_orderer.order_moves(valid_moves, ply, hash_move_id)
+    reduced_depth = depth - 1 - LATE_MOVE_REDUCTION
+    reduce_late_moves = LATE_MOVE_REDUCTIONS and reduced_depth > 0 and depth != search_depth and not in_check
+
     max_score = -CHECKMATE_SCORE
+    best_move_id = NO_MOVE
 
-    for move in valid_moves:
-        game_context.make_move(move)
+    for move_number, move in enumerate(valid_moves):
+        game_context.make_search_move(move)
         next_moves = game_context.get_valid_moves()
-        score = -find_move_nega_max_alpha_beta_pruning(game_context, next_moves, depth - 1, -beta, -alpha, -turn_multiplier)
-        if score > max_score:
+        if move_number == 0:
+            score = -find_move_nega_max_alpha_beta_pruning(game_context, next_moves, depth - 1, -beta, -alpha,
+                                                           -turn_multiplier)
+        else:
+            reduced = reduce_late_moves and move_number >= LATE_MOVE_INDEX and move.piece_captured == "__" \
+                and not move.is_pawn_promotion and not game_context.in_check()
+            if reduced:
+                score = -find_move_nega_max_alpha_beta_pruning(game_context, next_moves, reduced_depth,
+                                                               -alpha - NULL_WINDOW, -alpha, -turn_multiplier)
+            if not reduced or score > alpha:
+                if PRINCIPAL_VARIATION_SEARCH:
+                    score = -find_move_nega_max_alpha_beta_pruning(game_context, next_moves, depth - 1,
+                                                                   -alpha - NULL_WINDOW, -alpha, -turn_multiplier)
+                if not PRINCIPAL_VARIATION_SEARCH or alpha < score < beta:
+                    score = -find_move_nega_max_alpha_beta_pruning(game_context, next_moves, depth - 1, -beta,
+                                                                   -alpha, -turn_multiplier)
+        # When every move loses to a mate none beats the initial score, the first one, the previous iteration's
+        # best move at the root, is kept so the root still has a move to play.
+        if score > max_score or best_move_id == NO_MOVE:
             max_score = score
-            if depth == DEPTH:
+            best_move_id = move.move_id
+            if depth == search_depth:
                 next_move = move
-        game_context.undo_move()
+        game_context.undo_search_move()
         
+        if max_score > alpha:
+            alpha = max_score
+        if alpha >= beta:
+            move_orderer.record_cutoff(move, ply, depth, move_number)
+            break
+
+    if max_score <= alpha_original:
+        bound = UPPER_BOUND
+    elif max_score >= beta:
+        bound = LOWER_BOUND
+    else:
+        bound = EXACT
+    transposition_table.store(game_context.zobrist_key, depth, bound, max_score, best_move_id)
+    return max_score
+
+
+def find_move_quiescence(game_context, alpha, beta, turn_multiplier, valid_moves=None):
+    """Extends the search with captures and promotions only, until the position is quiet.
+
+    The side to move may stand pat with the static score unless it is in check, where every evasion
+    is searched. Captures that can not bring the score close to alpha are skipped (delta pruning).
+
+    Checkmate and stalemate are told from the moves, never from the flags of the game context: a move list
+    passed in by the alpha beta search may be searched again after the flags were set in other positions.
+
+    Args:
+        game_context (GameContext): context of the game
+        alpha (int): alpha border value
+        beta (int): beta border value
+        turn_multiplier (int): multiplier for the score losee function.
+        valid_moves (list, optional): all legal moves when already generated. Defaults to None.
+
+    Returns:
+        int: score for a given position
+    """
+    if valid_moves is None:
+        # Otherwise the node was already counted by the alpha beta search.
+        count_node()
+
+    in_check = game_context.in_check()
+    if valid_moves is not None and not valid_moves:
+        return -CHECKMATE_SCORE if in_check else STALEMATE_SCORE
+    if in_check:
+        moves = valid_moves if valid_moves is not None else game_context.get_valid_moves()
+        if not moves:
+            return -CHECKMATE_SCORE
+        stand_pat = max_score = -CHECKMATE_SCORE
+    else:
+        if valid_moves is None:
+            moves = game_context.get_capture_moves()
+        else:
+            moves = [move for move in valid_moves if move.piece_captured != "__" or move.is_pawn_promotion]
+        stand_pat = max_score = turn_multiplier * score_static(game_context)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+    move_orderer.order_moves(moves, MAX_PLY)
+    for move in moves:
+        if not in_check and not move.is_pawn_promotion and \
+                stand_pat + piece_score[move.piece_captured[1]] + DELTA_MARGIN <= alpha:
+            continue
+        game_context.make_search_move(move)
+        score = -find_move_quiescence(game_context, -beta, -alpha, -turn_multiplier)
+        game_context.undo_search_move()
+        if score > max_score:
+            max_score = score
         if max_score > alpha:
             alpha = max_score
         if alpha >= beta:
@@ -223,15 +653,43 @@ def find_move_nega_max_alpha_beta_pruning(game_context, valid_moves, depth, alph
     return max_score
 
 
+def score_bitbase_result(game_context, result, turn_multiplier):
+    """Scores a position found in the endgame bitbases
+
+    A win is worth BITBASE_WIN_SCORE on top of the static score and a bonus for driving the lone king to
+    the edge, so among won moves the search still prefers promoting and closing in on the mate.
+
+    Args:
+        game_context (GameContext): context of the game
+        result (int): WIN, DRAW or LOSS for the side to move.
+        turn_multiplier (int): multiplier for the score losee function.
+
+    Returns:
+        float: score for the side to move
+    """
+    if result == DRAW:
+        return STALEMATE_SCORE
+    score = BITBASE_WIN_SCORE
+    if abs(game_context.material_score) > piece_score["P"]:
+        # A pawn has to be pushed to promotion first, the king is chased with the queen or rook only.
+        kings = {piece[0]: square for piece, square in game_context.piece_squares() if piece[1] == "K"}
+        side, opponent = ("w", "b") if game_context.white_to_move else ("b", "w")
+        winner, loser = (side, opponent) if result == WIN else (opponent, side)
+        score += evaluate_mop_up(kings[winner], kings[loser]) / CENTIPAWNS
+    return result * score + turn_multiplier * score_static(game_context)
+
+
 def score_board(game_context):
     """Adjust the score if the checkmate is possible to do. Returns MAX score for checkmate possibility
 
+    The checkmate and stalemate flags are only valid right after get_valid_moves of the position, the alpha
+    beta search scores with score_static and tells the game over positions from their moves instead.
 
     Args:
         game_context (GameContext): context of the game
 
     Returns:
-        int: score for a given move
+        float: score for a given move
     """
     if game_context.checkmate:
         if game_context.white_to_move:
@@ -240,13 +698,38 @@ def score_board(game_context):
             return CHECKMATE_SCORE
     elif game_context.stalemate:
         return STALEMATE_SCORE
+    return score_static(game_context)
 
-    score = 0
-    for row in game_context.board:
-        for square in row:
-            if square[0] == "w":
-                score += piece_score[square[1]]
-            elif square[0] == "b":
-                score -= piece_score[square[1]]
 
+def score_static(game_context):
+    """Scores the position from white's point of view without looking for checkmate or stalemate
+
+    Material and piece-square scores are kept up to date by the game context, so this is O(1) unless the
+    pawn structure is missing from the pawn hash table.
+
+    Args:
+        game_context (GameContext): context of the game
+
+    Returns:
+        float: material, piece-square and pawn-structure score in pawns, white minus black.
+    """
+    position_score = game_context.position_score
+    if USE_PAWN_STRUCTURE:
+        position_score += score_pawn_structure(game_context)
+    return game_context.material_score + position_score / CENTIPAWNS
+
+
+def score_pawn_structure(game_context):
+    """Returns the pawn-structure score of the position, from the pawn hash table when it is stored there
+
+    Args:
+        game_context (GameContext): context of the game
+
+    Returns:
+        int: white minus black pawn-structure score in centipawns.
+    """
+    score = pawn_hash_table.probe(game_context.pawn_key)
+    if score is None:
+        score = evaluate_pawn_structure(game_context.board)
+        pawn_hash_table.store(game_context.pawn_key, score)
     return score
@@ -0,0 +1,111 @@
+"""Win/draw bitbases of the endgames of a king and one piece against a lone king, read from a memory-mapped file.
+
+The bitbases are built by tools.build_bitbases and hold one bit per position: set when the side with the
+piece (the strong side) wins with best play, clear for a draw or an impossible position. The lone king
+can never win, so a bit is enough. Positions are stored with white as the strong side, black strong
+positions are mirrored vertically before the lookup.
+
+The file is the tables of ENDGAMES one after another, each indexed by side to move (0 for the strong side),
+strong king square, weak king square and piece square, see bitbase_index. A probe reads a single byte.
+"""
+import mmap
+import os
+
+ENDGAMES = ("KPvK", "KRvK", "KQvK")
+POSITIONS = 2 * 64 * 64 * 64  # positions of one endgame, one bit each
+TABLE_SIZE = POSITIONS // 8  # bytes of one endgame
+DEFAULT_BITBASE_PATH = "books/endgame_bitbases.bin"
+WIN, DRAW, LOSS = 1, 0, -1  # results for the side to move
+
+
+def bitbase_index(strong_to_move, strong_king, weak_king, piece):
+    """Returns the position of a bit in the table of an endgame
+
+    Args:
+        strong_to_move (bool): True when the strong side is to move.
+        strong_king (int): square index of the strong king, white's point of view.
+        weak_king (int): square index of the weak king.
+        piece (int): square index of the strong side's piece.
+
+    Returns:
+        int: bit number in range 0..POSITIONS - 1.
+    """
+    return (((0 if strong_to_move else 1) * 64 + strong_king) * 64 + weak_king) * 64 + piece
+
+
+class EndgameBitbases:
+    """Read-only view of a bitbase file. A missing or empty file gives no bitbases.
+    """
+    def __init__(self, path=DEFAULT_BITBASE_PATH):
+        """Constructor
+
+        Args:
+            path (str, optional): bitbase file. Defaults to DEFAULT_BITBASE_PATH.
+
+        Raises:
+            ValueError: when the file does not hold every table of ENDGAMES.
+        """
+        self.path = path
+        self.bitbase_file = None
+        self.data = None
+        # Material signature -> (first bit of the table, True when black is the strong side).
+        self.tables = {}
+        if path is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        if os.path.getsize(path) != TABLE_SIZE * len(ENDGAMES):
+            raise ValueError("Invalid endgame bitbases: " + path)
+        self.bitbase_file = open(path, "rb")
+        self.data = mmap.mmap(self.bitbase_file.fileno(), 0, access=mmap.ACCESS_READ)
+        for number, endgame in enumerate(ENDGAMES):
+            strong, weak = endgame.split("v")
+            self.tables[endgame] = (number * POSITIONS, False)
+            self.tables[weak + "v" + strong] = (number * POSITIONS, True)
+
+    def __len__(self):
+        """Returns the number of endgames
+
+        Returns:
+            int: endgames that can be probed, 0 without a file.
+        """
+        return len(self.tables) // 2
+
+    def close(self):
+        """Unmaps and closes the bitbase file
+        """
+        if self.data is not None:
+            self.data.close()
+            self.bitbase_file.close()
+        self.data = None
+        self.bitbase_file = None
+        self.tables = {}
+
+    def probe(self, game_context):
+        """Looks the position up when its material is one of the endgames
+
+        Args:
+            game_context (GameContext): context of the game
+
+        Returns:
+            int: WIN, DRAW or LOSS for the side to move, None when the position is not in the bitbases.
+        """
+        if not self.tables or game_context.piece_count() != 3:
+            return None
+        table = self.tables.get(game_context.material_signature())
+        if table is None:
+            return None
+        first_bit, black_strong = table
+        strong_color = "b" if black_strong else "w"
+        for piece, square in game_context.piece_squares():
+            if black_strong:
+                square ^= 56
+            if piece[1] != "K":
+                piece_square = square
+            elif piece[0] == strong_color:
+                strong_king = square
+            else:
+                weak_king = square
+        strong_to_move = game_context.white_to_move != black_strong
+        index = first_bit + bitbase_index(strong_to_move, strong_king, weak_king, piece_square)
+        if not self.data[index >> 3] >> (7 - (index & 7)) & 1:
+            return DRAW
+        return WIN if strong_to_move else LOSS
@@ -0,0 +1,109 @@
+from artificial_intelligence.transposition_table import NO_MOVE
+
+MAX_PLY = 64
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+PROMOTION_SCORE = 90000
+FIRST_KILLER_SCORE = 80000
+SECOND_KILLER_SCORE = 79000
+HISTORY_LIMIT = 50000
+
+
+class MoveOrderer:
+    """Orders moves for the alpha beta search.
+
+    The hash (or principal variation) move goes first, then captures by most valuable victim / least valuable
+    attacker, promotions, the two killer moves of the ply and the rest of quiet moves by history score.
+    Any object with the same order_moves/record_cutoff/new_search methods can be plugged into the search instead.
+    """
+    def __init__(self, piece_values):
+        """Constructor
+
+        Args:
+            piece_values (dict): piece letter -> material value used for MVV-LVA.
+        """
+        self.piece_values = piece_values
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY)]
+        self.history = {}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Forgets killer moves and ages the history scores before a new search
+        """
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY)]
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+
+    def clear(self):
+        """Forgets everything learned and resets the counters
+        """
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY)]
+        self.history = {}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def move_score(self, move, ply, hash_move_id=NO_MOVE):
+        """Returns the ordering score of the move, higher is searched earlier
+
+        Args:
+            move (Move): Move object.
+            ply (int): distance from the root.
+            hash_move_id (int, optional): id of the move to search first. Defaults to NO_MOVE.
+
+        Returns:
+            int: ordering score.
+        """
+        if move.move_id == hash_move_id:
+            return HASH_MOVE_SCORE
+        if move.piece_captured != "__":
+            return CAPTURE_SCORE + 10 * self.piece_values[move.piece_captured[1]] - self.piece_values[move.piece_moved[1]]
+        if move.is_pawn_promotion:
+            return PROMOTION_SCORE
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if move.move_id == killers[0]:
+                return FIRST_KILLER_SCORE
+            if move.move_id == killers[1]:
+                return SECOND_KILLER_SCORE
+        return self.history.get((move.piece_moved, move.end_row, move.end_column), 0)
+
+    def order_moves(self, moves, ply, hash_move_id=NO_MOVE):
+        """Sorts the moves in place, best candidates first. Equal moves keep their relative order.
+
+        Args:
+            moves (list): list of possible moves.
+            ply (int): distance from the root.
+            hash_move_id (int, optional): id of the move to search first. Defaults to NO_MOVE.
+        """
+        moves.sort(key=lambda move: self.move_score(move, ply, hash_move_id), reverse=True)
+
+    def record_cutoff(self, move, ply, depth, move_number):
+        """Learns from a move that caused a beta cutoff
+
+        Args:
+            move (Move): move that caused the cutoff.
+            ply (int): distance from the root.
+            depth (int): remaining depth of the node.
+            move_number (int): position of the move in the ordered list.
+        """
+        self.cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+        if move.piece_captured != "__" or move.is_pawn_promotion:
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move.move_id:
+                killers[1] = killers[0]
+                killers[0] = move.move_id
+        key = (move.piece_moved, move.end_row, move.end_column)
+        self.history[key] = min(self.history.get(key, 0) + depth * depth, HISTORY_LIMIT)
+
+    def statistics(self):
+        """Returns the cutoff counters
+
+        Returns:
+            dict: cutoffs, cutoffs on the first move and their ratio.
+        """
+        rate = self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+        return {"cutoffs": self.cutoffs, "first_move_cutoffs": self.first_move_cutoffs, "first_move_cutoff_rate": rate}
@@ -0,0 +1,112 @@
+"""Opening book read straight from a memory-mapped file.
+
+The book is a sorted array of fixed-size records (Zobrist key, move id, weight), built by tools.build_book.
+It is opened with mmap and binary searched, so nothing is loaded at startup and processes reading the same
+book share its pages.
+"""
+import mmap
+import os
+import random
+import struct
+
+# Zobrist key (8), move id (2), weight (2), little endian, sorted by key then move id.
+RECORD = struct.Struct("<QHH")
+DEFAULT_BOOK_PATH = "books/opening_book.bin"
+
+
+class OpeningBook:
+    """Read-only view of an opening book file. A missing or empty file gives an empty book.
+    """
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        """Constructor
+
+        Args:
+            path (str, optional): book file. Defaults to DEFAULT_BOOK_PATH.
+
+        Raises:
+            ValueError: when the file size is not a whole number of records.
+        """
+        self.path = path
+        self.book_file = None
+        self.data = None
+        self.size = 0
+        if path is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        if os.path.getsize(path) % RECORD.size:
+            raise ValueError("Invalid opening book: " + path)
+        self.book_file = open(path, "rb")
+        self.data = mmap.mmap(self.book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.data) // RECORD.size
+
+    def __len__(self):
+        """Returns the number of records
+
+        Returns:
+            int: number of (position, move) records.
+        """
+        return self.size
+
+    def close(self):
+        """Unmaps and closes the book file
+        """
+        if self.data is not None:
+            self.data.close()
+            self.book_file.close()
+        self.data = None
+        self.book_file = None
+        self.size = 0
+
+    def __first_record(self, key):
+        """Binary searches the first record with a key not lower than the given one
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            int: index of the record, the number of records when every key is lower.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(self.data, middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def probe(self, key):
+        """Returns the book moves of a position
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            list: (move id, weight) of every book move, empty when the position is not in the book.
+        """
+        entries = []
+        index = self.__first_record(key)
+        while index < self.size:
+            record_key, move_id, weight = RECORD.unpack_from(self.data, index * RECORD.size)
+            if record_key != key:
+                break
+            entries.append((move_id, weight))
+            index += 1
+        return entries
+
+    def choose_move(self, game_context, valid_moves):
+        """Picks a book move at random, more often played moves being more likely
+
+        Args:
+            game_context (GameContext): context of the game
+            valid_moves (list): list of possible moves
+
+        Returns:
+            Move: book move found among the valid moves, or None when the position is not in the book.
+        """
+        if not self.size:
+            return None
+        weights = dict(self.probe(game_context.zobrist_key))
+        book_moves = [move for move in valid_moves if weights.get(move.move_id)]
+        if not book_moves:
+            return None
+        return random.choices(book_moves, [weights[move.move_id] for move in book_moves])[0]
@@ -0,0 +1,183 @@
+"""Root splitting search over a pool of processes.
+
+The root moves are dealt round-robin to the workers. Every worker rebuilds its own copy of the game context
+from the FEN of the position, runs the iterative deepening search on its share of the root moves and reports
+the best move of every completed iteration. Scores of different depths are not comparable, so the results
+are merged at the deepest depth every worker completed: by score, then position of the move in the root
+list, so the same inputs always give the same move.
+
+Workers do not rely on inheriting the state of the calling process, which the spawn start method does not
+do: the search settings of SmartMoveFinder are sent with every task, and a stop requested through
+SmartMoveFinder.stop_event is passed on to the workers through a shared multiprocessing event.
+"""
+import multiprocessing
+import sys
+import time
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+
+# Module settings of SmartMoveFinder read by the search, tools change them at runtime.
+SEARCH_SETTINGS = ("DEPTH", "DELTA_MARGIN", "NULL_MOVE_PRUNING", "NULL_MOVE_REDUCTION", "LATE_MOVE_REDUCTIONS",
+                   "LATE_MOVE_INDEX", "LATE_MOVE_REDUCTION", "PRINCIPAL_VARIATION_SEARCH", "ASPIRATION_WINDOWS",
+                   "ASPIRATION_WINDOW", "ASPIRATION_WIDENING", "USE_ENDGAME_BITBASES", "BITBASE_WIN_SCORE",
+                   "USE_PAWN_STRUCTURE")
+STOP_POLL_INTERVAL = 0.05  # seconds between checks of the stop request while the workers search
+
+
+def rebuild_game_context(context_class, fen):
+    """Creates a fresh game context set up in the given position
+
+    Args:
+        context_class (type): class of the game context.
+        fen (str): position in Forsyth-Edwards Notation.
+
+    Returns:
+        GameContext: context in the same position.
+    """
+    game_context = context_class()
+    game_context.load_fen(fen)
+    return game_context
+
+
+def init_worker(stop_event):
+    """Pool initializer, makes the search of the worker process stop on the shared event
+
+    Args:
+        stop_event (multiprocessing.Event): set by the calling process when the search has to stop.
+    """
+    AI.stop_event = stop_event
+
+
+def search_root_moves(task):
+    """Worker entry point searching a share of the root moves
+
+    Args:
+        task (tuple): context class, FEN of the position, root move ids, max depth, time budget, node budget
+            and the values of SEARCH_SETTINGS.
+
+    Returns:
+        tuple: (list of (best move id, score, move ids of the principal variation) of every completed iteration,
+            depth 1 first, and nodes searched).
+    """
+    context_class, fen, root_move_ids, max_depth, time_budget, node_budget, settings = task
+    for name, value in settings.items():
+        setattr(AI, name, value)
+    game_context = rebuild_game_context(context_class, fen)
+    moves_by_id = {move.move_id: move for move in game_context.get_valid_moves()}
+    root_moves = [moves_by_id[move_id] for move_id in root_move_ids]
+    # Every task starts from empty tables, so its result does not depend on what the process searched before.
+    AI.transposition_table.clear()
+    AI.move_orderer.clear()
+    iterations = []
+
+    def record_iteration(depth, best_move, score, nodes, principal_variation):
+        iterations.append((best_move.move_id, score, [move.move_id for move in principal_variation]))
+
+    AI.find_move_iterative_deepening(game_context, root_moves, max_depth, time_budget, node_budget,
+                                     record_iteration)
+    return iterations, AI.nodes_searched
+
+
+def replay_variation(game_context, move_ids):
+    """Turns move ids reported by a worker into moves of the given position
+
+    Args:
+        game_context (GameContext): context of the game in the searched position.
+        move_ids (list): ids of the moves of the variation.
+
+    Returns:
+        list: moves of the variation, cut at the first id that is not a valid move.
+    """
+    variation = []
+    for move_id in move_ids:
+        move = next((move for move in game_context.get_valid_moves() if move.move_id == move_id), None)
+        if move is None:
+            break
+        variation.append(move)
+        game_context.make_search_move(move)
+    for _ in variation:
+        game_context.undo_search_move()
+    return variation
+
+
+def find_move_parallel(game_context, valid_moves, workers, max_depth, time_budget=None, node_budget=None):
+    """Searches the root moves split between worker processes
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        workers (int): number of processes.
+        max_depth (int): deepest iteration to search.
+        time_budget (float, optional): seconds every worker may take. Defaults to None.
+        node_budget (int, optional): nodes every worker may visit. Defaults to None.
+
+    Returns:
+        Move: best move found by any worker.
+    """
+    workers = min(workers, len(valid_moves))
+    fen = game_context.get_fen()
+    settings = {name: getattr(AI, name) for name in SEARCH_SETTINGS}
+    tasks = [(type(game_context), fen, [move.move_id for move in valid_moves[i::workers]], max_depth,
+              time_budget, node_budget, settings) for i in range(workers)]
+    stop_event = multiprocessing.Event()
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(stop_event,)) as pool:
+        pending = pool.map_async(search_root_moves, tasks)
+        while not pending.ready():
+            pending.wait(STOP_POLL_INTERVAL)
+            if AI.stop_event.is_set():
+                stop_event.set()
+        results = pending.get()
+
+    root_index = {move.move_id: index for index, move in enumerate(valid_moves)}
+    AI.nodes_searched = sum(nodes for _, nodes in results)
+    AI.completed_depth = min(len(iterations) for iterations, _ in results)
+    if AI.completed_depth == 0:
+        # Only a stop request keeps a worker from completing depth 1.
+        AI.search_score = -AI.CHECKMATE_SCORE
+        AI.principal_variation = []
+        return valid_moves[0]
+    best_move_id, AI.search_score, variation_ids = max(
+        (iterations[AI.completed_depth - 1] for iterations, _ in results),
+        key=lambda iteration: (iteration[1], -root_index[iteration[0]]))
+    checkmate, stalemate = game_context.checkmate, game_context.stalemate
+    AI.principal_variation = replay_variation(game_context, variation_ids)
+    game_context.checkmate, game_context.stalemate = checkmate, stalemate
+    return next(move for move in valid_moves if move.move_id == best_move_id)
+
+
+def benchmark(depth, workers, plies=8):
+    """Compares the time of a single process and a parallel search at a fixed depth
+
+    Both searches see the same positions with the same root move order.
+
+    Args:
+        depth (int): search depth.
+        workers (int): number of processes of the parallel search.
+        plies (int, optional): number of positions of a self-played game to search. Defaults to 8.
+
+    Returns:
+        dict: seconds of both searches and the speedup.
+    """
+    game_context = BitboardGameContext()
+    timings = {1: 0.0, workers: 0.0}
+    for _ in range(plies):
+        valid_moves = game_context.get_valid_moves()
+        for worker_count in timings:
+            start_time = time.perf_counter()
+            if worker_count == 1:
+                AI.transposition_table.clear()
+                AI.move_orderer.clear()
+                move = AI.find_move_iterative_deepening(game_context, list(valid_moves), depth)
+            else:
+                move = find_move_parallel(game_context, list(valid_moves), worker_count, depth)
+            timings[worker_count] += time.perf_counter() - start_time
+        game_context.make_move(move)
+    return {"depth": depth, "workers": workers, "single_process_seconds": timings[1],
+            "parallel_seconds": timings[workers], "speedup": timings[1] / timings[workers]}
+
+
+if __name__ == '__main__':
+    # python3 -m artificial_intelligence.parallel_search [depth] [workers]
+    benchmark_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    benchmark_workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+    print(benchmark(benchmark_depth, max(2, benchmark_workers)))
@@ -0,0 +1,79 @@
+import numpy as np
+
+DEFAULT_SIZE_MB = 1
+# key (8) + score (4)
+ENTRY_SIZE_BYTES = 12
+
+
+class PawnHashTable:
+    """Fixed-size cache of pawn-structure scores indexed by the pawn key of the position.
+
+    The pawns change only when a pawn moves or is taken, so most positions of a search share their pawn
+    structure with positions scored before and the score is read from the table instead of computed. An
+    entry is replaced by the next position whose key maps to the same slot.
+
+    Empty slots hold key 0 and score 0, which is a valid entry: the key of a board without pawns is 0 and so
+    is its score, every other key is told apart from an empty slot by comparing the keys.
+    """
+    def __init__(self, size_mb=DEFAULT_SIZE_MB):
+        """Constructor
+
+        Args:
+            size_mb (float, optional): memory cap of the table in MB. Defaults to DEFAULT_SIZE_MB.
+        """
+        self.size = max(1, int(size_mb * 1024 * 1024) // ENTRY_SIZE_BYTES)
+        self.keys = np.zeros(self.size, dtype=np.uint64)
+        self.scores = np.zeros(self.size, dtype=np.int32)
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        """Removes all entries and resets the counters
+        """
+        self.keys.fill(0)
+        self.scores.fill(0)
+        self.probes = self.hits = 0
+
+    def probe(self, key):
+        """Looks the pawn structure up in the table
+
+        Args:
+            key (int): pawn key of the position.
+
+        Returns:
+            int: pawn-structure score in centipawns or None when the pawn structure is not stored.
+        """
+        self.probes += 1
+        index = key % self.size
+        if self.keys.item(index) != key:
+            return None
+        self.hits += 1
+        return self.scores.item(index)
+
+    def store(self, key, score):
+        """Stores the score of a pawn structure
+
+        Args:
+            key (int): pawn key of the position.
+            score (int): pawn-structure score in centipawns.
+        """
+        index = key % self.size
+        self.keys[index] = key
+        self.scores[index] = score
+
+    def hit_rate(self):
+        """Returns the share of probes answered from the table
+
+        Returns:
+            float: hits divided by probes, 0 before the first probe.
+        """
+        return self.hits / self.probes if self.probes else 0.0
+
+    def statistics(self):
+        """Returns the counters of the table
+
+        Returns:
+            dict: probes, hits, hit rate and fill ratio.
+        """
+        return {"probes": self.probes, "hits": self.hits, "hit_rate": self.hit_rate(),
+                "fill": float(np.count_nonzero(self.keys)) / self.size}
@@ -0,0 +1,177 @@
+"""Optional statistics collector for the iterative deepening search.
+
+When a collector is plugged in with SmartMoveFinder.set_search_statistics, every search records nodes,
+static evaluations, cutoffs, transposition table and pawn hash table hits, time and nodes per depth, nodes
+per second and the effective branching factor. Static evaluations count every call of score_static, not
+only the leaves: the null move test, every stand pat of the quiescence search and the bitbase scores too.
+
+For the time of the search get_valid_moves, get_capture_moves, the make and undo methods of the game
+context and score_static are wrapped with timers; nothing is wrapped without a collector, so the search
+pays nothing then.
+
+Every completed iteration and every search is logged as one JSON object on the "chess_ai.search" logger.
+
+Usage (from the game directory):
+    python3 -m artificial_intelligence.search_statistics [depth] ["<FEN>"]
+"""
+import json
+import logging
+import sys
+import time
+import artificial_intelligence.SmartMoveFinder as AI
+
+LOGGER_NAME = "chess_ai.search"
+CONTEXT_HOOKS = ("get_valid_moves", "get_capture_moves", "make_move", "undo_move", "make_search_move",
+                 "undo_search_move")
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def log_to_file(path):
+    """Appends the structured search logs to a file, one JSON object per line
+
+    Args:
+        path (str): log file path.
+
+    Returns:
+        logging.Handler: the added handler.
+    """
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+class SearchStatistics:
+    """Collects the statistics of the searches run while it is plugged into SmartMoveFinder.
+
+    The results of the last search are kept in last_search, the summaries of all searches in searches.
+    """
+    def __init__(self):
+        """Constructor
+        """
+        self.searches = []
+        self.last_search = None
+        self.hook_timings = {}
+        self.iterations = []
+        self.__wrapped = []
+        self.__start_time = 0.0
+        self.__iteration_start = (0.0, 0)
+        self.__cutoffs_start = 0
+        self.__probes_start = (0, 0)
+
+    def start_search(self, game_context):
+        """Resets the counters and wraps the hot path for a new search
+
+        Args:
+            game_context (GameContext): context of the searched game.
+        """
+        self.hook_timings = {}
+        self.iterations = []
+        for name in CONTEXT_HOOKS:
+            self.__wrap(game_context, name)
+        self.__wrap(AI, "score_static")
+        self.__cutoffs_start = getattr(AI.move_orderer, "cutoffs", 0)
+        self.__probes_start = (AI.transposition_table.probes, AI.transposition_table.hits)
+        self.__pawn_probes_start = (AI.pawn_hash_table.probes, AI.pawn_hash_table.hits)
+        self.__start_time = time.perf_counter()
+        self.__iteration_start = (self.__start_time, 0)
+
+    def end_iteration(self, depth, nodes):
+        """Records a completed iteration
+
+        Args:
+            depth (int): depth of the iteration.
+            nodes (int): nodes searched since the start of the search.
+        """
+        now = time.perf_counter()
+        start_time, start_nodes = self.__iteration_start
+        iteration_nodes = nodes - start_nodes
+        previous_nodes = self.iterations[-1]["nodes"] if self.iterations else 0
+        iteration = {"event": "iteration", "depth": depth, "nodes": iteration_nodes, "seconds": now - start_time,
+                     "nps": iteration_nodes / (now - start_time) if now > start_time else 0.0,
+                     "branching_factor": iteration_nodes / previous_nodes if previous_nodes else None}
+        self.iterations.append(iteration)
+        self.__iteration_start = (now, nodes)
+        logger.info(json.dumps(iteration))
+
+    def end_search(self, game_context, best_move, completed_depth, nodes):
+        """Removes the wrappers and summarizes the search
+
+        Args:
+            game_context (GameContext): context of the searched game.
+            best_move (Move): move found, None when no iteration completed.
+            completed_depth (int): depth of the last completed iteration.
+            nodes (int): nodes searched.
+
+        Returns:
+            dict: summary of the search, also kept in last_search.
+        """
+        seconds = time.perf_counter() - self.__start_time
+        self.unwrap()
+        probes = AI.transposition_table.probes - self.__probes_start[0]
+        hits = AI.transposition_table.hits - self.__probes_start[1]
+        pawn_probes = AI.pawn_hash_table.probes - self.__pawn_probes_start[0]
+        pawn_hits = AI.pawn_hash_table.hits - self.__pawn_probes_start[1]
+        summary = {"event": "search", "fen": game_context.get_fen(),
+                   "best_move": best_move.get_chess_notation() if best_move is not None else None,
+                   "depth": completed_depth, "nodes": nodes, "seconds": seconds,
+                   "nps": nodes / seconds if seconds else 0.0,
+                   "static_evaluations": self.hook_timings.get("score_static", {}).get("calls", 0),
+                   "cutoffs": getattr(AI.move_orderer, "cutoffs", 0) - self.__cutoffs_start,
+                   "tt_probes": probes, "tt_hit_rate": hits / probes if probes else 0.0,
+                   "pawn_hash_probes": pawn_probes,
+                   "pawn_hash_hit_rate": pawn_hits / pawn_probes if pawn_probes else 0.0,
+                   "effective_branching_factor": nodes ** (1.0 / completed_depth) if completed_depth else None,
+                   "iterations": self.iterations, "hooks": self.hook_timings}
+        self.last_search = summary
+        self.searches.append(summary)
+        logger.info(json.dumps(summary))
+        return summary
+
+    def unwrap(self):
+        """Puts back the functions wrapped by start_search, safe to call more than once
+        """
+        for owner, name, original, own_attribute in reversed(self.__wrapped):
+            if own_attribute:
+                setattr(owner, name, original)
+            else:
+                # The wrapper is an instance attribute hiding the method of the class.
+                delattr(owner, name)
+        self.__wrapped = []
+
+    def __wrap(self, owner, name):
+        """Replaces a function with a wrapper counting its calls and time
+
+        Args:
+            owner (object): game context or module holding the function.
+            name (str): attribute name of the function.
+        """
+        original = getattr(owner, name)
+        timing = self.hook_timings.setdefault(name, {"calls": 0, "seconds": 0.0})
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start_time = perf_counter()
+            result = original(*args)
+            timing["seconds"] += perf_counter() - start_time
+            timing["calls"] += 1
+            return result
+
+        # Modules and instance attributes set before, e.g. another wrapper, are put back, a method found on the
+        # class is uncovered by deleting the wrapper.
+        self.__wrapped.append((owner, name, original, name in vars(owner)))
+        setattr(owner, name, timed)
+
+
+if __name__ == '__main__':
+    # python3 -m artificial_intelligence.search_statistics [depth] ["<FEN>"]
+    from game.bitboard_context import BitboardGameContext
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    benchmark_context = BitboardGameContext()
+    if len(sys.argv) > 2:
+        benchmark_context.load_fen(sys.argv[2])
+    AI.set_search_statistics(SearchStatistics())
+    AI.find_move_iterative_deepening(benchmark_context, benchmark_context.get_valid_moves(),
+                                     int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,151 @@
+"""Background search so the game window keeps drawing and handling events while the AI thinks.
+"""
+import threading
+import artificial_intelligence.SmartMoveFinder as AI
+
+STATUS_VARIATION_MOVES = 4  # moves of the principal variation shown in the status text
+
+
+class SearchWorker:
+    """Runs the AI search in a background thread.
+
+    The thread searches a copy of the game context, the board drawn on the screen is never touched by it.
+    Only one search runs at a time, starting another one stops the running one first. While the human
+    thinks the worker can ponder: it searches the human's position without a limit, so the transposition
+    table and the move ordering tables are already filled when the AI has to answer.
+    """
+    def __init__(self):
+        """Constructor
+        """
+        self.thread = None
+        self.pondering = False
+        self.finished = False
+        self.result = None
+        self.depth = 0
+        self.best_move = None
+        self.score = 0
+        self.nodes = 0
+        self.principal_variation = []
+
+    def is_searching(self):
+        """Checks if a search for the AI move is running
+
+        Returns:
+            bool: True while the AI move is searched, False when idle, finished or pondering.
+        """
+        return self.thread is not None and self.thread.is_alive() and not self.pondering
+
+    def start_search(self, game_context, time_budget=AI.TIME_BUDGET):
+        """Starts searching the move of the side to move
+
+        Args:
+            game_context (GameContext): context of the game, only its current position is used.
+            time_budget (float, optional): seconds the search may take. Defaults to AI.TIME_BUDGET.
+        """
+        self.__start(game_context, False, time_budget)
+
+    def start_ponder(self, game_context):
+        """Starts searching the position without a limit until stopped
+
+        Args:
+            game_context (GameContext): context of the game, only its current position is used.
+        """
+        self.__start(game_context, True, None)
+
+    def stop(self):
+        """Stops the running search, waits for its thread and forgets its result
+        """
+        if self.thread is not None and self.thread.is_alive():
+            AI.stop_event.set()
+            self.thread.join()
+            AI.stop_event.clear()
+        self.thread = None
+        self.pondering = False
+        self.finished = False
+        self.result = None
+
+    def has_result(self):
+        """Checks if the search for the AI move has finished
+
+        Returns:
+            bool: True when take_result returns the found move.
+        """
+        return self.finished and not self.pondering
+
+    def take_result(self):
+        """Returns the move of a finished search once and leaves the worker idle
+
+        Returns:
+            Move: best move found, or None while searching or pondering.
+        """
+        if not self.has_result():
+            return None
+        move = self.result
+        self.stop()
+        return move
+
+    def status_text(self):
+        """Describes the progress of the running search
+
+        Returns:
+            str: depth, score, nodes and principal variation so far, empty when not searching.
+        """
+        if not self.is_searching():
+            return ""
+        if self.best_move is None:
+            return "Thinking..."
+        variation = (self.principal_variation or [self.best_move])[:STATUS_VARIATION_MOVES]
+        return "Thinking... depth %d  score %+.2f  nodes %d  pv %s" % (
+            self.depth, self.score, self.nodes, " ".join(move.get_chess_notation() for move in variation))
+
+    def __start(self, game_context, ponder, time_budget):
+        """Stops the running search and starts a new thread
+
+        Args:
+            game_context (GameContext): context of the game.
+            ponder (bool): True to search without a limit until stopped.
+            time_budget (float): seconds the search may take, None for the depth limit.
+        """
+        self.stop()
+        self.pondering = ponder
+        self.depth = 0
+        self.best_move = None
+        self.score = 0
+        self.nodes = 0
+        self.principal_variation = []
+        search_context = game_context.copy_position()
+        self.thread = threading.Thread(target=self.__run, args=(search_context, ponder, time_budget), daemon=True)
+        self.thread.start()
+
+    def __run(self, game_context, ponder, time_budget):
+        """Thread entry point running the search
+
+        Args:
+            game_context (GameContext): copy of the game context owned by the thread.
+            ponder (bool): True to search without a limit until stopped.
+            time_budget (float): seconds the search may take, None for the depth limit.
+        """
+        valid_moves = game_context.get_valid_moves()
+        if ponder:
+            move = AI.find_move_iterative_deepening(game_context, valid_moves, AI.MAX_DEPTH,
+                                                   progress_callback=self.__on_iteration)
+        else:
+            move = AI.find_best_move(game_context, valid_moves, time_budget, progress_callback=self.__on_iteration)
+        self.result = move
+        self.finished = True
+
+    def __on_iteration(self, depth, best_move, score, nodes, principal_variation):
+        """Keeps the progress of the last completed iteration for the game window
+
+        Args:
+            depth (int): completed depth.
+            best_move (Move): best move of the iteration.
+            score (float): score of the move for the side to move.
+            nodes (int): nodes searched so far.
+            principal_variation (list): moves expected from the searched position.
+        """
+        self.depth = depth
+        self.best_move = best_move
+        self.score = score
+        self.nodes = nodes
+        self.principal_variation = principal_variation
@@ -0,0 +1,117 @@
+import numpy as np
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+NO_MOVE = -1
+DEFAULT_SIZE_MB = 16
+# key (8) + depth (1) + bound (1) + generation (1) + score (8) + move id (2)
+ENTRY_SIZE_BYTES = 21
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results indexed by Zobrist key.
+
+    Every entry stores the searched depth, bound type, score and id of the best move. The table is kept in
+    numpy arrays, so its memory use is fixed by the size given in MB.
+    """
+    def __init__(self, size_mb=DEFAULT_SIZE_MB):
+        """Constructor
+
+        Args:
+            size_mb (float, optional): memory cap of the table in MB. Defaults to DEFAULT_SIZE_MB.
+        """
+        self.size = max(1, int(size_mb * 1024 * 1024) // ENTRY_SIZE_BYTES)
+        self.keys = np.zeros(self.size, dtype=np.uint64)
+        self.depths = np.full(self.size, -1, dtype=np.int8)
+        self.bounds = np.zeros(self.size, dtype=np.int8)
+        self.generations = np.zeros(self.size, dtype=np.uint8)
+        self.scores = np.zeros(self.size, dtype=np.float64)
+        self.moves = np.full(self.size, NO_MOVE, dtype=np.int16)
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        """Marks the start of a new search so entries of previous searches are replaced first
+        """
+        self.generation = (self.generation + 1) % 256
+
+    def clear(self):
+        """Removes all entries and resets the counters
+        """
+        self.depths.fill(-1)
+        self.moves.fill(NO_MOVE)
+        self.probes = self.hits = self.collisions = self.stores = self.overwrites = 0
+
+    def probe(self, key):
+        """Looks the position up in the table
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            tuple: (depth, bound, score, move id) or None when the position is not stored.
+        """
+        self.probes += 1
+        index = key % self.size
+        if self.depths[index] < 0:
+            return None
+        if self.keys[index] != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return int(self.depths[index]), int(self.bounds[index]), float(self.scores[index]), int(self.moves[index])
+
+    def best_move_id(self, key):
+        """Returns the stored best move without touching the counters
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            int: id of the stored best move or NO_MOVE.
+        """
+        index = key % self.size
+        if self.depths[index] < 0 or self.keys[index] != key:
+            return NO_MOVE
+        return int(self.moves[index])
+
+    def store(self, key, depth, bound, score, move_id):
+        """Stores a search result.
+
+        The slot is overwritten when it is empty, holds the same position, comes from an older search or
+        was searched less deep than the new result.
+
+        Args:
+            key (int): Zobrist key of the position.
+            depth (int): remaining depth the position was searched to.
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+            score (float): score of the position for the side to move.
+            move_id (int): id of the best move or NO_MOVE.
+        """
+        index = key % self.size
+        stored_depth = self.depths[index]
+        if stored_depth >= 0 and self.keys[index] != key:
+            if self.generations[index] == self.generation and stored_depth > depth:
+                return
+            self.overwrites += 1
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.generations[index] = self.generation
+        self.scores[index] = score
+        self.moves[index] = move_id
+        self.stores += 1
+
+    def statistics(self):
+        """Returns the counters of the table
+
+        Returns:
+            dict: probes, hits, collisions, stores, overwrites and fill ratio.
+        """
+        return {"probes": self.probes, "hits": self.hits, "collisions": self.collisions, "stores": self.stores,
+                "overwrites": self.overwrites, "fill": float(np.count_nonzero(self.depths >= 0)) / self.size}
@@ -0,0 +1,209 @@
+"""Bitboard helpers and precomputed attack tables.
+
+Squares are indexed the same way as ChessGameContext.board: index = row * 8 + column, so square 0 is a8
+and square 63 is h1. Bit n of a bitboard is set when square n is occupied.
+"""
+
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
+EMPTY_SQUARE = "__"
+PIECE_NAMES = ("wP", "wN", "wB", "wR", "wQ", "wK", "bP", "bN", "bB", "bR", "bQ", "bK")
+PIECE_INDEX = {name: index for index, name in enumerate(PIECE_NAMES)}
+# Small integer code of every piece and of the empty square, used by the binary and NumPy encodings.
+PIECE_CODES = {piece: code for code, piece in enumerate(PIECE_NAMES + (EMPTY_SQUARE,))}
+EMPTY_CODE = PIECE_CODES[EMPTY_SQUARE]
+WHITE = 0
+BLACK = 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+KNIGHT_DIRECTIONS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+ROOK_DIRECTIONS = ((-1, 0), (0, -1), (1, 0), (0, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+SQUARE_COORDS = tuple(divmod(square, 8) for square in range(64))
+
+
+def square_index(row, column):
+    """Converts board coordinates to a bitboard square index
+
+    Args:
+        row (int): row on board.
+        column (int): column on board.
+
+    Returns:
+        int: square index in range 0..63.
+    """
+    return row * 8 + column
+
+
+def iterate_squares(bitboard):
+    """Yields indexes of all set bits starting from the least significant one
+
+    Args:
+        bitboard (int): bitboard to iterate.
+
+    Yields:
+        int: square index.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def _step_table(directions):
+    """Builds attack table for pieces moving by a single step (knights and kings)
+
+    Args:
+        directions (tuple): (row, column) offsets of the piece.
+
+    Returns:
+        tuple: attack bitboard for every square.
+    """
+    table = []
+    for square in range(64):
+        row, column = divmod(square, 8)
+        attacks = 0
+        for direction in directions:
+            end_row = row + direction[0]
+            end_col = column + direction[1]
+            if 0 <= end_row < 8 and 0 <= end_col < 8:
+                attacks |= 1 << square_index(end_row, end_col)
+        table.append(attacks)
+    return tuple(table)
+
+
+def _slide(square, occupancy, directions):
+    """Walks rays from the square until the edge or the first blocker (blocker included)
+
+    Args:
+        square (int): square index of the sliding piece.
+        occupancy (int): bitboard of occupied squares.
+        directions (tuple): (row, column) ray directions.
+
+    Returns:
+        int: attack bitboard.
+    """
+    row, column = divmod(square, 8)
+    attacks = 0
+    for direction in directions:
+        for i in range(1, 8):
+            end_row = row + direction[0] * i
+            end_col = column + direction[1] * i
+            if not (0 <= end_row < 8 and 0 <= end_col < 8):
+                break
+            bit = 1 << square_index(end_row, end_col)
+            attacks |= bit
+            if occupancy & bit:
+                break
+    return attacks
+
+
+def _between_table():
+    """Builds the table of squares lying strictly between two aligned squares
+
+    Returns:
+        tuple: flat table indexed by first_square * 64 + second_square, zero when squares are not aligned.
+    """
+    table = [0] * (64 * 64)
+    for square in range(64):
+        row, column = divmod(square, 8)
+        for direction in KING_DIRECTIONS:
+            between = 0
+            for i in range(1, 8):
+                end_row = row + direction[0] * i
+                end_col = column + direction[1] * i
+                if not (0 <= end_row < 8 and 0 <= end_col < 8):
+                    break
+                end_square = square_index(end_row, end_col)
+                table[square * 64 + end_square] = between
+                between |= 1 << end_square
+    return tuple(table)
+
+
+def _relevant_mask(square, directions):
+    """Returns the squares whose occupancy can change the sliding attacks (board edges excluded)
+
+    Args:
+        square (int): square index of the sliding piece.
+        directions (tuple): (row, column) ray directions.
+
+    Returns:
+        int: relevant occupancy bitboard.
+    """
+    row, column = divmod(square, 8)
+    mask = 0
+    for direction in directions:
+        for i in range(1, 7):
+            end_row = row + direction[0] * i
+            end_col = column + direction[1] * i
+            next_row = end_row + direction[0]
+            next_col = end_col + direction[1]
+            if not (0 <= next_row < 8 and 0 <= next_col < 8):
+                break
+            mask |= 1 << square_index(end_row, end_col)
+    return mask
+
+
+KNIGHT_ATTACKS = _step_table(KNIGHT_DIRECTIONS)
+KING_ATTACKS = _step_table(KING_DIRECTIONS)
+# PAWN_ATTACKS[color][square] - squares attacked by a pawn of the given color standing on square.
+PAWN_ATTACKS = (_step_table(((-1, -1), (-1, 1))), _step_table(((1, -1), (1, 1))))
+ROOK_MASKS = tuple(_relevant_mask(square, ROOK_DIRECTIONS) for square in range(64))
+BISHOP_MASKS = tuple(_relevant_mask(square, BISHOP_DIRECTIONS) for square in range(64))
+ROOK_RAYS = tuple(_slide(square, 0, ROOK_DIRECTIONS) for square in range(64))
+BISHOP_RAYS = tuple(_slide(square, 0, BISHOP_DIRECTIONS) for square in range(64))
+BETWEEN = _between_table()
+
+# Sliding attack lookup: per square, relevant occupancy -> attack bitboard. Entries are filled on first
+# use, so importing the module stays cheap and only occupancy patterns that really occur are stored.
+_rook_tables = tuple({} for _ in range(64))
+_bishop_tables = tuple({} for _ in range(64))
+
+
+def rook_attacks(square, occupancy):
+    """Returns the rook attack bitboard for a given occupancy
+
+    Args:
+        square (int): square index of the rook.
+        occupancy (int): bitboard of all occupied squares.
+
+    Returns:
+        int: attack bitboard (first blockers included).
+    """
+    key = occupancy & ROOK_MASKS[square]
+    table = _rook_tables[square]
+    attacks = table.get(key)
+    if attacks is None:
+        attacks = table[key] = _slide(square, key, ROOK_DIRECTIONS)
+    return attacks
+
+
+def bishop_attacks(square, occupancy):
+    """Returns the bishop attack bitboard for a given occupancy
+
+    Args:
+        square (int): square index of the bishop.
+        occupancy (int): bitboard of all occupied squares.
+
+    Returns:
+        int: attack bitboard (first blockers included).
+    """
+    key = occupancy & BISHOP_MASKS[square]
+    table = _bishop_tables[square]
+    attacks = table.get(key)
+    if attacks is None:
+        attacks = table[key] = _slide(square, key, BISHOP_DIRECTIONS)
+    return attacks
+
+
+def queen_attacks(square, occupancy):
+    """Returns the queen attack bitboard for a given occupancy
+
+    Args:
+        square (int): square index of the queen.
+        occupancy (int): bitboard of all occupied squares.
+
+    Returns:
+        int: attack bitboard (first blockers included).
+    """
+    return rook_attacks(square, occupancy) | bishop_attacks(square, occupancy)
@@ -0,0 +1,389 @@
+from game.chess_context import ChessGameContext
+from game.move import Move
+from game.bitboard import (PIECE_NAMES, PIECE_INDEX, EMPTY_SQUARE, FULL_BOARD, WHITE, BLACK, PAWN, KNIGHT, BISHOP,
+                           ROOK, QUEEN, KING, SQUARE_COORDS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, ROOK_RAYS,
+                           BISHOP_RAYS, BETWEEN, iterate_squares, square_index, rook_attacks, bishop_attacks)
+
+
+class BitboardGameContext(ChessGameContext):
+    """Game context backed by bitboards.
+
+    Keeps the mailbox board used by the views and the move log, but generates moves and answers
+    attack queries from twelve piece bitboards and the occupancy sets.
+    """
+    def __init__(self):
+        """Constructor for bitboard context. Builds piece sets from the starting board.
+        """
+        super().__init__()
+        # Plain lists are much faster to index square by square than a numpy array of strings.
+        self.board = self.board.tolist()
+        self.piece_bitboards = [0] * len(PIECE_NAMES)
+        self.color_occupancy = [0, 0]
+        self.occupancy = 0
+        self.load_bitboards()
+
+    def load_fen(self, fen):
+        """Sets up the position from a FEN string and rebuilds the bitboards
+
+        Args:
+            fen (str): position in Forsyth-Edwards Notation.
+        """
+        super().load_fen(fen)
+        self.load_bitboards()
+
+    def load_bitboards(self):
+        """Rebuilds all bitboards from the mailbox board
+        """
+        self.piece_bitboards = [0] * len(PIECE_NAMES)
+        self.color_occupancy = [0, 0]
+        self.occupancy = 0
+        for row in range(8):
+            for column in range(8):
+                piece = self.board[row][column]
+                if piece != EMPTY_SQUARE:
+                    self.__toggle_piece(piece, square_index(row, column))
+
+    def __toggle_piece(self, piece, square):
+        """Adds or removes the piece on a square in every affected bitboard
+
+        Args:
+            piece (str): two character piece name.
+            square (int): square index.
+        """
+        bit = 1 << square
+        self.piece_bitboards[PIECE_INDEX[piece]] ^= bit
+        self.color_occupancy[BLACK if piece[0] == "b" else WHITE] ^= bit
+        self.occupancy ^= bit
+
+    def __apply_move(self, move):
+        """Toggles the pieces touched by the move. Applying the same move twice restores the bitboards.
+
+        Args:
+            move (Move): Move object.
+        """
+        start_square = square_index(move.start_row, move.start_column)
+        end_square = square_index(move.end_row, move.end_column)
+        self.__toggle_piece(move.piece_moved, start_square)
+        self.__toggle_piece(move.piece_moved[0] + "Q" if move.is_pawn_promotion else move.piece_moved, end_square)
+        if move.piece_captured != EMPTY_SQUARE:
+            if move.is_enpassant_move:
+                self.__toggle_piece(move.piece_captured, square_index(move.start_row, move.end_column))
+            else:
+                self.__toggle_piece(move.piece_captured, end_square)
+
+    def make_move(self, move):
+        """Performs a move and updates the board and bitboards
+
+        Args:
+            move (Move): Move object.
+        """
+        super().make_move(move)
+        self.__apply_move(move)
+
+    def undo_move(self):
+        """Undoes the last move from the move log
+        """
+        if len(self.moveLog) != 0:
+            self.__apply_move(self.moveLog[-1])
+        super().undo_move()
+
+    def make_search_move(self, move):
+        """Performs a move for the search, see ChessGameContext.make_search_move
+
+        Args:
+            move (Move): Move object.
+        """
+        super().make_search_move(move)
+        self.__apply_move(move)
+
+    def undo_search_move(self):
+        """Takes back the last move made by make_search_move
+        """
+        self.__apply_move(self.search_undo_stack[-1][0])
+        super().undo_search_move()
+
+    def has_non_pawn_material(self):
+        """Checks whether the side to move has a piece other than pawns and the king
+
+        Returns:
+            bool: True when a knight, bishop, rook or queen of the side to move is on the board.
+        """
+        pieces = self.piece_bitboards
+        offset = 0 if self.white_to_move else 6
+        return (pieces[offset + KNIGHT] | pieces[offset + BISHOP] | pieces[offset + ROOK] | pieces[offset + QUEEN]) != 0
+
+    def piece_count(self):
+        """Counts the pieces on the board, kings and pawns included
+
+        Returns:
+            int: number of occupied squares.
+        """
+        return bin(self.occupancy).count("1")
+
+    def piece_squares(self):
+        """Lists the pieces on the board
+
+        Returns:
+            list: (piece, square index) of every piece.
+        """
+        return [(self.board[square >> 3][square & 7], square) for square in iterate_squares(self.occupancy)]
+
+    def attackers(self, square, color):
+        """Returns the pieces of a given color attacking the square
+
+        Args:
+            square (int): square index.
+            color (int): WHITE or BLACK.
+
+        Returns:
+            int: bitboard of attacking pieces.
+        """
+        pieces = self.piece_bitboards
+        offset = 6 * color
+        diagonal = pieces[offset + BISHOP] | pieces[offset + QUEEN]
+        straight = pieces[offset + ROOK] | pieces[offset + QUEEN]
+        return ((PAWN_ATTACKS[1 - color][square] & pieces[offset + PAWN])
+                | (KNIGHT_ATTACKS[square] & pieces[offset + KNIGHT])
+                | (KING_ATTACKS[square] & pieces[offset + KING])
+                | (bishop_attacks(square, self.occupancy) & diagonal if diagonal else 0)
+                | (rook_attacks(square, self.occupancy) & straight if straight else 0))
+
+    def square_attacked(self, row, column):
+        """Checks whether the opponent of the side to move attacks the square
+
+        Args:
+            row (int): Row of a piece.
+            column (int): Column of a piece.
+
+        Returns:
+            Boolean: True when the square is attacked and false otherwise.
+        """
+        color = BLACK if self.white_to_move else WHITE
+        return self.attackers(square_index(row, column), color) != 0
+
+    def get_valid_moves(self):
+        """Returns the legal moves for the side to move.
+
+        Checkers, pinned pieces and squares attacked by the opponent are computed once, so only legal
+        moves are generated and no move has to be played to test it.
+
+        Returns:
+            list: list of all legal moves for each chess piece.
+        """
+        moves = self.__generate_legal_moves(False)
+        self.checkmate = len(moves) == 0 and self.inCheck
+        self.stalemate = len(moves) == 0 and not self.inCheck
+        return moves
+
+    def get_capture_moves(self):
+        """Returns the legal captures and promotions for the side to move without building quiet moves.
+
+        Stalemate can not be told from a position without captures, so checkmate and stalemate are cleared.
+
+        Returns:
+            list: list of legal captures and promotions.
+        """
+        moves = self.__generate_legal_moves(True)
+        self.checkmate = False
+        self.stalemate = False
+        return moves
+
+    def __generate_legal_moves(self, captures_only):
+        """Generates legal moves from the checkers, pin rays and attacked squares of the position
+
+        Args:
+            captures_only (bool): True to generate only captures and promotions.
+
+        Returns:
+            list: list of legal moves.
+        """
+        color = WHITE if self.white_to_move else BLACK
+        enemy = 1 - color
+        pieces = self.piece_bitboards
+        king_square = (pieces[6 * color + KING] & -pieces[6 * color + KING]).bit_length() - 1
+        checkers = self.attackers(king_square, enemy)
+        if checkers == 0:
+            check_mask = FULL_BOARD
+        elif checkers & (checkers - 1) == 0:
+            check_mask = checkers | BETWEEN[king_square * 64 + checkers.bit_length() - 1]
+        else:
+            check_mask = 0  # double check, only the king can move
+
+        king_bit = 1 << king_square
+        king_targets = KING_ATTACKS[king_square] & ~self.color_occupancy[color] \
+            & ~self.attacked_squares(enemy, self.occupancy ^ king_bit)
+        if captures_only:
+            king_targets &= self.color_occupancy[enemy]
+
+        moves = []
+        self.__generate_moves(color, moves, check_mask, self.pin_rays(king_square, color), king_targets, checkers,
+                              captures_only)
+        self.inCheck = checkers != 0
+        return moves
+
+    def attacked_squares(self, color, occupancy):
+        """Returns all squares attacked by the pieces of a given color
+
+        Args:
+            color (int): WHITE or BLACK.
+            occupancy (int): bitboard of occupied squares used to stop sliding pieces.
+
+        Returns:
+            int: bitboard of attacked squares.
+        """
+        pieces = self.piece_bitboards
+        offset = 6 * color
+        attacked = 0
+        for square in iterate_squares(pieces[offset + PAWN]):
+            attacked |= PAWN_ATTACKS[color][square]
+        for square in iterate_squares(pieces[offset + KNIGHT]):
+            attacked |= KNIGHT_ATTACKS[square]
+        for square in iterate_squares(pieces[offset + BISHOP] | pieces[offset + QUEEN]):
+            attacked |= bishop_attacks(square, occupancy)
+        for square in iterate_squares(pieces[offset + ROOK] | pieces[offset + QUEEN]):
+            attacked |= rook_attacks(square, occupancy)
+        for square in iterate_squares(pieces[offset + KING]):
+            attacked |= KING_ATTACKS[square]
+        return attacked
+
+    def pin_rays(self, king_square, color):
+        """Finds the pieces pinned to the king
+
+        Args:
+            king_square (int): square index of the king.
+            color (int): color of the king.
+
+        Returns:
+            dict: pinned piece square -> bitboard of squares it may still move to (the pin ray with the pinner).
+        """
+        pieces = self.piece_bitboards
+        offset = 6 * (1 - color)
+        snipers = (ROOK_RAYS[king_square] & (pieces[offset + ROOK] | pieces[offset + QUEEN])) \
+            | (BISHOP_RAYS[king_square] & (pieces[offset + BISHOP] | pieces[offset + QUEEN]))
+        pins = {}
+        own = self.color_occupancy[color]
+        for sniper_square in iterate_squares(snipers):
+            between = BETWEEN[king_square * 64 + sniper_square]
+            blockers = between & self.occupancy
+            if blockers and blockers & (blockers - 1) == 0 and blockers & own:
+                pins[blockers.bit_length() - 1] = between | (1 << sniper_square)
+        return pins
+
+    def get_possible_moves(self):
+        """Returns the list of all possible moves for each chess piece
+
+        Returns:
+            list: list of all possible moves for each chess piece.
+        """
+        moves = []
+        color = WHITE if self.white_to_move else BLACK
+        king_targets = 0
+        for square in iterate_squares(self.piece_bitboards[6 * color + KING]):
+            king_targets = KING_ATTACKS[square] & ~self.color_occupancy[color]
+        self.__generate_moves(color, moves, FULL_BOARD, {}, king_targets, None)
+        return moves
+
+    def __generate_moves(self, color, moves_list, check_mask, pins, king_targets, checkers, captures_only=False):
+        """Appends moves of every piece of the given color restricted to the given masks
+
+        Args:
+            color (int): WHITE or BLACK.
+            moves_list (list): list the moves are appended to.
+            check_mask (int): squares non-king pieces may move to (capture or block a check).
+            pins (dict): pinned piece square -> allowed squares.
+            king_targets (int): squares the king may move to.
+            checkers (int): bitboard of pieces giving check, None to skip en passant legality checks.
+            captures_only (bool, optional): True to skip quiet moves. Defaults to False.
+        """
+        offset = 6 * color
+        pieces = self.piece_bitboards
+        if captures_only:
+            targets = self.color_occupancy[1 - color] & check_mask
+        else:
+            targets = ~self.color_occupancy[color] & check_mask
+        occupancy = self.occupancy
+
+        if check_mask:
+            self.__add_pawn_moves(color, moves_list, check_mask, pins, checkers, captures_only)
+            for square in iterate_squares(pieces[offset + KNIGHT]):
+                if square not in pins:
+                    self.__add_moves(square, KNIGHT_ATTACKS[square] & targets, moves_list)
+            for square in iterate_squares(pieces[offset + BISHOP] | pieces[offset + QUEEN]):
+                self.__add_moves(square, bishop_attacks(square, occupancy) & targets & pins.get(square, FULL_BOARD),
+                                 moves_list)
+            for square in iterate_squares(pieces[offset + ROOK] | pieces[offset + QUEEN]):
+                self.__add_moves(square, rook_attacks(square, occupancy) & targets & pins.get(square, FULL_BOARD),
+                                 moves_list)
+        for square in iterate_squares(pieces[offset + KING]):
+            self.__add_moves(square, king_targets, moves_list)
+
+    def __add_moves(self, start_square, targets, moves_list):
+        """Appends a move from the start square to every square of the target bitboard
+
+        Args:
+            start_square (int): square index of the moving piece.
+            targets (int): bitboard of destination squares.
+            moves_list (list): list the moves are appended to.
+        """
+        start = SQUARE_COORDS[start_square]
+        for end_square in iterate_squares(targets):
+            moves_list.append(Move(start, SQUARE_COORDS[end_square], self.board))
+
+    def __add_pawn_moves(self, color, moves_list, check_mask, pins, checkers, captures_only=False):
+        """Appends pushes, captures and en passant captures of every pawn of the given color
+
+        Args:
+            color (int): WHITE or BLACK.
+            moves_list (list): list the moves are appended to.
+            check_mask (int): squares the pawns may move to.
+            pins (dict): pinned piece square -> allowed squares.
+            checkers (int): bitboard of pieces giving check, None to skip en passant legality checks.
+            captures_only (bool, optional): True to push only pawns that promote. Defaults to False.
+        """
+        forward = -8 if color == WHITE else 8
+        start_row = 6 if color == WHITE else 1
+        promotion_row = 1 if color == WHITE else 6
+        occupancy = self.occupancy
+        enemies = self.color_occupancy[1 - color]
+        enpassant_bit = 1 << square_index(*self.enpassant_coord) if self.enpassant_coord else 0
+        for square in iterate_squares(self.piece_bitboards[6 * color + PAWN]):
+            start = SQUARE_COORDS[square]
+            allowed = check_mask & pins.get(square, FULL_BOARD)
+            push_square = square + forward
+            if not (occupancy >> push_square) & 1 and (not captures_only or start[0] == promotion_row):
+                if (allowed >> push_square) & 1:
+                    moves_list.append(Move(start, SQUARE_COORDS[push_square], self.board))
+                double_push_square = push_square + forward
+                if start[0] == start_row and not (occupancy >> double_push_square) & 1 \
+                        and (allowed >> double_push_square) & 1:
+                    moves_list.append(Move(start, SQUARE_COORDS[double_push_square], self.board))
+            attacks = PAWN_ATTACKS[color][square]
+            self.__add_moves(square, attacks & enemies & allowed, moves_list)
+            if attacks & enpassant_bit and (checkers is None or self.__enpassant_is_legal(square, color, checkers)):
+                moves_list.append(Move(start, self.enpassant_coord, self.board, is_enpassant_move=True))
+
+    def __enpassant_is_legal(self, start_square, color, checkers):
+        """Checks whether the en passant capture leaves the own king safe.
+
+        Two pawns leave the same rank at once, so pin rays alone are not enough here.
+
+        Args:
+            start_square (int): square index of the capturing pawn.
+            color (int): color of the capturing pawn.
+            checkers (int): bitboard of pieces giving check before the capture.
+
+        Returns:
+            Boolean: True when the capture is legal.
+        """
+        pieces = self.piece_bitboards
+        offset = 6 * (1 - color)
+        end_square = square_index(*self.enpassant_coord)
+        captured_bit = 1 << (start_square // 8 * 8 + end_square % 8)
+        if checkers & ~captured_bit & (pieces[offset + PAWN] | pieces[offset + KNIGHT]):
+            return False
+        king = pieces[6 * color + KING]
+        king_square = (king & -king).bit_length() - 1
+        occupancy = self.occupancy ^ (1 << start_square) ^ captured_bit | (1 << end_square)
+        diagonal = pieces[offset + BISHOP] | pieces[offset + QUEEN]
+        straight = pieces[offset + ROOK] | pieces[offset + QUEEN]
+        return not (bishop_attacks(king_square, occupancy) & diagonal or rook_attacks(king_square, occupancy) & straight)
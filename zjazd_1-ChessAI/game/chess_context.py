@@ -1,11 +1,15 @@
 import numpy as np
-from datetime import datetime
 from game.move import Move
+from game.zobrist import hash_position, hash_pawns, move_key_delta, pawn_key_delta, null_move_key_delta
+from game.evaluation import evaluate_material, evaluate_position, move_deltas
 
 
 class ChessGameContext:
     """Class for holding the game context and all board information.
     """
+    # When True every make_move/undo_move recomputes the incremental state from scratch and asserts equality.
+    consistency_checks = False
+
     def __init__(self):
         """Constructor for context class. Contains info about game state.
         """
@@ -29,34 +33,109 @@ class ChessGameContext:
         self.stalemate = False
         self.inCheck = False
         self.enpassant_coord = ()
+        self.enpassant_coord_log = []
+        self.zobrist_key_log = []
+        # (move, en passant square, Zobrist key, pawn key, material score, piece-square score) of every search move
+        self.search_undo_stack = []
+        self.first_move_number = 1
+        self.recompute_incremental_state()
         # Both below false to see random moves by both AIs
         self.player_one = True  # True when human plays white, false for AI
         self.player_two = False  # True when human plays white, false for AI
         self.human_turn = False
+        # GameRecorder receiving the moves made and taken back, None records nothing, e.g. in helper copies.
+        self.recorder = None
 
-    def __del__(self):
-        """Destructor
-        
-        Save gathered logs on exit.
+    def recompute_incremental_state(self):
+        """Computes the Zobrist key, pawn key and evaluation terms of the current board from scratch
+        """
+        self.zobrist_key = hash_position(self.board, self.white_to_move, self.enpassant_coord)
+        self.pawn_key = hash_pawns(self.board)
+        self.material_score = evaluate_material(self.board)
+        self.position_score = evaluate_position(self.board)
 
-        """ 
-        self.save_log_to_file()
+    def load_fen(self, fen):
+        """Sets up the position from a FEN string and clears the move log.
 
+        Castling rights and the halfmove clock are ignored, the game has no castling nor the fifty moves rule.
 
-    def save_log_to_file(self):
-        """Creates the log file with the data about the game movements
+        Args:
+            fen (str): position in Forsyth-Edwards Notation.
         """
-        log_lines = []
-        dt_string = "game_log_" + datetime.now().strftime("%d_%m_%Y_%H_%M_%S") + ".csv"
-        csv_file = open(dt_string, "a")
-        if len(self.moveLog) != 0:
-            for move in self.moveLog:
-                log_line = str(move.piece_moved) + "_" + str(move.move_chess_notation_id)
-                log_lines.append(log_line)
+        fields = fen.split()
+        rows = []
+        for fen_row in fields[0].split("/"):
+            row = []
+            for character in fen_row:
+                if character.isdigit():
+                    row.extend(["__"] * int(character))
+                else:
+                    row.append(("w" if character.isupper() else "b") + character.upper())
+            rows.append(row)
+        if len(rows) != 8 or any(len(row) != 8 for row in rows):
+            raise ValueError("Invalid FEN board: " + fields[0])
 
-        for element in log_lines:
-            csv_file.write(element + "\n")
-        csv_file.close()
+        for i in range(8):
+            for j in range(8):
+                self.board[i][j] = rows[i][j]
+                if rows[i][j] == "wK":
+                    self.white_king_location = (i, j)
+                elif rows[i][j] == "bK":
+                    self.black_king_location = (i, j)
+        self.white_to_move = len(fields) < 2 or fields[1] == "w"
+        if len(fields) > 3 and fields[3] != "-":
+            self.enpassant_coord = (Move.ranks_to_rows[fields[3][1]], Move.files_to_columns[fields[3][0]])
+        else:
+            self.enpassant_coord = ()
+        self.first_move_number = int(fields[5]) if len(fields) > 5 else 1
+        self.moveLog = []
+        self.enpassant_coord_log = []
+        self.zobrist_key_log = []
+        self.search_undo_stack = []
+        self.checkmate = False
+        self.stalemate = False
+        self.recompute_incremental_state()
+
+    def get_fen(self):
+        """Returns the current position in Forsyth-Edwards Notation
+
+        Returns:
+            str: FEN of the position, always without castling rights.
+        """
+        fen_rows = []
+        for row in self.board:
+            fen_row = ""
+            empty_squares = 0
+            for square in row:
+                if square == "__":
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    fen_row += str(empty_squares)
+                    empty_squares = 0
+                fen_row += square[1] if square[0] == "w" else square[1].lower()
+            if empty_squares:
+                fen_row += str(empty_squares)
+            fen_rows.append(fen_row)
+        enpassant = "-"
+        if self.enpassant_coord:
+            enpassant = Move.columns_to_files[self.enpassant_coord[1]] + Move.rows_to_ranks[self.enpassant_coord[0]]
+        started_with_white = self.white_to_move == (len(self.moveLog) % 2 == 0)
+        move_number = self.first_move_number + (len(self.moveLog) + (0 if started_with_white else 1)) // 2
+        return " ".join(["/".join(fen_rows), "w" if self.white_to_move else "b", "-", enpassant, "0",
+                         str(move_number)])
+
+    def copy_position(self):
+        """Returns a new context of the same class set up in the current position, without the move log.
+
+        The copy has no recorder, it is meant for searching away from the board shown on the screen.
+
+        Returns:
+            ChessGameContext: context in the same position.
+        """
+        game_context = type(self)()
+        game_context.load_fen(self.get_fen())
+        return game_context
 
     def make_move(self, move):
         """Performs a move and updates the board
@@ -64,7 +143,8 @@ class ChessGameContext:
         Args:
             move (Move): Move object.
         """
-        chess_notation_move = move.get_chess_notation()
+        self.enpassant_coord_log.append(self.enpassant_coord)
+        self.zobrist_key_log.append(self.zobrist_key)
         self.board[move.start_row][move.start_column] = "__"
         self.board[move.end_row][move.end_column] = move.piece_moved
         self.moveLog.append(move)
@@ -84,6 +164,15 @@ class ChessGameContext:
             self.enpassant_coord = ((move.start_row + move.end_row) // 2, move.start_column)
         else:
             self.enpassant_coord = ()
+        self.zobrist_key ^= move_key_delta(move, self.enpassant_coord_log[-1], self.enpassant_coord)
+        self.pawn_key ^= pawn_key_delta(move)
+        material_delta, position_delta = move_deltas(move)
+        self.material_score += material_delta
+        self.position_score += position_delta
+        if self.consistency_checks:
+            self.verify_incremental_state()
+        if self.recorder is not None:
+            self.recorder.record_move(move)
 
     def undo_move(self):
         """Undoes the last move from the move log
@@ -101,14 +190,147 @@ class ChessGameContext:
             if move.is_enpassant_move:
                 self.board[move.end_row][move.end_column] = "__"
                 self.board[move.start_row][move.end_column] = move.piece_captured
-                self.enpassant_coord = (move.end_row, move.end_column)
 
-            if move.piece_moved[1] == "P" and abs(move.start_row - move.end_row) == 2:
-                self.enpassant_coord = ()
+            self.enpassant_coord = self.enpassant_coord_log.pop()
+            self.zobrist_key = self.zobrist_key_log.pop()
+            self.pawn_key ^= pawn_key_delta(move)
+            material_delta, position_delta = move_deltas(move)
+            self.material_score -= material_delta
+            self.position_score -= position_delta
+            if self.consistency_checks:
+                self.verify_incremental_state()
+            if self.recorder is not None:
+                self.recorder.record_undo()
 
         self.checkmate = False
         self.stalemate = False
 
+    def make_search_move(self, move):
+        """Performs a move for the search.
+
+        Leaner than make_move: no chess notation nor move log entry. What undo_search_move needs is pushed on
+        the search undo stack, the king squares are restored from the move itself. There is no castling state
+        to keep, the game has no castling. A move made this way can only be taken back by undo_search_move.
+
+        Args:
+            move (Move): Move object.
+        """
+        enpassant_coord = self.enpassant_coord
+        self.search_undo_stack.append((move, enpassant_coord, self.zobrist_key, self.pawn_key, self.material_score,
+                                       self.position_score))
+        board = self.board
+        piece_moved = move.piece_moved
+        board[move.start_row][move.start_column] = "__"
+        board[move.end_row][move.end_column] = piece_moved[0] + "Q" if move.is_pawn_promotion else piece_moved
+        if move.is_enpassant_move:
+            board[move.start_row][move.end_column] = "__"
+        self.white_to_move = not self.white_to_move
+        if piece_moved[1] == "K":
+            if piece_moved[0] == "w":
+                self.white_king_location = (move.end_row, move.end_column)
+            else:
+                self.black_king_location = (move.end_row, move.end_column)
+            self.enpassant_coord = ()
+        elif piece_moved[1] == "P" and abs(move.start_row - move.end_row) == 2:
+            self.enpassant_coord = ((move.start_row + move.end_row) // 2, move.start_column)
+        else:
+            self.enpassant_coord = ()
+        self.zobrist_key ^= move_key_delta(move, enpassant_coord, self.enpassant_coord)
+        if piece_moved[1] == "P" or move.piece_captured[1] == "P":
+            self.pawn_key ^= pawn_key_delta(move)
+        material_delta, position_delta = move_deltas(move)
+        self.material_score += material_delta
+        self.position_score += position_delta
+        if self.consistency_checks:
+            self.verify_incremental_state()
+
+    def undo_search_move(self):
+        """Takes back the last move made by make_search_move.
+
+        Unlike undo_move the checkmate and stalemate flags are left alone, so after it they may describe
+        another position. They are only valid right after get_valid_moves, the search tells checkmate and
+        stalemate from the generated moves instead.
+        """
+        move, self.enpassant_coord, self.zobrist_key, self.pawn_key, self.material_score, self.position_score = \
+            self.search_undo_stack.pop()
+        board = self.board
+        piece_moved = move.piece_moved
+        board[move.start_row][move.start_column] = piece_moved
+        if move.is_enpassant_move:
+            board[move.end_row][move.end_column] = "__"
+            board[move.start_row][move.end_column] = move.piece_captured
+        else:
+            board[move.end_row][move.end_column] = move.piece_captured
+        self.white_to_move = not self.white_to_move
+        if piece_moved == "wK":
+            self.white_king_location = (move.start_row, move.start_column)
+        elif piece_moved == "bK":
+            self.black_king_location = (move.start_row, move.start_column)
+        if self.consistency_checks:
+            self.verify_incremental_state()
+
+    def make_null_move(self):
+        """Passes the turn to the opponent, used by the null move pruning of the search.
+
+        Pushes an entry without a move on the search undo stack, it is taken back by undo_null_move only.
+        """
+        self.search_undo_stack.append((None, self.enpassant_coord, self.zobrist_key, self.pawn_key,
+                                       self.material_score, self.position_score))
+        self.zobrist_key ^= null_move_key_delta(self.enpassant_coord)
+        self.enpassant_coord = ()
+        self.white_to_move = not self.white_to_move
+
+    def undo_null_move(self):
+        """Takes back the pass made by make_null_move
+        """
+        _, self.enpassant_coord, self.zobrist_key, _, _, _ = self.search_undo_stack.pop()
+        self.white_to_move = not self.white_to_move
+
+    def has_non_pawn_material(self):
+        """Checks whether the side to move has a piece other than pawns and the king
+
+        Returns:
+            bool: True when a knight, bishop, rook or queen of the side to move is on the board.
+        """
+        color = "w" if self.white_to_move else "b"
+        return any(piece[0] == color and piece[1] in "NBRQ" for row in self.board for piece in row)
+
+    def piece_count(self):
+        """Counts the pieces on the board, kings and pawns included
+
+        Returns:
+            int: number of occupied squares.
+        """
+        return sum(piece != "__" for row in self.board for piece in row)
+
+    def piece_squares(self):
+        """Lists the pieces on the board
+
+        Returns:
+            list: (piece, square index) of every piece, square index = row * 8 + column.
+        """
+        return [(piece, row * 8 + column) for row in range(8) for column in range(8)
+                for piece in (self.board[row][column],) if piece != "__"]
+
+    def material_signature(self):
+        """Returns the material on the board, e.g. KRvK for a king and rook against a lone black king
+
+        Returns:
+            str: white pieces, "v" and black pieces, strongest piece first.
+        """
+        pieces = [piece for piece, _ in self.piece_squares()]
+        return "v".join("".join(sorted((piece[1] for piece in pieces if piece[0] == color), key="KQRBNP".index))
+                        for color in "wb")
+
+    def verify_incremental_state(self):
+        """Recomputes the Zobrist key and evaluation terms from the board and asserts they match the stored ones
+        """
+        assert self.zobrist_key == hash_position(self.board, self.white_to_move, self.enpassant_coord), \
+            "Zobrist key out of sync"
+        assert self.pawn_key == hash_pawns(self.board), "Pawn key out of sync"
+        assert self.material_score == evaluate_material(self.board), "Material score out of sync"
+        assert self.position_score == evaluate_position(self.board), "Piece-square score out of sync"
+
     def get_valid_moves(self):
         """Returns the possible moves for a given chess piece.
 
@@ -119,12 +341,12 @@ class ChessGameContext:
         moves = self.get_possible_moves()
 
         for i in range(len(moves) - 1, -1, -1):
-            self.make_move(moves[i])
+            self.make_search_move(moves[i])
             self.white_to_move = not self.white_to_move
             if self.in_check():
                 moves.remove(moves[i])
             self.white_to_move = not self.white_to_move
-            self.undo_move()
+            self.undo_search_move()
 
         if len(moves) == 0:
             if self.in_check():
@@ -138,6 +360,14 @@ class ChessGameContext:
         self.enpassant_coord = temp_enpassant_coord
         return moves
 
+    def get_capture_moves(self):
+        """Returns the legal captures and promotions for the side to move
+
+        Returns:
+            list: list of legal captures and promotions.
+        """
+        return [move for move in self.get_valid_moves() if move.piece_captured != "__" or move.is_pawn_promotion]
+
     def in_check(self):
         """Checks whether the king is in the check position
 
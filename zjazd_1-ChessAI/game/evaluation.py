@@ -0,0 +1,326 @@
+"""Static evaluation terms kept up to date by the game context.
+
+Material is counted in pawns with the same values the AI uses. Piece-square tables are in centipawns and
+written from white's point of view with row 0 being the 8th rank, the same layout as the board; black
+uses the vertically mirrored table. Scores are white minus black. Tables tuned by tools.tune_evaluation
+are loaded from WEIGHTS_PATH at startup when the file exists.
+
+Pawn-structure terms (doubled, isolated and passed pawns) depend on the pawns only. They are not kept up to
+date move by move, the search caches them in a pawn hash table indexed by the pawn key of the position.
+
+Besides the terms of a single board, many positions can be scored at once: a batch is encoded as an
+(N, 64) int8 array of piece codes (see bitboard.PIECE_CODES) or as (N, 12, 64) int8 piece planes, and
+material plus piece-square terms of all of them come from one NumPy pass.
+"""
+import json
+import os
+import numpy as np
+from game.bitboard import PIECE_NAMES, EMPTY_SQUARE, PIECE_CODES, EMPTY_CODE
+
+PIECE_VALUES = {"K": 0, "Q": 10, "R": 5, "B": 3, "N": 3, "P": 1}
+DEFAULT_PIECE_SQUARE_TABLES = {
+    "P": ((0, 0, 0, 0, 0, 0, 0, 0),
+          (50, 50, 50, 50, 50, 50, 50, 50),
+          (10, 10, 20, 30, 30, 20, 10, 10),
+          (5, 5, 10, 25, 25, 10, 5, 5),
+          (0, 0, 0, 20, 20, 0, 0, 0),
+          (5, -5, -10, 0, 0, -10, -5, 5),
+          (5, 10, 10, -20, -20, 10, 10, 5),
+          (0, 0, 0, 0, 0, 0, 0, 0)),
+    "N": ((-50, -40, -30, -30, -30, -30, -40, -50),
+          (-40, -20, 0, 0, 0, 0, -20, -40),
+          (-30, 0, 10, 15, 15, 10, 0, -30),
+          (-30, 5, 15, 20, 20, 15, 5, -30),
+          (-30, 0, 15, 20, 20, 15, 0, -30),
+          (-30, 5, 10, 15, 15, 10, 5, -30),
+          (-40, -20, 0, 5, 5, 0, -20, -40),
+          (-50, -40, -30, -30, -30, -30, -40, -50)),
+    "B": ((-20, -10, -10, -10, -10, -10, -10, -20),
+          (-10, 0, 0, 0, 0, 0, 0, -10),
+          (-10, 0, 5, 10, 10, 5, 0, -10),
+          (-10, 5, 5, 10, 10, 5, 5, -10),
+          (-10, 0, 10, 10, 10, 10, 0, -10),
+          (-10, 10, 10, 10, 10, 10, 10, -10),
+          (-10, 5, 0, 0, 0, 0, 5, -10),
+          (-20, -10, -10, -10, -10, -10, -10, -20)),
+    "R": ((0, 0, 0, 0, 0, 0, 0, 0),
+          (5, 10, 10, 10, 10, 10, 10, 5),
+          (-5, 0, 0, 0, 0, 0, 0, -5),
+          (-5, 0, 0, 0, 0, 0, 0, -5),
+          (-5, 0, 0, 0, 0, 0, 0, -5),
+          (-5, 0, 0, 0, 0, 0, 0, -5),
+          (-5, 0, 0, 0, 0, 0, 0, -5),
+          (0, 0, 0, 5, 5, 0, 0, 0)),
+    "Q": ((-20, -10, -10, -5, -5, -10, -10, -20),
+          (-10, 0, 0, 0, 0, 0, 0, -10),
+          (-10, 0, 5, 5, 5, 5, 0, -10),
+          (-5, 0, 5, 5, 5, 5, 0, -5),
+          (0, 0, 5, 5, 5, 5, 0, -5),
+          (-10, 5, 5, 5, 5, 5, 0, -10),
+          (-10, 0, 5, 0, 0, 0, 0, -10),
+          (-20, -10, -10, -5, -5, -10, -10, -20)),
+    "K": ((-30, -40, -40, -50, -50, -40, -40, -30),
+          (-30, -40, -40, -50, -50, -40, -40, -30),
+          (-30, -40, -40, -50, -50, -40, -40, -30),
+          (-30, -40, -40, -50, -50, -40, -40, -30),
+          (-20, -30, -30, -40, -40, -30, -30, -20),
+          (-10, -20, -20, -20, -20, -20, -20, -10),
+          (20, 20, 0, 0, 0, 0, 20, 20),
+          (20, 30, 10, 0, 0, 10, 30, 20)),
+}
+CENTIPAWNS = 100
+WEIGHTS_PATH = "books/evaluation_weights.json"
+MOP_UP_EDGE = 50  # centipawns for every step the losing king is pushed away from the centre
+MOP_UP_KINGS = 20  # centipawns for every step the winning king comes closer to the losing one
+DOUBLED_PAWN_PENALTY = 15  # centipawns for every pawn behind another pawn of its side on the same file
+ISOLATED_PAWN_PENALTY = 15  # centipawns for a pawn without pawns of its side on the neighbouring files
+# Centipawns for a passed pawn by the number of rows it has advanced from its starting row.
+PASSED_PAWN_BONUS = (5, 10, 20, 35, 60, 100)
+
+
+def load_weights(path=WEIGHTS_PATH):
+    """Reads the piece-square tables written by tools.tune_evaluation
+
+    The material of the evaluation stays in the whole pawns of PIECE_VALUES, which the move ordering uses
+    too. The difference to the tuned piece values is added to every square of the piece's table, so the
+    evaluation scores positions exactly as the tuned weights do.
+
+    Args:
+        path (str, optional): weights file, None for none. Defaults to WEIGHTS_PATH.
+
+    Returns:
+        dict: piece letter -> 8 rows of 8 values in centipawns, None when the file is missing.
+
+    Raises:
+        ValueError: when a table of the file is not 8 by 8.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as weights_file:
+        weights = json.load(weights_file)
+    tables = {}
+    for piece, rows in weights["piece_square_tables"].items():
+        if len(rows) != 8 or any(len(row) != 8 for row in rows):
+            raise ValueError("Invalid piece-square table of %s in %s" % (piece, path))
+        offset = int(weights["piece_values"][piece]) - PIECE_VALUES[piece] * CENTIPAWNS
+        tables[piece] = tuple(tuple(int(value) + offset for value in row) for row in rows)
+    return tables
+
+
+PIECE_SQUARE_TABLES = dict(DEFAULT_PIECE_SQUARE_TABLES, **(load_weights() or {}))
+
+
+def _signed_tables():
+    """Builds signed lookups used by the incremental updates
+
+    Returns:
+        tuple: piece name -> signed material value, piece name -> 64 signed piece-square values.
+    """
+    material = {}
+    position = {}
+    for piece in PIECE_NAMES:
+        sign = 1 if piece[0] == "w" else -1
+        table = PIECE_SQUARE_TABLES[piece[1]]
+        material[piece] = sign * PIECE_VALUES[piece[1]]
+        position[piece] = tuple(sign * table[row if sign == 1 else 7 - row][column]
+                                for row in range(8) for column in range(8))
+    return material, position
+
+
+SIGNED_MATERIAL, SIGNED_PIECE_SQUARE = _signed_tables()
+# SCORE_TABLE[piece code, square] - signed material and piece-square score in centipawns, 0 for the empty square.
+SCORE_TABLE = np.array([[SIGNED_MATERIAL[piece] * CENTIPAWNS + SIGNED_PIECE_SQUARE[piece][square]
+                         for square in range(64)] for piece in PIECE_NAMES] + [[0] * 64], dtype=np.int32)
+SQUARES = np.arange(64)
+# Piece names sorted for the vectorized lookup of their codes.
+_SORTED_NAMES = np.array(sorted(PIECE_CODES))
+_SORTED_CODES = np.array([PIECE_CODES[piece] for piece in sorted(PIECE_CODES)], dtype=np.int8)
+
+
+def evaluate_material(board):
+    """Counts the material balance from scratch
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+
+    Returns:
+        int: white material minus black material in pawns.
+    """
+    return sum(SIGNED_MATERIAL[piece] for row in board for piece in row if piece != EMPTY_SQUARE)
+
+
+def evaluate_position(board):
+    """Sums the piece-square tables from scratch
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+
+    Returns:
+        int: white minus black piece-square score in centipawns.
+    """
+    score = 0
+    for row in range(8):
+        for column in range(8):
+            piece = board[row][column]
+            if piece != EMPTY_SQUARE:
+                score += SIGNED_PIECE_SQUARE[piece][row * 8 + column]
+    return score
+
+
+def move_deltas(move):
+    """Returns how the move changes both evaluation terms
+
+    Args:
+        move (Move): Move object.
+
+    Returns:
+        tuple: (material delta in pawns, piece-square delta in centipawns).
+    """
+    start_square = move.start_row * 8 + move.start_column
+    end_square = move.end_row * 8 + move.end_column
+    placed_piece = move.piece_moved[0] + "Q" if move.is_pawn_promotion else move.piece_moved
+    material = SIGNED_MATERIAL[placed_piece] - SIGNED_MATERIAL[move.piece_moved]
+    position = SIGNED_PIECE_SQUARE[placed_piece][end_square] - SIGNED_PIECE_SQUARE[move.piece_moved][start_square]
+    if move.piece_captured != EMPTY_SQUARE:
+        captured_square = move.start_row * 8 + move.end_column if move.is_enpassant_move else end_square
+        material -= SIGNED_MATERIAL[move.piece_captured]
+        position -= SIGNED_PIECE_SQUARE[move.piece_captured][captured_square]
+    return material, position
+
+
+def evaluate_pawn_structure(board):
+    """Scores the doubled, isolated and passed pawns of both sides from scratch
+
+    A pawn is passed when no opposing pawn stands ahead of it on its own or a neighbouring file.
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+
+    Returns:
+        int: white minus black pawn-structure score in centipawns.
+    """
+    pawns = {"wP": [], "bP": []}
+    files = {"wP": [0] * 10, "bP": [0] * 10}  # pawns per file, files shifted by one with an empty file each side
+    # Row of the rearmost pawn per file, a pawn is passed when it has reached or gone past those of the opponent.
+    white_rearmost = [-1] * 8
+    black_rearmost = [8] * 8
+    for row in range(8):
+        board_row = board[row]
+        if "wP" not in board_row and "bP" not in board_row:
+            continue
+        for column in range(8):
+            piece = board_row[column]
+            if piece == "wP" or piece == "bP":
+                pawns[piece].append((row, column))
+                files[piece][column + 1] += 1
+                if piece == "wP":
+                    white_rearmost[column] = max(white_rearmost[column], row)
+                else:
+                    black_rearmost[column] = min(black_rearmost[column], row)
+
+    score = 0
+    for piece, sign in (("wP", 1), ("bP", -1)):
+        own_files = files[piece]
+        score -= sign * DOUBLED_PAWN_PENALTY * sum(count - 1 for count in own_files if count > 1)
+        for row, column in pawns[piece]:
+            if own_files[column] == 0 and own_files[column + 2] == 0:
+                score -= sign * ISOLATED_PAWN_PENALTY
+            neighbours = slice(max(column - 1, 0), column + 2)
+            if piece == "wP" and min(black_rearmost[neighbours]) >= row:
+                score += PASSED_PAWN_BONUS[6 - row]
+            elif piece == "bP" and max(white_rearmost[neighbours]) <= row:
+                score -= PASSED_PAWN_BONUS[row - 1]
+    return score
+
+
+def evaluate_mop_up(winning_king, losing_king):
+    """Scores the progress of a won endgame against a lone king, which is mated on the edge of the board
+
+    Args:
+        winning_king (int): square index of the winning side's king.
+        losing_king (int): square index of the lone king.
+
+    Returns:
+        int: bonus of the winning side in centipawns.
+    """
+    winning_row, winning_column = divmod(winning_king, 8)
+    losing_row, losing_column = divmod(losing_king, 8)
+    edge_distance = max(3 - losing_row, losing_row - 4) + max(3 - losing_column, losing_column - 4)
+    king_distance = abs(winning_row - losing_row) + abs(winning_column - losing_column)
+    return MOP_UP_EDGE * edge_distance + MOP_UP_KINGS * (14 - king_distance)
+
+
+def encode_boards(boards):
+    """Encodes boards as piece codes
+
+    Args:
+        boards (list): boards of game contexts (8x8 lists or arrays of piece names).
+
+    Returns:
+        numpy.ndarray: (N, 64) int8 piece codes, square index = row * 8 + column.
+    """
+    names = np.asarray(boards, dtype=_SORTED_NAMES.dtype).reshape(-1, 64)
+    return _SORTED_CODES[np.searchsorted(_SORTED_NAMES, names)]
+
+
+def piece_planes(codes):
+    """Converts piece codes to one plane per piece
+
+    Args:
+        codes (numpy.ndarray): (N, 64) piece codes.
+
+    Returns:
+        numpy.ndarray: (N, 12, 64) int8, plane p square s is 1 when piece PIECE_NAMES[p] stands on s.
+    """
+    return (codes[:, None, :] == np.arange(len(PIECE_NAMES))[None, :, None]).astype(np.int8)
+
+
+def evaluate_batch(codes):
+    """Scores many positions encoded as piece codes in one pass
+
+    Args:
+        codes (numpy.ndarray): (N, 64) piece codes.
+
+    Returns:
+        numpy.ndarray: (N,) material plus piece-square score of every position in pawns, white minus black,
+            the score_board of the search without the checkmate, stalemate and pawn-structure scores.
+    """
+    return SCORE_TABLE[codes, SQUARES].sum(axis=1) / CENTIPAWNS
+
+
+def evaluate_planes(planes):
+    """Scores many positions encoded as piece planes in one pass
+
+    Args:
+        planes (numpy.ndarray): (N, 12, 64) piece planes.
+
+    Returns:
+        numpy.ndarray: (N,) the same scores as evaluate_batch.
+    """
+    return np.einsum("nps,ps->n", planes, SCORE_TABLE[:EMPTY_CODE], dtype=np.int64) / CENTIPAWNS
+
+
+def encode_moves(board, moves):
+    """Encodes the positions after each of the moves of a board without making them
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+        moves (list): Move objects of the side to move.
+
+    Returns:
+        numpy.ndarray: (len(moves), 64) piece codes.
+    """
+    codes = np.repeat(encode_boards([board]), len(moves), axis=0)
+    rows = np.arange(len(moves))
+    start_squares = np.array([move.start_row * 8 + move.start_column for move in moves], dtype=np.intp)
+    end_squares = np.array([move.end_row * 8 + move.end_column for move in moves], dtype=np.intp)
+    placed = np.array([PIECE_CODES[move.piece_moved[0] + "Q" if move.is_pawn_promotion else move.piece_moved]
+                       for move in moves], dtype=np.int8)
+    enpassant = [(row, move.start_row * 8 + move.end_column) for row, move in enumerate(moves)
+                 if move.is_enpassant_move]
+    codes[rows, start_squares] = EMPTY_CODE
+    codes[rows, end_squares] = placed
+    if enpassant:
+        enpassant_rows, captured_squares = zip(*enpassant)
+        codes[list(enpassant_rows), list(captured_squares)] = EMPTY_CODE
+    return codes
@@ -0,0 +1,265 @@
+"""Append-only binary record of played games and its memory-mapped reader.
+
+All games go to one pair of files. The move file holds one fixed-width record per move, written as the
+moves are played: move id (2 bytes), moved piece (1) and captured piece (1). Taking a move back appends an
+undo record instead of rewriting the file. The index file next to it (same name, .idx) holds one record
+per game: number of the game's first move record (8 bytes) and the time the game started (8). A game ends
+where the next one starts. Games always start from the initial position, the game has no other setup.
+
+By default every record is flushed as soon as it is written: moves of a played game are rare and 4 bytes
+each, and a game left idle (the human thinking, the window left open) must not keep its last moves in the
+buffer, so a crash loses no move that was made. Writers appending many finished games at once pass a flush
+interval in seconds, or None to flush only when the recorder is closed. A record cut short by a crash is
+dropped when the file is opened again.
+
+Usage (from the game directory):
+    python3 -m game.game_record [game_records.bin]     prints every game as a list of moves
+"""
+import os
+import struct
+import sys
+import time
+import numpy as np
+from game.bitboard import PIECE_CODES
+from game.move import Move
+
+GAME_RECORD_PATH = "game_records.bin"
+FLUSH_INTERVAL = 0.0  # seconds between flushes of the buffered records, 0 flushes every record
+BUFFER_SIZE = 64 * 1024
+# Move id (2), moved piece (1), captured piece (1), little endian.
+MOVE_RECORD = struct.Struct("<HBB")
+MOVE_DTYPE = np.dtype([("move_id", "<u2"), ("piece_moved", "u1"), ("piece_captured", "u1")])
+# First move record of the game (8), start time in seconds since the epoch (8), little endian.
+GAME_RECORD = struct.Struct("<Qd")
+GAME_DTYPE = np.dtype([("first_move", "<u8"), ("started", "<f8")])
+UNDO_MOVE_ID = 0xFFFF  # record taking the previous move of the game back
+
+
+def index_path(path):
+    """Returns the index file of a move file
+
+    Args:
+        path (str): move file.
+
+    Returns:
+        str: index file, the move file with the .idx extension.
+    """
+    return os.path.splitext(path)[0] + ".idx"
+
+
+def move_id_notation(move_id):
+    """Returns the coordinate notation of a move id
+
+    Args:
+        move_id (int): id of the move, see Move.move_ids.
+
+    Returns:
+        str: e.g. e2e4.
+    """
+    start_row, start_column, end_row, end_column = (move_id // 1000, move_id // 100 % 10, move_id // 10 % 10,
+                                                    move_id % 10)
+    return (Move.columns_to_files[start_column] + Move.rows_to_ranks[start_row] +
+            Move.columns_to_files[end_column] + Move.rows_to_ranks[end_row])
+
+
+def open_records(path, record_size):
+    """Opens a record file for appending, dropping a record cut short by a crash
+
+    Args:
+        path (str): record file.
+        record_size (int): bytes of one record.
+
+    Returns:
+        tuple: (buffered file, number of whole records in it).
+    """
+    record_file = open(path, "ab", buffering=BUFFER_SIZE)
+    records = record_file.tell() // record_size
+    if record_file.tell() != records * record_size:
+        record_file.truncate(records * record_size)
+        record_file.seek(records * record_size)
+    return record_file, records
+
+
+class GameRecorder:
+    """Streams the moves of played games into the record files.
+
+    A game context sends its moves here when the recorder is set as its recorder attribute.
+    """
+    def __init__(self, path=GAME_RECORD_PATH, flush_interval=FLUSH_INTERVAL):
+        """Constructor
+
+        Args:
+            path (str, optional): move file, created when missing. Defaults to GAME_RECORD_PATH.
+            flush_interval (float, optional): seconds between flushes, checked when a record is written,
+                None to flush only on flush and close. Defaults to FLUSH_INTERVAL.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.move_file, self.move_count = open_records(path, MOVE_RECORD.size)
+        self.index_file, self.game_count = open_records(index_path(path), GAME_RECORD.size)
+        self.game_started = None
+        self.last_flush = time.perf_counter()
+
+    def start_game(self):
+        """Starts a new game, it is written to the index with its first move so empty games leave no trace
+        """
+        self.game_started = time.time()
+
+    def record_move(self, move):
+        """Appends a move of the current game
+
+        Args:
+            move (Move): Move object.
+        """
+        if self.game_started is not None:
+            self.index_file.write(GAME_RECORD.pack(self.move_count, self.game_started))
+            self.game_count += 1
+            self.game_started = None
+        self.move_file.write(MOVE_RECORD.pack(move.move_id, PIECE_CODES[move.piece_moved],
+                                              PIECE_CODES[move.piece_captured]))
+        self.move_count += 1
+        self.__flush_if_due()
+
+    def record_undo(self):
+        """Appends the taking back of the last move of the current game
+        """
+        if self.game_started is not None or self.game_count == 0:
+            # Nothing of the current game was written yet.
+            return
+        self.move_file.write(MOVE_RECORD.pack(UNDO_MOVE_ID, 0, 0))
+        self.move_count += 1
+        self.__flush_if_due()
+
+    def flush(self):
+        """Writes the buffered records to the files
+        """
+        self.move_file.flush()
+        self.index_file.flush()
+        self.last_flush = time.perf_counter()
+
+    def close(self):
+        """Flushes and closes the files
+        """
+        if not self.move_file.closed:
+            self.flush()
+            self.move_file.close()
+            self.index_file.close()
+
+    def __flush_if_due(self):
+        """Flushes when the flush interval has passed since the last flush
+        """
+        if self.flush_interval is not None and time.perf_counter() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+
+class GameArchive:
+    """Read-only view of the record files. Missing or empty files give an empty archive.
+
+    The records are memory-mapped as numpy structured arrays, so millions of moves can be iterated or
+    counted without reading the files into memory nor parsing anything.
+    """
+    def __init__(self, path=GAME_RECORD_PATH):
+        """Constructor
+
+        Args:
+            path (str, optional): move file. Defaults to GAME_RECORD_PATH.
+        """
+        self.path = path
+        self.moves = self.__map(path, MOVE_DTYPE)
+        self.games = self.__map(index_path(path), GAME_DTYPE)
+
+    def __len__(self):
+        """Returns the number of games
+
+        Returns:
+            int: number of games.
+        """
+        return len(self.games)
+
+    def close(self):
+        """Drops the maps of the files
+        """
+        self.moves = np.zeros(0, MOVE_DTYPE)
+        self.games = np.zeros(0, GAME_DTYPE)
+
+    def game_records(self, game_number):
+        """Returns the records of one game, undo records included
+
+        Args:
+            game_number (int): number of the game, from 0.
+
+        Returns:
+            numpy.ndarray: MOVE_DTYPE records mapped from the file.
+        """
+        first_move = int(self.games[game_number]["first_move"])
+        if game_number + 1 < len(self.games):
+            return self.moves[first_move:int(self.games[game_number + 1]["first_move"])]
+        return self.moves[first_move:]
+
+    def move_ids(self, game_number):
+        """Returns the moves of one game with the taken back moves removed
+
+        Args:
+            game_number (int): number of the game, from 0.
+
+        Returns:
+            list: ids of the moves, see Move.move_ids.
+        """
+        move_ids = []
+        for move_id in self.game_records(game_number)["move_id"].tolist():
+            if move_id == UNDO_MOVE_ID:
+                if move_ids:
+                    move_ids.pop()
+            else:
+                move_ids.append(move_id)
+        return move_ids
+
+    def replay(self, game_number, context_class=None):
+        """Plays one game again move by move
+
+        Args:
+            game_number (int): number of the game, from 0.
+            context_class (type, optional): class of the game context. Defaults to None, BitboardGameContext.
+
+        Yields:
+            tuple: (game context in the position before the move, Move about to be made on it). The move is
+                made when the next item is asked for.
+
+        Raises:
+            ValueError: when a recorded move is not valid in its position.
+        """
+        if context_class is None:
+            # Imported here, the context modules do not depend on the record.
+            from game.bitboard_context import BitboardGameContext
+            context_class = BitboardGameContext
+        game_context = context_class()
+        for move_id in self.move_ids(game_number):
+            move = next((move for move in game_context.get_valid_moves() if move.move_id == move_id), None)
+            if move is None:
+                raise ValueError("Invalid move %s in game %d" % (move_id_notation(move_id), game_number))
+            yield game_context, move
+            game_context.make_move(move)
+
+    @staticmethod
+    def __map(path, dtype):
+        """Maps the whole records of a file
+
+        Args:
+            path (str): record file.
+            dtype (numpy.dtype): record type.
+
+        Returns:
+            numpy.ndarray: records, a memory map unless the file is missing or holds no whole record.
+        """
+        records = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        if records == 0:
+            return np.zeros(0, dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(records,))
+
+
+if __name__ == '__main__':
+    # python3 -m game.game_record [game_records.bin]
+    archive = GameArchive(sys.argv[1] if len(sys.argv) > 1 else GAME_RECORD_PATH)
+    print("# %d games, %d move records" % (len(archive), len(archive.moves)))
+    for number in range(len(archive)):
+        print(" ".join(move_id_notation(move_id) for move_id in archive.move_ids(number)) + " *")
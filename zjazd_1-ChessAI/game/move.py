@@ -1,10 +1,18 @@
 class Move:
     """Move class containg info about a possible moves on a board for a given piece
+
+    Moves are created by the thousand during the search, so they have fixed slots instead of a dictionary and
+    take their ids from a shared table. The chess notation is only built when asked for.
     """
+    __slots__ = ("start_row", "start_column", "end_row", "end_column", "piece_moved", "piece_captured",
+                 "is_pawn_promotion", "is_enpassant_move", "move_chess_notation_id", "move_id")
     ranks_to_rows = {"1": 7, "2": 6, "3": 5, "4": 4, "5": 3, "6": 2, "7": 1, "8": 0}
     rows_to_ranks = {v: k for k, v in ranks_to_rows.items()}
     files_to_columns = {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7}
     columns_to_files = {v: k for k, v in files_to_columns.items()}
+    # move_ids[start row][start column][end row][end column], ints above 256 would be allocated for every move.
+    move_ids = [[[[start_row * 1000 + start_column * 100 + end_row * 10 + end_column for end_column in range(8)]
+                  for end_row in range(8)] for start_column in range(8)] for start_row in range(8)]
 
     def __init__(self, start_square, end_square, board, is_enpassant_move=False):
         """Constructor
@@ -15,23 +23,23 @@ class Move:
             board (matrix 2x2): board of the game from game context
             is_enpassant_move (bool, optional): Info if move is en passant. Defaults to False.
         """
-        self.start_row = start_square[0]
-        self.start_column = start_square[1]
-        self.end_row = end_square[0]
-        self.end_column = end_square[1]
-        self.piece_moved = board[self.start_row][self.start_column]
-        self.piece_captured = board[self.end_row][self.end_column]
-        self.is_pawn_promotion = False
+        start_row, start_column = start_square
+        end_row, end_column = end_square
+        self.start_row = start_row
+        self.start_column = start_column
+        self.end_row = end_row
+        self.end_column = end_column
+        piece_moved = board[start_row][start_column]
+        self.piece_moved = piece_moved
+        self.piece_captured = board[end_row][end_column]
+        self.is_pawn_promotion = (piece_moved == "wP" and end_row == 0) or (piece_moved == "bP" and end_row == 7)
         self.move_chess_notation_id = ""
 
-        if (self.piece_moved == "wP" and self.end_row == 0) or (self.piece_moved == "bP" and self.end_row == 7):
-            self.isPawnPromotion = True
-
         self.is_enpassant_move = is_enpassant_move
-        if self.is_enpassant_move:
-            self.piece_captured = "wP" if self.piece_moved == "bP" else "bP"
+        if is_enpassant_move:
+            self.piece_captured = "wP" if piece_moved == "bP" else "bP"
 
-        self.move_id = self.start_row * 1000 + self.start_column * 100 + self.end_row * 10 + self.end_column
+        self.move_id = Move.move_ids[start_row][start_column][end_row][end_column]
 
     def __eq__(self, other):
         """Equal operation override.
@@ -0,0 +1,116 @@
+"""Zobrist keys for hashing chess positions.
+
+A position key is the XOR of one random 64-bit number per (piece, square), one for the side to move and
+one for the en passant file, so making a move only has to XOR the few numbers it changes. The pawn key XORs
+the numbers of the pawns only, it changes when a pawn moves or is taken and indexes the pawn hash table.
+"""
+import random
+from game.bitboard import PIECE_NAMES, EMPTY_SQUARE
+
+ZOBRIST_SEED = 20220101
+
+_generator = random.Random(ZOBRIST_SEED)
+PIECE_KEYS = {piece: tuple(_generator.getrandbits(64) for _ in range(64)) for piece in PIECE_NAMES}
+BLACK_TO_MOVE_KEY = _generator.getrandbits(64)
+ENPASSANT_KEYS = tuple(_generator.getrandbits(64) for _ in range(8))
+
+
+def hash_position(board, white_to_move, enpassant_coord):
+    """Computes the key of a position from scratch
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+        white_to_move (bool): True when white is to move.
+        enpassant_coord (tuple): en passant square or empty tuple.
+
+    Returns:
+        int: 64-bit position key.
+    """
+    key = 0
+    for row in range(8):
+        for column in range(8):
+            piece = board[row][column]
+            if piece != EMPTY_SQUARE:
+                key ^= PIECE_KEYS[piece][row * 8 + column]
+    if not white_to_move:
+        key ^= BLACK_TO_MOVE_KEY
+    if enpassant_coord:
+        key ^= ENPASSANT_KEYS[enpassant_coord[1]]
+    return key
+
+
+def hash_pawns(board):
+    """Computes the pawn key of a position from scratch
+
+    Args:
+        board (matrix 8x8): board of the game from game context.
+
+    Returns:
+        int: 64-bit key of the pawns of both sides.
+    """
+    key = 0
+    for row in range(8):
+        for column in range(8):
+            piece = board[row][column]
+            if piece[1] == "P":
+                key ^= PIECE_KEYS[piece][row * 8 + column]
+    return key
+
+
+def move_key_delta(move, previous_enpassant_coord, enpassant_coord):
+    """Returns the value to XOR into the position key when the move is made
+
+    Args:
+        move (Move): Move object.
+        previous_enpassant_coord (tuple): en passant square before the move or empty tuple.
+        enpassant_coord (tuple): en passant square after the move or empty tuple.
+
+    Returns:
+        int: key delta.
+    """
+    start_square = move.start_row * 8 + move.start_column
+    end_square = move.end_row * 8 + move.end_column
+    placed_piece = move.piece_moved[0] + "Q" if move.is_pawn_promotion else move.piece_moved
+    delta = PIECE_KEYS[move.piece_moved][start_square] ^ PIECE_KEYS[placed_piece][end_square] ^ BLACK_TO_MOVE_KEY
+    if move.piece_captured != EMPTY_SQUARE:
+        captured_square = move.start_row * 8 + move.end_column if move.is_enpassant_move else end_square
+        delta ^= PIECE_KEYS[move.piece_captured][captured_square]
+    if previous_enpassant_coord:
+        delta ^= ENPASSANT_KEYS[previous_enpassant_coord[1]]
+    if enpassant_coord:
+        delta ^= ENPASSANT_KEYS[enpassant_coord[1]]
+    return delta
+
+
+def pawn_key_delta(move):
+    """Returns the value to XOR into the pawn key when the move is made or taken back
+
+    Args:
+        move (Move): Move object.
+
+    Returns:
+        int: pawn key delta, 0 when the move neither moves nor takes a pawn.
+    """
+    delta = 0
+    if move.piece_moved[1] == "P":
+        delta = PIECE_KEYS[move.piece_moved][move.start_row * 8 + move.start_column]
+        if not move.is_pawn_promotion:
+            delta ^= PIECE_KEYS[move.piece_moved][move.end_row * 8 + move.end_column]
+    if move.piece_captured[1] == "P":
+        captured_row = move.start_row if move.is_enpassant_move else move.end_row
+        delta ^= PIECE_KEYS[move.piece_captured][captured_row * 8 + move.end_column]
+    return delta
+
+
+def null_move_key_delta(previous_enpassant_coord):
+    """Returns the value to XOR into the position key when the side to move passes
+
+    Args:
+        previous_enpassant_coord (tuple): en passant square before the pass or empty tuple.
+
+    Returns:
+        int: key delta.
+    """
+    if previous_enpassant_coord:
+        return BLACK_TO_MOVE_KEY ^ ENPASSANT_KEYS[previous_enpassant_coord[1]]
+    return BLACK_TO_MOVE_KEY
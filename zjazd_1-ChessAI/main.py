@@ -2,7 +2,11 @@ from views.window import MAX_FPS
 from utilities.event import EventHandler
 from views.window import Window
 from views.view_handler import ViewHandler
+from views.chess_game_view import ChessGameView
+import logging
 import pygame
+import sys
+import time
 
 """
     ChessAI by Pawel Iwinski & Cezary Graban
@@ -11,9 +15,14 @@ import pygame
 if __name__ == '__main__':
     """Main game function
     """
+    start_time = time.perf_counter()
+    # Startup and view switch times are reported on the console.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     pygame.init()
+    # The AI searches in a background thread, a short switch interval keeps the frames coming while it thinks.
+    sys.setswitchinterval(0.001)
     game_main_window = Window()
-    game_view = ViewHandler()
+    game_view = ViewHandler(start_time)
     clock = pygame.time.Clock()
 
     # valid_moves = game_view.views[1].game_context.get_valid_moves()
@@ -28,6 +37,11 @@ if __name__ == '__main__':
                 EventHandler.mouse_board_process(event, game_view)
 
         game_view.draw_view()
+        EventHandler.ai_process(game_view)
 
         clock.tick(MAX_FPS)
-        pygame.display.flip()
+        game_view.update_display()
+
+    EventHandler.search_worker.stop()
+    if ChessGameView.game_recorder is not None:
+        ChessGameView.game_recorder.close()
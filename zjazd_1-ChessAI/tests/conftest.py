@@ -0,0 +1,7 @@
+"""Makes the game modules importable when pytest is run from anywhere, the way main.py runs from the game
+directory.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
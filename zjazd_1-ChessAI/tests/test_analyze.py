@@ -0,0 +1,42 @@
+"""Headless analysis of lost positions through the CSV and UCI front ends of tools.analyze.
+"""
+import csv
+import io
+import pytest
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+from tools.analyze import analyze_file, run_uci, uci_notation
+
+# Black is not mated yet but every move runs into a mate.
+LOST_FEN = "2k5/4Q3/7R/8/8/8/5K2/8 b - - 0 1"
+
+
+@pytest.fixture
+def legal_moves():
+    game_context = BitboardGameContext()
+    game_context.load_fen(LOST_FEN)
+    return {uci_notation(move) for move in game_context.get_valid_moves()}
+
+
+@pytest.fixture(autouse=True)
+def no_book(monkeypatch):
+    monkeypatch.setattr(AI, "USE_OPENING_BOOK", False)
+
+
+def test_csv_row_of_lost_position(legal_moves):
+    output = io.StringIO()
+    assert analyze_file(io.StringIO(LOST_FEN + "\n"), output, depth=2, workers=1) == 1
+    row = list(csv.DictReader(io.StringIO(output.getvalue())))[0]
+    assert row["best_move"] in legal_moves
+    assert float(row["score"]) == -AI.CHECKMATE_SCORE
+    assert row["depth"] == "2"
+    assert row["principal_variation"].split()[0] == row["best_move"]
+
+
+def test_uci_bestmove_of_lost_position(legal_moves):
+    output = io.StringIO()
+    run_uci(io.StringIO("position fen %s\ngo depth 2\n" % LOST_FEN), output)
+    lines = output.getvalue().splitlines()
+    assert lines[-1].split()[0] == "bestmove"
+    assert lines[-1].split()[1] in legal_moves
+    assert any(line.startswith("info depth 2 score mate -") for line in lines)
@@ -0,0 +1,25 @@
+"""Game record files written while a game is played.
+"""
+import os
+from game.bitboard_context import BitboardGameContext
+from game.game_record import GameRecorder, GameArchive, MOVE_RECORD, GAME_RECORD, index_path
+
+
+def test_moves_reach_the_file_before_close(tmp_path):
+    path = str(tmp_path / "records.bin")
+    recorder = GameRecorder(path)
+    game_context = BitboardGameContext()
+    game_context.recorder = recorder
+    recorder.start_game()
+    for _ in range(3):
+        game_context.make_move(game_context.get_valid_moves()[0])
+    game_context.undo_move()
+    # Nothing more is written while the game sits idle, so what is on disk now is all a crash would keep.
+    assert os.path.getsize(path) == 4 * MOVE_RECORD.size
+    assert os.path.getsize(index_path(path)) == GAME_RECORD.size
+    recorder.close()
+
+    archive = GameArchive(path)
+    assert len(archive) == 1
+    assert len(archive.move_ids(0)) == 2
+    archive.close()
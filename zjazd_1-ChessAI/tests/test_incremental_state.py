@@ -0,0 +1,115 @@
+"""Random make and undo sequences with the consistency checks of the game context switched on.
+
+Every make and undo recomputes the Zobrist key, pawn key and evaluation terms from scratch and asserts they
+equal the incremental ones, so a wrong delta fails the test at the move that caused it.
+"""
+import random
+import pytest
+from game.chess_context import ChessGameContext
+from game.bitboard_context import BitboardGameContext
+
+# (context class, random games per position) - the numpy context checks every move tried by get_valid_moves
+# too, slowly, so it plays fewer games.
+CONTEXT_GAMES = ((BitboardGameContext, 8), (ChessGameContext, 1))
+# (FEN, moves of a random game) - the start position, promotions with and without captures, en passant.
+POSITIONS = (
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1", 60),
+    ("1n4k1/P6P/8/8/8/8/p6p/1N4K1 w - - 0 1", 20),
+    ("4k3/2p1p3/8/1P1P1P2/8/8/8/4K3 b - - 0 1", 20),
+    ("4k3/8/8/8/3p1p2/8/2P1P1P1/4K3 w - - 0 1", 20),
+)
+SEARCH_PLIES = 3  # moves made with make_search_move after every logged move
+
+
+def special_move_first(moves, generator):
+    """Picks a random move, a promotion or en passant capture when there is one half of the time
+
+    Args:
+        moves (list): legal moves.
+        generator (random.Random): random numbers.
+
+    Returns:
+        Move: chosen move.
+    """
+    special_moves = [move for move in moves if move.is_pawn_promotion or move.is_enpassant_move]
+    if special_moves and generator.random() < 0.5:
+        return generator.choice(special_moves)
+    return generator.choice(moves)
+
+
+def state(game_context):
+    """Returns everything the incremental updates touch
+
+    Args:
+        game_context (GameContext): context of the game
+
+    Returns:
+        tuple: FEN, Zobrist key, pawn key, material and piece-square scores.
+    """
+    return (game_context.get_fen(), game_context.zobrist_key, game_context.pawn_key, game_context.material_score,
+            game_context.position_score)
+
+
+def search_excursion(game_context, generator, counts):
+    """Makes a few search moves and null moves and takes them back
+
+    Args:
+        game_context (GameContext): context of the game
+        generator (random.Random): random numbers.
+        counts (dict): move kinds made so far, updated.
+    """
+    before = state(game_context)
+    for _ in range(SEARCH_PLIES):
+        moves = game_context.get_valid_moves()
+        if not moves:
+            break
+        if not game_context.in_check() and generator.random() < 0.25:
+            game_context.make_null_move()
+            counts["null"] += 1
+            continue
+        move = special_move_first(moves, generator)
+        game_context.make_search_move(move)
+        count_move(move, counts)
+    while game_context.search_undo_stack:
+        if game_context.search_undo_stack[-1][0] is None:
+            game_context.undo_null_move()
+        else:
+            game_context.undo_search_move()
+    assert state(game_context) == before
+
+
+def count_move(move, counts):
+    """Counts the special moves
+
+    Args:
+        move (Move): Move object.
+        counts (dict): move kinds made so far, updated.
+    """
+    if move.is_pawn_promotion:
+        counts["promotion"] += 1
+    if move.is_enpassant_move:
+        counts["enpassant"] += 1
+
+
+@pytest.mark.parametrize("context_class, games", CONTEXT_GAMES)
+def test_random_games_keep_incremental_state(context_class, games):
+    generator = random.Random(2022)
+    counts = {"promotion": 0, "enpassant": 0, "null": 0}
+    for fen, plies in POSITIONS:
+        for _ in range(games):
+            game_context = context_class()
+            game_context.consistency_checks = True
+            game_context.load_fen(fen)
+            start = state(game_context)
+            for _ in range(plies):
+                search_excursion(game_context, generator, counts)
+                moves = game_context.get_valid_moves()
+                if not moves:
+                    break
+                move = special_move_first(moves, generator)
+                game_context.make_move(move)
+                count_move(move, counts)
+            while game_context.moveLog:
+                game_context.undo_move()
+            assert state(game_context) == start
+    assert counts["promotion"] > 0 and counts["enpassant"] > 0 and counts["null"] > 0
@@ -0,0 +1,44 @@
+"""Root splitting search in worker processes started with spawn, which inherit nothing from the test.
+"""
+import multiprocessing
+import threading
+import time
+import pytest
+import artificial_intelligence.SmartMoveFinder as AI
+from artificial_intelligence.parallel_search import find_move_parallel
+from game.bitboard_context import BitboardGameContext
+
+# King and rook against king, worth a bitbase win when the bitbases are probed and a rook otherwise.
+ROOK_ENDGAME_FEN = "8/8/8/4k3/8/8/8/R3K3 w - - 0 1"
+
+
+@pytest.fixture(autouse=True)
+def spawn_workers():
+    start_method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method("spawn", force=True)
+    yield
+    multiprocessing.set_start_method(start_method, force=True)
+    AI.stop_event.clear()
+
+
+def test_workers_use_the_settings_of_the_caller(monkeypatch):
+    monkeypatch.setattr(AI, "USE_ENDGAME_BITBASES", False)
+    game_context = BitboardGameContext()
+    game_context.load_fen(ROOK_ENDGAME_FEN)
+    find_move_parallel(game_context, game_context.get_valid_moves(), 2, 2)
+    assert AI.completed_depth == 2
+    assert AI.search_score < AI.BITBASE_WIN_SCORE
+
+
+def test_stop_event_interrupts_the_workers():
+    game_context = BitboardGameContext()
+    valid_moves = game_context.get_valid_moves()
+    found = []
+    search = threading.Thread(target=lambda: found.append(find_move_parallel(game_context, valid_moves, 2,
+                                                                             AI.MAX_DEPTH)), daemon=True)
+    search.start()
+    time.sleep(3)
+    AI.stop_event.set()
+    search.join(30)
+    assert not search.is_alive()
+    assert found[0] in valid_moves
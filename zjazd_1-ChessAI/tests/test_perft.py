@@ -0,0 +1,17 @@
+"""Move generator regression gate: the perft reference counts of tools.perft at shallow depths.
+"""
+import pytest
+from game.chess_context import ChessGameContext
+from game.bitboard_context import BitboardGameContext
+from tools.perft import run_reference_suite
+
+# The numpy context is much slower, it is checked one ply less deep.
+MAX_DEPTHS = ((BitboardGameContext, 4), (ChessGameContext, 3))
+
+
+@pytest.mark.parametrize("context_class, max_depth", MAX_DEPTHS)
+def test_reference_counts(context_class, max_depth):
+    results = run_reference_suite(context_class, max_depth)
+    assert results
+    for result in results:
+        assert result["nodes"] == result["expected"], "%s depth %d" % (result["name"], result["depth"])
@@ -0,0 +1,24 @@
+"""Searches of positions with a known outcome.
+"""
+import pytest
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+
+# Positions where the side to move is not mated yet but loses to a mate whatever it plays.
+LOST_POSITIONS = ("2k5/4Q3/7R/8/8/8/5K2/8 b - - 0 1", "7k/8/8/1R6/8/6Q1/8/5K2 b - - 0 1")
+
+
+@pytest.mark.parametrize("fen", LOST_POSITIONS)
+@pytest.mark.parametrize("depth", (2, 3))
+def test_lost_position_still_returns_a_move(fen, depth, monkeypatch):
+    monkeypatch.setattr(AI, "DEPTH", depth)
+    monkeypatch.setattr(AI, "USE_OPENING_BOOK", False)
+    game_context = BitboardGameContext()
+    game_context.load_fen(fen)
+    valid_moves = game_context.get_valid_moves()
+    assert valid_moves
+    move = AI.find_best_move(game_context, list(valid_moves), workers=1)
+    assert move in valid_moves
+    assert AI.search_score == -AI.CHECKMATE_SCORE
+    assert AI.completed_depth == depth
+    assert AI.principal_variation[0] == move
@@ -0,0 +1,322 @@
+"""Headless analysis of FEN positions, nothing here imports pygame.
+
+Every line of the input file holds one FEN, empty lines and lines starting with # are skipped. Each position
+is searched with find_best_move to a fixed depth or for a time and one CSV row per position is written with
+the best move, the score for the side to move, the nodes, the completed depth, the time and the principal
+variation. Rows are written as soon as a position is done, so a long file can be followed while it runs.
+
+With --uci the tool speaks a subset of the UCI protocol over stdin/stdout instead: uci, isready, ucinewgame,
+position (startpos or fen, followed by moves), go (depth, movetime, wtime/btime/winc/binc, infinite), stop
+and quit. Pawns always promote to a queen and there is no castling, so only such moves are understood.
+
+Usage (from the game directory):
+    python3 -m tools.analyze positions.fen --depth 4
+    python3 -m tools.analyze positions.fen --time 1.5 --output analysis.csv
+    python3 -m tools.analyze --uci
+"""
+import argparse
+import csv
+import sys
+import threading
+import time
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+from tools.perft import START_FEN
+
+CSV_HEADER = ["fen", "best_move", "score", "nodes", "depth", "seconds", "principal_variation"]
+MOVES_TO_GO = 30  # a clock search may use the remaining time divided by this, plus half the increment
+
+
+def read_positions(fen_file):
+    """Yields the positions of a file one by one, without reading it whole
+
+    Args:
+        fen_file (file): open text file with one FEN per line.
+
+    Yields:
+        str: FEN of the next position.
+    """
+    for line in fen_file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def uci_notation(move):
+    """Returns the move in the long algebraic notation of UCI
+
+    Args:
+        move (Move): Move object.
+
+    Returns:
+        str: e.g. e2e4, or e7e8q for a promotion.
+    """
+    return move.get_chess_notation() + ("q" if move.is_pawn_promotion else "")
+
+
+def analyze_position(game_context, depth=None, time_budget=None, workers=AI.WORKERS, progress_callback=None):
+    """Searches the position of a context
+
+    Args:
+        game_context (GameContext): context of the game, left in the same position.
+        depth (int, optional): depth to search, AI.DEPTH when None. Defaults to None.
+        time_budget (float, optional): seconds the search may take, overrides the depth. Defaults to None.
+        workers (int, optional): processes splitting the root moves. Defaults to AI.WORKERS.
+        progress_callback (function, optional): see AI.find_move_iterative_deepening. Defaults to None.
+
+    Returns:
+        dict: the fields of CSV_HEADER, best move and principal variation in UCI notation.
+    """
+    fen = game_context.get_fen()
+    valid_moves = game_context.get_valid_moves()
+    result = {"fen": fen, "best_move": None, "score": None, "nodes": 0, "depth": 0, "seconds": 0.0,
+              "principal_variation": ""}
+    if not valid_moves:
+        result["score"] = -AI.CHECKMATE_SCORE if game_context.checkmate else AI.STALEMATE_SCORE
+        return result
+
+    default_depth = AI.DEPTH
+    AI.DEPTH = depth or default_depth
+    start_time = time.perf_counter()
+    try:
+        best_move = AI.find_best_move(game_context, valid_moves, time_budget, None, workers, progress_callback)
+    finally:
+        AI.DEPTH = default_depth
+    result["seconds"] = time.perf_counter() - start_time
+    result["nodes"] = AI.nodes_searched
+    if best_move is None:
+        # Only a stop request before depth 1 completed leaves the search without a move, any legal move is
+        # sent then, with no score, depth nor principal variation.
+        result["best_move"] = uci_notation(valid_moves[0])
+        return result
+    result["best_move"] = uci_notation(best_move)
+    result["score"] = AI.search_score
+    result["depth"] = AI.completed_depth
+    result["principal_variation"] = " ".join(uci_notation(move) for move in AI.principal_variation)
+    return result
+
+
+def analyze_file(fen_file, output_file, depth=None, time_budget=None, workers=AI.WORKERS):
+    """Analyzes every position of a FEN file and writes one CSV row per position
+
+    Args:
+        fen_file (file): open text file with one FEN per line.
+        output_file (file): open text file for the CSV rows.
+        depth (int, optional): depth to search, AI.DEPTH when None. Defaults to None.
+        time_budget (float, optional): seconds per position, overrides the depth. Defaults to None.
+        workers (int, optional): processes splitting the root moves. Defaults to AI.WORKERS.
+
+    Returns:
+        int: number of positions analyzed.
+    """
+    writer = csv.writer(output_file)
+    writer.writerow(CSV_HEADER)
+    game_context = BitboardGameContext()
+    positions = 0
+    for fen in read_positions(fen_file):
+        game_context.load_fen(fen)
+        result = analyze_position(game_context, depth, time_budget, workers)
+        if result["score"] is not None:
+            result["score"] = "%.2f" % result["score"]
+        result["seconds"] = "%.3f" % result["seconds"]
+        writer.writerow([result[column] for column in CSV_HEADER])
+        output_file.flush()
+        positions += 1
+    return positions
+
+
+class UciEngine:
+    """Answers UCI commands, the search of a go command runs in its own thread so stop can interrupt it.
+
+    Only stop and quit interrupt a running search. The commands changing the position wait until it has
+    sent its move, uci and isready are answered at once.
+    """
+    def __init__(self, output=sys.stdout):
+        """Constructor
+
+        Args:
+            output (file, optional): where the answers are written. Defaults to sys.stdout.
+        """
+        self.output = output
+        self.game_context = BitboardGameContext()
+        self.thread = None
+
+    def handle(self, line):
+        """Executes one command line
+
+        Args:
+            line (str): command as read from the GUI.
+
+        Returns:
+            bool: False after quit, True otherwise.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        if command == "uci":
+            self.__send("id name NAI ChessAI")
+            self.__send("id author NAI")
+            self.__send("uciok")
+        elif command == "isready":
+            self.__send("readyok")
+        elif command == "ucinewgame":
+            self.wait()
+            AI.transposition_table.clear()
+            AI.move_orderer.clear()
+            self.game_context.load_fen(START_FEN)
+        elif command == "position":
+            self.wait()
+            self.__set_position(tokens[1:])
+        elif command == "go":
+            self.wait()
+            self.__go(tokens[1:])
+        elif command == "stop":
+            self.__stop()
+        elif command == "quit":
+            self.__stop()
+            return False
+        return True
+
+    def wait(self):
+        """Waits until the running search has sent its best move
+        """
+        if self.thread is not None:
+            self.thread.join()
+        self.thread = None
+
+    def __send(self, text):
+        """Writes one answer line
+
+        Args:
+            text (str): answer without the line end.
+        """
+        self.output.write(text + "\n")
+        self.output.flush()
+
+    def __set_position(self, tokens):
+        """Sets up the position of a position command
+
+        Args:
+            tokens (list): words after "position".
+        """
+        if tokens and tokens[0] == "fen":
+            fen_end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            self.game_context.load_fen(" ".join(tokens[1:fen_end]))
+            tokens = tokens[fen_end:]
+        else:
+            self.game_context.load_fen(START_FEN)
+            tokens = tokens[1:]
+        for notation in tokens[1:]:
+            move = next((move for move in self.game_context.get_valid_moves() if uci_notation(move) == notation),
+                        None)
+            if move is None:
+                self.__send("info string invalid move " + notation)
+                return
+            self.game_context.make_move(move)
+
+    def __go(self, tokens):
+        """Starts the search of a go command
+
+        Args:
+            tokens (list): words after "go".
+        """
+        options = {}
+        for name, value in zip(tokens, tokens[1:] + [""]):
+            if value.lstrip("-").isdigit():
+                options[name] = int(value)
+        depth = options.get("depth")
+        time_budget = None
+        if "infinite" in tokens:
+            depth = AI.MAX_DEPTH
+        elif "movetime" in options:
+            time_budget = options["movetime"] / 1000
+        elif "wtime" in options or "btime" in options:
+            side = "w" if self.game_context.white_to_move else "b"
+            remaining = options.get(side + "time", 0) / 1000
+            time_budget = max(remaining / MOVES_TO_GO + options.get(side + "inc", 0) / 2000, 0.01)
+        search_context = self.game_context.copy_position()
+        self.thread = threading.Thread(target=self.__search, args=(search_context, depth, time_budget), daemon=True)
+        self.thread.start()
+
+    def __search(self, game_context, depth, time_budget):
+        """Thread entry point, searches and sends the best move
+
+        Args:
+            game_context (GameContext): copy of the game context owned by the thread.
+            depth (int): depth to search, None for AI.DEPTH.
+            time_budget (float): seconds the search may take, None for the depth limit.
+        """
+        start_time = time.perf_counter()
+
+        def send_info(completed_depth, best_move, score, nodes, principal_variation):
+            milliseconds = int((time.perf_counter() - start_time) * 1000)
+            if abs(score) >= AI.CHECKMATE_SCORE:
+                moves_to_mate = (len(principal_variation) + 1) // 2
+                score_text = "mate %d" % (moves_to_mate if score > 0 else -moves_to_mate)
+            else:
+                score_text = "cp %d" % round(score * 100)
+            self.__send("info depth %d score %s nodes %d time %d pv %s" % (
+                completed_depth, score_text, nodes, milliseconds,
+                " ".join(uci_notation(move) for move in principal_variation)))
+
+        result = analyze_position(game_context, depth, time_budget, 1, send_info)
+        self.__send("bestmove " + (result["best_move"] or "0000"))
+
+    def __stop(self):
+        """Stops the running search, which still sends its best move, and waits for it
+        """
+        if self.thread is not None and self.thread.is_alive():
+            AI.stop_event.set()
+            self.thread.join()
+            AI.stop_event.clear()
+        self.thread = None
+
+
+def run_uci(input_file=sys.stdin, output=sys.stdout):
+    """Reads UCI commands until quit or the end of the input
+
+    Args:
+        input_file (file, optional): where the commands come from. Defaults to sys.stdin.
+        output (file, optional): where the answers are written. Defaults to sys.stdout.
+    """
+    engine = UciEngine(output)
+    for line in input_file:
+        if not engine.handle(line):
+            return
+    # End of the input, let a running search finish and send its move.
+    engine.wait()
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Headless analysis of FEN positions")
+    parser.add_argument("positions", nargs="?", help="file with one FEN per line, - for stdin")
+    parser.add_argument("--depth", type=int, default=AI.DEPTH, help="depth to search")
+    parser.add_argument("--time", type=float, help="seconds per position, overrides the depth")
+    parser.add_argument("--workers", type=int, default=AI.WORKERS, help="processes splitting the root moves")
+    parser.add_argument("--output", help="CSV file for the results, stdout by default")
+    parser.add_argument("--book", action="store_true", help="play book moves instead of searching them")
+    parser.add_argument("--uci", action="store_true", help="speak UCI over stdin/stdout")
+    args = parser.parse_args()
+    AI.USE_OPENING_BOOK = args.book
+
+    if args.uci:
+        run_uci()
+        return
+    if args.positions is None:
+        parser.error("a positions file is needed without --uci")
+    fen_file = sys.stdin if args.positions == "-" else open(args.positions)
+    output_file = sys.stdout if args.output is None else open(args.output, "w", newline="")
+    try:
+        analyze_file(fen_file, output_file, args.depth, args.time, args.workers)
+    finally:
+        if fen_file is not sys.stdin:
+            fen_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark of the vectorized batch evaluation against the per-position loop.
+
+Positions come from random games (or from a game record with --record). They are scored three ways and
+the scores are checked to be equal:
+    loop      evaluate_material and evaluate_position board by board, pure Python
+    codes     encode_boards and evaluate_batch over the (N, 64) piece codes
+    planes    piece_planes and evaluate_planes over the (N, 12, 64) piece planes (from the codes)
+The children of every position are scored too, once by making each move and reading the incremental scores
+the way score_board does and once with encode_moves and evaluate_batch. The pawn-structure terms are left
+out of both, the batch evaluation has none.
+
+Usage (from the game directory):
+    python3 -m tools.batch_evaluation --positions 20000
+    python3 -m tools.batch_evaluation --record game_records.bin
+"""
+import argparse
+import random
+import time
+import numpy as np
+from game.bitboard_context import BitboardGameContext
+from game.evaluation import (CENTIPAWNS, evaluate_material, evaluate_position, encode_boards, encode_moves,
+                             evaluate_batch, piece_planes, evaluate_planes)
+from game.game_record import GameArchive
+
+DEFAULT_POSITIONS = 20000
+MAX_PLIES = 120  # a random game is started again after this many plies
+
+
+def random_positions(count, seed=0):
+    """Collects positions of random games
+
+    Args:
+        count (int): number of positions.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        list: (FEN, board copy, legal moves) of every position.
+    """
+    random.seed(seed)
+    positions = []
+    game_context = BitboardGameContext()
+    while len(positions) < count:
+        valid_moves = game_context.get_valid_moves()
+        if not valid_moves or len(game_context.moveLog) >= MAX_PLIES:
+            game_context = BitboardGameContext()
+            continue
+        positions.append((game_context.get_fen(), [list(row) for row in game_context.board], valid_moves))
+        game_context.make_move(random.choice(valid_moves))
+    return positions
+
+
+def recorded_positions(path, count):
+    """Collects the positions of recorded games
+
+    Args:
+        path (str): move file of the game record.
+        count (int): maximum number of positions.
+
+    Returns:
+        list: (FEN, board copy, legal moves) of every position.
+    """
+    positions = []
+    archive = GameArchive(path)
+    for game_number in range(len(archive)):
+        for game_context, _ in archive.replay(game_number):
+            positions.append((game_context.get_fen(), [list(row) for row in game_context.board],
+                              game_context.get_valid_moves()))
+            if len(positions) >= count:
+                return positions
+    return positions
+
+
+def timed(function, *args):
+    """Calls a function and measures it
+
+    Args:
+        function (function): function to call.
+        *args: its arguments.
+
+    Returns:
+        tuple: (result, seconds).
+    """
+    start_time = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start_time
+
+
+def score_children_one_by_one(positions):
+    """Scores the children of every position by making the moves, the way the search does
+
+    Args:
+        positions (list): (FEN, board, legal moves) of the positions.
+
+    Returns:
+        tuple: (score of every child position after position, seconds spent making moves and scoring,
+            setting the positions up is not counted).
+    """
+    scores = []
+    seconds = 0.0
+    game_context = BitboardGameContext()
+    for fen, _, moves in positions:
+        game_context.load_fen(fen)
+        start_time = time.perf_counter()
+        for move in moves:
+            game_context.make_search_move(move)
+            scores.append(game_context.material_score + game_context.position_score / CENTIPAWNS)
+            game_context.undo_search_move()
+        seconds += time.perf_counter() - start_time
+    return np.array(scores), seconds
+
+
+def run_benchmark(positions):
+    """Scores the positions and their children both ways
+
+    Args:
+        positions (list): (FEN, board, legal moves) of the positions.
+
+    Returns:
+        dict: seconds of every way, positions and children counted, and whether the scores agreed.
+    """
+    boards = [board for _, board, _ in positions]
+    loop_scores, loop_seconds = timed(lambda: np.array([evaluate_material(board) + evaluate_position(board) /
+                                                        CENTIPAWNS for board in boards]))
+    codes, encode_seconds = timed(encode_boards, boards)
+    code_scores, codes_seconds = timed(evaluate_batch, codes)
+    planes, planes_encode_seconds = timed(piece_planes, codes)
+    plane_scores, planes_seconds = timed(evaluate_planes, planes)
+    child_scores, children_seconds = score_children_one_by_one(positions)
+    batch_child_scores, batch_children_seconds = timed(
+        lambda: np.concatenate([evaluate_batch(encode_moves(board, moves)) for _, board, moves in positions]))
+    return {"positions": len(boards), "children": len(child_scores),
+            "loop": loop_seconds, "encode": encode_seconds, "codes": codes_seconds,
+            "planes_encode": planes_encode_seconds, "planes": planes_seconds,
+            "children_one_by_one": children_seconds, "children_batch": batch_children_seconds,
+            "agree": bool(np.allclose(loop_scores, code_scores) and np.allclose(loop_scores, plane_scores)
+                          and np.allclose(child_scores, batch_child_scores))}
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Batch evaluation benchmark")
+    parser.add_argument("--positions", type=int, default=DEFAULT_POSITIONS, help="number of positions")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the random games")
+    parser.add_argument("--record", help="take the positions from this game record instead of random games")
+    args = parser.parse_args()
+    if args.record:
+        positions = recorded_positions(args.record, args.positions)
+    else:
+        positions = random_positions(args.positions, args.seed)
+
+    result = run_benchmark(positions)
+    count = result["positions"]
+    print("%d positions, %d children, scores %s" % (count, result["children"],
+                                                     "agree" if result["agree"] else "DIFFER"))
+    print("per-position loop      %8.3f s  %10.0f positions/s" % (result["loop"], count / result["loop"]))
+    print("encode (N, 64)         %8.3f s" % result["encode"])
+    print("evaluate codes         %8.3f s  %10.0f positions/s" % (result["codes"], count / result["codes"]))
+    print("encode (N, 12, 64)     %8.3f s" % result["planes_encode"])
+    print("evaluate planes        %8.3f s  %10.0f positions/s" % (result["planes"], count / result["planes"]))
+    print("children one by one    %8.3f s  %10.0f children/s" % (result["children_one_by_one"],
+                                                                  result["children"] / result["children_one_by_one"]))
+    print("children batch         %8.3f s  %10.0f children/s" % (result["children_batch"],
+                                                                  result["children"] / result["children_batch"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Builds the endgame bitbases probed by the search by retrograde analysis.
+
+Every position of an endgame (side to move, strong king, weak king and piece square) is an element of
+NumPy arrays. The moves of every position are generated once, for all positions at a time, as pairs of
+(position, position after the move). The analysis then starts from the checkmates and goes backwards:
+a position with the strong side to move is won when one of its moves leads to a lost position, a position
+with the weak side to move is lost when it is checkmate or all of its moves lead to won positions. Rounds
+are repeated until nothing changes, every remaining position is a draw.
+
+The game promotes to a queen only, so a pawn reaching the last rank is looked up in the KQK result, which
+is why KQK is built first. Illegal positions are left as draws, the search never meets them.
+
+Usage (from the game directory):
+    python3 -m tools.build_bitbases
+    python3 -m tools.build_bitbases -o books/endgame_bitbases.bin
+"""
+import argparse
+import time
+import numpy as np
+from artificial_intelligence.endgame_bitbase import ENDGAMES, DEFAULT_BITBASE_PATH
+from game.bitboard import WHITE, KING_ATTACKS, PAWN_ATTACKS, ROOK_RAYS, BISHOP_RAYS, BETWEEN
+
+SIDE_POSITIONS = 64 * 64 * 64  # positions with one side to move
+SQUARES = np.arange(64)
+
+
+def bitboard_table(bitboards):
+    """Converts a table of bitboards to a boolean array
+
+    Args:
+        bitboards (tuple): bitboard per index.
+
+    Returns:
+        numpy.ndarray: table[index, square] True when the square is set in the index's bitboard.
+    """
+    return np.array([[bitboard >> square & 1 for square in range(64)] for bitboard in bitboards], dtype=bool)
+
+
+KING_MOVES = bitboard_table(KING_ATTACKS)
+PAWN_CAPTURES = bitboard_table(PAWN_ATTACKS[WHITE])
+ROOK_LINES = bitboard_table(ROOK_RAYS)
+BISHOP_LINES = bitboard_table(BISHOP_RAYS)
+# BETWEEN_SQUARES[first, second, square] True when the square lies strictly between two aligned squares.
+BETWEEN_SQUARES = bitboard_table(BETWEEN).reshape(64, 64, 64)
+PIECE_LINES = {"R": ROOK_LINES, "Q": ROOK_LINES | BISHOP_LINES}
+
+
+def piece_attacks(piece, piece_square, target, blocker):
+    """Checks whether the strong side's piece attacks squares, for many positions at a time
+
+    Args:
+        piece (str): P, R or Q.
+        piece_square (numpy.ndarray): square of the piece.
+        target (numpy.ndarray): attacked square.
+        blocker (numpy.ndarray): square of the only piece that can block a line, the strong king.
+
+    Returns:
+        numpy.ndarray: True where the target is attacked.
+    """
+    if piece == "P":
+        return PAWN_CAPTURES[piece_square, target]
+    return PIECE_LINES[piece][piece_square, target] & ~BETWEEN_SQUARES[piece_square, target, blocker]
+
+
+def generate_moves(piece, promotion_results=None):
+    """Generates the moves of every position of an endgame
+
+    Positions are numbered strong_king * 4096 + weak_king * 64 + piece, for each side to move.
+
+    Args:
+        piece (str): the strong side's piece, P, R or Q.
+        promotion_results (numpy.ndarray, optional): KQK positions with the weak side to move that the strong
+            side wins, needed for pawns. Defaults to None.
+
+    Returns:
+        dict: legal positions for both sides, checks of the weak king, strong moves as (from, to) arrays, weak
+            moves likewise (to is SIDE_POSITIONS for a capture of the piece), and the strong positions won by
+            a promotion.
+    """
+    strong_king, weak_king, piece_square = (index.reshape(-1) for index in np.indices((64, 64, 64)))
+    positions = np.arange(SIDE_POSITIONS)
+    legal = (strong_king != weak_king) & (piece_square != strong_king) & (piece_square != weak_king) \
+        & ~KING_MOVES[strong_king, weak_king]
+    if piece == "P":
+        legal &= (piece_square >= 8) & (piece_square < 56)
+    weak_in_check = legal & piece_attacks(piece, piece_square, weak_king, strong_king)
+    strong_legal = legal & ~weak_in_check
+    strong_from, strong_to, weak_from, weak_to = [], [], [], []
+    promotion_wins = np.zeros(SIDE_POSITIONS, dtype=bool)
+
+    for square in SQUARES:
+        # The strong king moves to the square.
+        moves = strong_legal & KING_MOVES[strong_king, square] & (piece_square != square) \
+            & ~KING_MOVES[square, weak_king]
+        strong_from.append(positions[moves])
+        strong_to.append(square * 4096 + weak_king[moves] * 64 + piece_square[moves])
+        # The weak king moves to the square, taking the piece when it stands there undefended.
+        moves = legal & KING_MOVES[weak_king, square] & ~KING_MOVES[square, strong_king] \
+            & ~piece_attacks(piece, piece_square, square, strong_king)
+        weak_from.append(positions[moves])
+        weak_to.append(np.where(piece_square[moves] == square, SIDE_POSITIONS,
+                                strong_king[moves] * 4096 + square * 64 + piece_square[moves]))
+        if piece == "P":
+            continue
+        # The piece slides to the square, no king may stand on the way.
+        moves = strong_legal & PIECE_LINES[piece][piece_square, square] & (square != strong_king) \
+            & (square != weak_king) & ~BETWEEN_SQUARES[piece_square, square, strong_king] \
+            & ~BETWEEN_SQUARES[piece_square, square, weak_king]
+        strong_from.append(positions[moves])
+        strong_to.append(strong_king[moves] * 4096 + weak_king[moves] * 64 + square)
+
+    if piece == "P":
+        # Pawns move towards row 0, one square or two from their starting row.
+        single = piece_square - 8
+        moves = strong_legal & (single != strong_king) & (single != weak_king)
+        double = piece_square - 16
+        double_moves = moves & (piece_square >= 48) & (double != strong_king) & (double != weak_king)
+        promotions = moves & (single < 8)
+        promotion_wins[promotions] = promotion_results[strong_king[promotions] * 4096 + weak_king[promotions] * 64
+                                                       + single[promotions]]
+        moves &= ~promotions
+        strong_from += [positions[moves], positions[double_moves]]
+        strong_to += [strong_king[moves] * 4096 + weak_king[moves] * 64 + single[moves],
+                      strong_king[double_moves] * 4096 + weak_king[double_moves] * 64 + double[double_moves]]
+
+    return {"strong_legal": strong_legal, "weak_legal": legal, "weak_in_check": weak_in_check,
+            "strong_moves": (np.concatenate(strong_from), np.concatenate(strong_to)),
+            "weak_moves": (np.concatenate(weak_from), np.concatenate(weak_to)), "promotion_wins": promotion_wins}
+
+
+def retrograde_analysis(piece, promotion_results=None):
+    """Solves an endgame of a king and a piece against a lone king
+
+    Args:
+        piece (str): the strong side's piece, P, R or Q.
+        promotion_results (numpy.ndarray, optional): see generate_moves. Defaults to None.
+
+    Returns:
+        tuple: (positions won with the strong side to move, positions lost with the weak side to move, rounds),
+            both arrays indexed by strong_king * 4096 + weak_king * 64 + piece.
+    """
+    moves = generate_moves(piece, promotion_results)
+    strong_from, strong_to = moves["strong_moves"]
+    weak_from, weak_to = moves["weak_moves"]
+    weak_move_counts = np.bincount(weak_from, minlength=SIDE_POSITIONS)
+    checkmates = moves["weak_legal"] & moves["weak_in_check"] & (weak_move_counts == 0)
+    # One more element for the positions after the piece is taken, never won.
+    strong_wins = np.zeros(SIDE_POSITIONS + 1, dtype=bool)
+    strong_wins[:SIDE_POSITIONS] = moves["promotion_wins"]
+    weak_losses = checkmates.copy()
+    rounds = 0
+    while True:
+        rounds += 1
+        strong_wins[strong_from[weak_losses[strong_to]]] = True
+        won_moves = np.bincount(weak_from[strong_wins[weak_to]], minlength=SIDE_POSITIONS)
+        losses = checkmates | ((weak_move_counts > 0) & (won_moves == weak_move_counts) & moves["weak_legal"])
+        if np.array_equal(losses, weak_losses):
+            break
+        weak_losses = losses
+    return strong_wins[:SIDE_POSITIONS] & moves["strong_legal"], weak_losses, rounds
+
+
+def build_bitbases(output):
+    """Solves every endgame of ENDGAMES and writes the bitbase file
+
+    Args:
+        output (str): bitbase file to write.
+
+    Returns:
+        dict: per endgame the won positions with either side to move, the legal positions and the rounds.
+    """
+    results = {}
+    summary = {}
+    for piece in sorted({endgame[1] for endgame in ENDGAMES}, key="QRP".index):
+        strong_wins, weak_losses, rounds = retrograde_analysis(piece, results.get("Q", (None, None))[1])
+        results[piece] = (strong_wins, weak_losses)
+        summary["K%svK" % piece] = {"strong_to_move_wins": int(strong_wins.sum()),
+                                    "weak_to_move_losses": int(weak_losses.sum()), "rounds": rounds}
+    with open(output, "wb") as bitbase_file:
+        for endgame in ENDGAMES:
+            # Side to move first, see endgame_bitbase.bitbase_index.
+            bitbase_file.write(np.packbits(np.concatenate(results[endgame[1]])).tobytes())
+    return summary
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Endgame bitbase builder")
+    parser.add_argument("-o", "--output", default=DEFAULT_BITBASE_PATH, help="bitbase file to write")
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    summary = build_bitbases(args.output)
+    for endgame, counts in summary.items():
+        print("%s: %d wins with the strong side to move, %d losses with the weak side to move, %d rounds" % (
+            endgame, counts["strong_to_move_wins"], counts["weak_to_move_losses"], counts["rounds"]))
+    print("written to %s in %.1f s" % (args.output, time.perf_counter() - start_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Compiles an opening book from recorded games.
+
+Accepted inputs:
+    *.bin    game records written by game.game_record.GameRecorder (the GUI and tools.tournament --record)
+    *.csv    game logs written by older versions of the game, one "wP_e2e4" move per line
+    other    PGN in standard algebraic notation or move lists in coordinate notation ("e2e4 e7e5 ..."),
+             games are separated by result tokens (1-0, 0-1, 1/2-1/2, *)
+
+The game has no castling and promotes to a queen only, a game is followed until a move it can not play.
+Every (position, move) pair met in the first plies of the games becomes a record weighted by how often
+it was played.
+
+Usage (from the game directory):
+    python3 -m tools.build_book books/opening_lines.pgn game_records.bin -o books/opening_book.bin --plies 16
+"""
+import argparse
+import re
+from artificial_intelligence.opening_book import RECORD, DEFAULT_BOOK_PATH
+from game.bitboard_context import BitboardGameContext
+from game.game_record import GameArchive, move_id_notation
+
+DEFAULT_PLIES = 16
+MAX_WEIGHT = 65535
+RESULT_TOKENS = ("1-0", "0-1", "1/2-1/2", "*")
+COORDINATE_PATTERN = re.compile(r"^([a-h][1-8][a-h][1-8])([qrbn]?)$")
+SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(=?[NBRQ])?$")
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+\.+")
+
+
+def read_games(path):
+    """Reads the games of a file as lists of move tokens
+
+    Args:
+        path (str): game record, game log, PGN or move list file.
+
+    Returns:
+        list: one list of move tokens per game.
+    """
+    if path.endswith(".bin"):
+        archive = GameArchive(path)
+        games = [[move_id_notation(move_id) for move_id in archive.move_ids(number)]
+                 for number in range(len(archive))]
+        archive.close()
+        return [game for game in games if game]
+    with open(path) as game_file:
+        text = game_file.read()
+    if path.endswith(".csv"):
+        return [[line.strip().split("_")[-1] for line in text.splitlines() if line.strip()]]
+
+    # Headers, comments and variations carry no moves of the main line.
+    text = re.sub(r"\[[^\]]*\]|\{[^}]*\}|;[^\n]*", " ", text)
+    while re.search(r"\([^()]*\)", text):
+        text = re.sub(r"\([^()]*\)", " ", text)
+    games = [[]]
+    for token in text.split():
+        token = MOVE_NUMBER_PATTERN.sub("", token)
+        if token in RESULT_TOKENS:
+            games.append([])
+        elif token and not token.startswith("$"):
+            games[-1].append(token)
+    return [game for game in games if game]
+
+
+def find_move(game_context, token):
+    """Finds the valid move written by a token in coordinate or standard algebraic notation
+
+    Args:
+        game_context (GameContext): context of the game
+        token (str): written move, e.g. "e2e4", "Nf3", "exd5" or "e8=Q+".
+
+    Returns:
+        Move: the move, None when it is not valid here or the game can not play it (castling, underpromotion).
+    """
+    token = token.rstrip("+#!?")
+    valid_moves = game_context.get_valid_moves()
+    match = COORDINATE_PATTERN.match(token)
+    if match:
+        if match.group(2) not in ("", "q"):
+            return None
+        return next((move for move in valid_moves if move.get_chess_notation() == match.group(1)), None)
+
+    match = SAN_PATTERN.match(token)
+    if match is None:
+        return None
+    piece, from_file, from_rank, target, promotion = match.groups()
+    if promotion is not None and promotion[-1] != "Q":
+        return None
+    candidates = [move for move in valid_moves
+                  if move.piece_moved[1] == (piece or "P")
+                  and move.get_rank_file(move.end_row, move.end_column) == target
+                  and (from_file is None or move.columns_to_files[move.start_column] == from_file)
+                  and (from_rank is None or move.rows_to_ranks[move.start_row] == from_rank)]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def collect_positions(games, max_plies=DEFAULT_PLIES, context_class=BitboardGameContext):
+    """Replays the games from the starting position and counts the moves played in every position
+
+    Args:
+        games (list): lists of move tokens.
+        max_plies (int, optional): moves of every game taken into the book. Defaults to DEFAULT_PLIES.
+        context_class (type, optional): game context implementation. Defaults to BitboardGameContext.
+
+    Returns:
+        tuple: {(Zobrist key, move id): times played}, number of games cut short by a move that could not be played.
+    """
+    counts = {}
+    unplayable_games = 0
+    for tokens in games:
+        game_context = context_class()
+        for token in tokens[:max_plies]:
+            move = find_move(game_context, token)
+            if move is None:
+                unplayable_games += 1
+                break
+            record_key = (game_context.zobrist_key, move.move_id)
+            counts[record_key] = counts.get(record_key, 0) + 1
+            game_context.make_move(move)
+    return counts, unplayable_games
+
+
+def write_book(counts, output_path):
+    """Writes the records sorted by key and move id
+
+    Args:
+        counts (dict): {(Zobrist key, move id): times played}.
+        output_path (str): book file.
+    """
+    with open(output_path, "wb") as book_file:
+        for (key, move_id), count in sorted(counts.items()):
+            book_file.write(RECORD.pack(key, move_id, min(count, MAX_WEIGHT)))
+
+
+def build_book(paths, output_path=DEFAULT_BOOK_PATH, max_plies=DEFAULT_PLIES):
+    """Compiles the games of the files into a book
+
+    Args:
+        paths (list): game files.
+        output_path (str, optional): book file. Defaults to DEFAULT_BOOK_PATH.
+        max_plies (int, optional): moves of every game taken into the book. Defaults to DEFAULT_PLIES.
+
+    Returns:
+        dict: numbers of games, records, positions and games cut short.
+    """
+    games = [game for path in paths for game in read_games(path)]
+    counts, unplayable_games = collect_positions(games, max_plies)
+    write_book(counts, output_path)
+    return {"games": len(games), "records": len(counts), "positions": len({key for key, _ in counts}),
+            "cut_short": unplayable_games}
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Opening book builder")
+    parser.add_argument("paths", nargs="+", help="game records (*.bin), game logs (*.csv), PGN or move list files")
+    parser.add_argument("-o", "--output", default=DEFAULT_BOOK_PATH, help="book file to write")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES, help="moves of every game to take")
+    args = parser.parse_args()
+    summary = build_book(args.paths, args.output, args.plies)
+    print("%d games, %d positions, %d records written to %s (%d games cut short at a move the game can not play)"
+          % (summary["games"], summary["positions"], summary["records"], args.output, summary["cut_short"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Perft: counts the leaf nodes of the legal move tree to verify and benchmark the move generator.
+
+The game has no castling and pawns always promote to a queen, so the reference positions below avoid
+castling rights. Pawns of the reference positions only promote on the last ply, where every queen promotion
+is counted as the four promotions of standard chess. Within those limits the counts equal the standard
+published perft results.
+
+Usage (from the game directory):
+    python3 -m tools.perft                                  run the reference suite
+    python3 -m tools.perft --fen "<FEN>" --depth 4 --divide  count one position with per move breakdown
+    python3 -m tools.perft --history perft_history.csv      also append the results to a CSV file
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+from game.chess_context import ChessGameContext
+from game.bitboard_context import BitboardGameContext
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+# (name, FEN, {depth: leaf nodes})
+REFERENCE_POSITIONS = (
+    ("start position", START_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    ("rook and pawns endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("illegal en passant, pinned on rank", "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1", {6: 1134888}),
+    ("illegal en passant, pinned on diagonal", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1", {6: 1015133}),
+    ("discovered check", "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1", {4: 23527}),
+)
+CONTEXT_CLASSES = {"bitboard": BitboardGameContext, "numpy": ChessGameContext}
+
+
+def perft(game_context, depth, count_underpromotions=False):
+    """Counts the leaf nodes of the legal move tree
+
+    Args:
+        game_context (GameContext): context of the game
+        depth (int): depth of the tree.
+        count_underpromotions (bool, optional): True to count a promotion on the last ply as four moves,
+            like standard chess. Defaults to False.
+
+    Returns:
+        int: number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+    moves = game_context.get_valid_moves()
+    if depth == 1:
+        if count_underpromotions:
+            return len(moves) + 3 * sum(1 for move in moves if move.is_pawn_promotion)
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        game_context.make_search_move(move)
+        nodes += perft(game_context, depth - 1, count_underpromotions)
+        game_context.undo_search_move()
+    return nodes
+
+
+def divide(game_context, depth, count_underpromotions=False):
+    """Counts the leaf nodes below every root move
+
+    Args:
+        game_context (GameContext): context of the game
+        depth (int): depth of the tree, at least 1.
+        count_underpromotions (bool, optional): see perft. Defaults to False.
+
+    Returns:
+        dict: chess notation of the root move -> number of leaf nodes.
+    """
+    counts = {}
+    for move in game_context.get_valid_moves():
+        game_context.make_search_move(move)
+        counts[move.get_chess_notation()] = perft(game_context, depth - 1, count_underpromotions)
+        game_context.undo_search_move()
+    return counts
+
+
+def run_perft(fen, depth, context_class=BitboardGameContext, with_divide=False, count_underpromotions=False):
+    """Runs perft on one position and measures its speed
+
+    Args:
+        fen (str): position in Forsyth-Edwards Notation.
+        depth (int): depth of the tree.
+        context_class (type, optional): game context implementation. Defaults to BitboardGameContext.
+        with_divide (bool, optional): True to count every root move separately. Defaults to False.
+        count_underpromotions (bool, optional): see perft. Defaults to False.
+
+    Returns:
+        dict: nodes, seconds, nodes per second and the per move counts when requested.
+    """
+    game_context = context_class()
+    game_context.load_fen(fen)
+    start_time = time.perf_counter()
+    if with_divide:
+        counts = divide(game_context, depth, count_underpromotions)
+        nodes = sum(counts.values())
+    else:
+        counts = None
+        nodes = perft(game_context, depth, count_underpromotions)
+    seconds = time.perf_counter() - start_time
+    return {"nodes": nodes, "seconds": seconds, "nps": nodes / seconds if seconds else 0.0, "divide": counts}
+
+
+def run_reference_suite(context_class=BitboardGameContext, max_depth=None):
+    """Checks the move generator against the reference counts
+
+    Args:
+        context_class (type, optional): game context implementation. Defaults to BitboardGameContext.
+        max_depth (int, optional): skip deeper reference counts. Defaults to None.
+
+    Returns:
+        list: one result dict per position and depth, with the expected count and a passed flag.
+    """
+    results = []
+    for name, fen, expected_counts in REFERENCE_POSITIONS:
+        for depth, expected in sorted(expected_counts.items()):
+            if max_depth is not None and depth > max_depth:
+                continue
+            result = run_perft(fen, depth, context_class, count_underpromotions=True)
+            result.update({"name": name, "fen": fen, "depth": depth, "expected": expected,
+                           "passed": result["nodes"] == expected})
+            results.append(result)
+    return results
+
+
+def append_history(path, context_name, results):
+    """Appends the results to a CSV file so throughput can be tracked over time
+
+    Args:
+        path (str): CSV file path.
+        context_name (str): name of the game context implementation.
+        results (list): result dicts of run_perft or run_reference_suite.
+    """
+    write_header = not os.path.exists(path)
+    with open(path, "a", newline="") as history_file:
+        writer = csv.writer(history_file)
+        if write_header:
+            writer.writerow(["timestamp", "context", "fen", "depth", "nodes", "seconds", "nps", "passed"])
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        for result in results:
+            writer.writerow([timestamp, context_name, result["fen"], result["depth"], result["nodes"],
+                             "%.4f" % result["seconds"], "%.0f" % result["nps"], result.get("passed", "")])
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Perft move generator test and benchmark")
+    parser.add_argument("--fen", help="position to count, the reference suite runs when omitted")
+    parser.add_argument("--depth", type=int, help="depth for --fen, or the deepest reference count to check")
+    parser.add_argument("--divide", action="store_true", help="print counts for every root move")
+    parser.add_argument("--underpromotions", action="store_true",
+                        help="count promotions on the last ply as four moves like standard perft")
+    parser.add_argument("--context", choices=sorted(CONTEXT_CLASSES), default="bitboard")
+    parser.add_argument("--history", help="CSV file the results are appended to")
+    args = parser.parse_args()
+    context_class = CONTEXT_CLASSES[args.context]
+
+    if args.fen:
+        result = run_perft(args.fen, args.depth or 1, context_class, args.divide, args.underpromotions)
+        result.update({"fen": args.fen, "depth": args.depth or 1})
+        if args.divide:
+            for notation, nodes in sorted(result["divide"].items()):
+                print("%s: %d" % (notation, nodes))
+        print("nodes %d  time %.3fs  nps %.0f" % (result["nodes"], result["seconds"], result["nps"]))
+        results = [result]
+    else:
+        results = run_reference_suite(context_class, args.depth)
+        for result in results:
+            print("%-40s depth %d  nodes %9d  expected %9d  %s  nps %.0f" % (
+                result["name"], result["depth"], result["nodes"], result["expected"],
+                "ok" if result["passed"] else "FAILED", result["nps"]))
+        total_nodes = sum(result["nodes"] for result in results)
+        total_seconds = sum(result["seconds"] for result in results)
+        print("total nodes %d  time %.3fs  nps %.0f" % (total_nodes, total_seconds, total_nodes / total_seconds))
+
+    if args.history:
+        append_history(args.history, args.context, results)
+    if not all(result.get("passed", True) for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
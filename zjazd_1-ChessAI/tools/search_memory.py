@@ -0,0 +1,103 @@
+"""Measures how much memory the moves cost during a search.
+
+Reports the bytes and allocated blocks of one Move object, how many moves a search generates and the peak
+memory traced while it runs.
+
+Usage (from the game directory):
+    python3 -m tools.search_memory                 depth 4 search from the starting position
+    python3 -m tools.search_memory --depth 3 --fen "<FEN>"
+"""
+import argparse
+import time
+import tracemalloc
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+from tools.perft import START_FEN
+
+SAMPLE_POSITIONS = 1000
+
+
+def move_footprint(fen=START_FEN, positions=SAMPLE_POSITIONS):
+    """Measures the memory of the generated moves while they are kept alive
+
+    Args:
+        fen (str, optional): position the moves are generated in. Defaults to START_FEN.
+        positions (int, optional): how many times the moves are generated. Defaults to SAMPLE_POSITIONS.
+
+    Returns:
+        dict: bytes and allocated blocks per move.
+    """
+    game_context = BitboardGameContext()
+    game_context.load_fen(fen)
+    tracemalloc.start()
+    start_snapshot = tracemalloc.take_snapshot()
+    move_lists = [game_context.get_valid_moves() for _ in range(positions)]
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    moves = sum(len(move_list) for move_list in move_lists)
+    differences = snapshot.compare_to(start_snapshot, "filename")
+    size = sum(difference.size_diff for difference in differences)
+    blocks = sum(difference.count_diff for difference in differences)
+    # The lists holding the moves are part of the measure, they are small next to the moves.
+    return {"moves": moves, "bytes_per_move": size / moves, "blocks_per_move": blocks / moves}
+
+
+def search_memory(depth=4, fen=START_FEN):
+    """Runs a fixed depth search with memory tracing
+
+    Args:
+        depth (int, optional): search depth. Defaults to 4.
+        fen (str, optional): searched position. Defaults to START_FEN.
+
+    Returns:
+        dict: nodes, generated moves, peak traced memory and seconds of the search.
+    """
+    game_context = BitboardGameContext()
+    game_context.load_fen(fen)
+    generated_moves = [0]
+    get_valid_moves = game_context.get_valid_moves
+    get_capture_moves = game_context.get_capture_moves
+
+    def counted_valid_moves():
+        moves = get_valid_moves()
+        generated_moves[0] += len(moves)
+        return moves
+
+    def counted_capture_moves():
+        moves = get_capture_moves()
+        generated_moves[0] += len(moves)
+        return moves
+
+    game_context.get_valid_moves = counted_valid_moves
+    game_context.get_capture_moves = counted_capture_moves
+    AI.transposition_table.clear()
+    AI.move_orderer.clear()
+    valid_moves = game_context.get_valid_moves()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    AI.find_move_iterative_deepening(game_context, valid_moves, depth)
+    seconds = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"depth": depth, "nodes": AI.nodes_searched, "generated_moves": generated_moves[0],
+            "peak_bytes": peak, "seconds": seconds}
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Memory used by moves during the search")
+    parser.add_argument("--fen", default=START_FEN, help="searched position, the starting position by default")
+    parser.add_argument("--depth", type=int, default=4, help="search depth")
+    args = parser.parse_args()
+
+    footprint = move_footprint(args.fen)
+    print("move: %.1f bytes  %.2f blocks" % (footprint["bytes_per_move"], footprint["blocks_per_move"]))
+    result = search_memory(args.depth, args.fen)
+    print("depth %d  nodes %d  generated moves %d  peak traced memory %.1f KB  time %.2fs (traced)" % (
+        result["depth"], result["nodes"], result["generated_moves"], result["peak_bytes"] / 1024,
+        result["seconds"]))
+
+
+if __name__ == '__main__':
+    main()
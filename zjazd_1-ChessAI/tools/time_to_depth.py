@@ -0,0 +1,82 @@
+"""Time-to-depth benchmark of the search with and without its selective techniques.
+
+The same positions are searched by iterative deepening with null move pruning and late move reductions
+switched off ("full width") and on ("selective"). The time and nodes needed to complete every depth are
+summed over the positions.
+
+Usage (from the game directory):
+    python3 -m tools.time_to_depth --depth 5
+    python3 -m tools.time_to_depth --depth 5 --null-move-reduction 3 --late-move-index 4
+"""
+import argparse
+import time
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+from tools.perft import START_FEN
+
+BENCHMARK_POSITIONS = (
+    START_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w - - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w - - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+)
+
+
+def time_to_depth(depth, selective, positions=BENCHMARK_POSITIONS):
+    """Searches the positions and records when every depth completes
+
+    Args:
+        depth (int): deepest iteration.
+        selective (bool): True to use null move pruning and late move reductions.
+        positions (tuple, optional): FENs to search. Defaults to BENCHMARK_POSITIONS.
+
+    Returns:
+        dict: depth -> (seconds, nodes) summed over the positions, and the best moves found.
+    """
+    AI.NULL_MOVE_PRUNING = AI.LATE_MOVE_REDUCTIONS = selective
+    totals = {completed: [0.0, 0] for completed in range(1, depth + 1)}
+    best_moves = []
+    for fen in positions:
+        game_context = BitboardGameContext()
+        game_context.load_fen(fen)
+        AI.transposition_table.clear()
+        AI.move_orderer.clear()
+        start_time = time.perf_counter()
+
+        def record(completed_depth, best_move, score, nodes, principal_variation):
+            totals[completed_depth][0] += time.perf_counter() - start_time
+            totals[completed_depth][1] += nodes
+
+        best_move = AI.find_move_iterative_deepening(game_context, game_context.get_valid_moves(), depth,
+                                                     progress_callback=record)
+        best_moves.append(best_move.get_chess_notation())
+    return {"depths": {completed: tuple(total) for completed, total in totals.items()}, "best_moves": best_moves}
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Time-to-depth of the full width and the selective search")
+    parser.add_argument("--depth", type=int, default=4, help="deepest iteration")
+    parser.add_argument("--null-move-reduction", type=int, default=AI.NULL_MOVE_REDUCTION)
+    parser.add_argument("--late-move-index", type=int, default=AI.LATE_MOVE_INDEX)
+    parser.add_argument("--late-move-reduction", type=int, default=AI.LATE_MOVE_REDUCTION)
+    args = parser.parse_args()
+    AI.NULL_MOVE_REDUCTION = args.null_move_reduction
+    AI.LATE_MOVE_INDEX = args.late_move_index
+    AI.LATE_MOVE_REDUCTION = args.late_move_reduction
+
+    full_width = time_to_depth(args.depth, False)
+    selective = time_to_depth(args.depth, True)
+    print("depth  full width s    nodes   selective s    nodes  speedup")
+    for depth in range(1, args.depth + 1):
+        full_seconds, full_nodes = full_width["depths"][depth]
+        selective_seconds, selective_nodes = selective["depths"][depth]
+        print("%5d  %12.3f %8d  %12.3f %8d  %6.2fx" % (depth, full_seconds, full_nodes, selective_seconds,
+                                                        selective_nodes, full_seconds / selective_seconds))
+    print("best moves full width: %s" % " ".join(full_width["best_moves"]))
+    print("best moves selective:  %s" % " ".join(selective["best_moves"]))
+
+
+if __name__ == '__main__':
+    main()
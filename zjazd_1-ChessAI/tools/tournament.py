@@ -0,0 +1,333 @@
+"""Headless engine against engine tournament.
+
+Two engine configurations play a number of games against each other, changing colours every game. The
+games are spread over a pool of processes. The report gives wins, draws and losses of the first engine,
+and for every engine the average nodes and time per move, plus the average game length.
+
+An engine is written as search:depth, e.g. alphabeta:3, negamax:2, minmax:2, nomax:2 or random:0
+(see SEARCH_FUNCTIONS). Nodes are the moves the search made on the board, so every search function is
+counted the same way.
+
+Usage (from the game directory):
+    python3 -m tools.tournament --first alphabeta:3 --second minmax:2 --games 8 --json report.json --csv games.csv
+    python3 -m tools.tournament --games 1000 --record game_records.bin
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import random
+import time
+import artificial_intelligence.SmartMoveFinder as AI
+from game.bitboard_context import BitboardGameContext
+from game.game_record import GameRecorder
+
+MAX_PLIES = 200  # longer games are scored as draws, the game has no fifty moves rule
+REPETITIONS = 3
+
+
+def search_min_max(game_context, valid_moves, depth):
+    """Min max search to a fixed depth
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        depth (int): search depth.
+
+    Returns:
+        Move: best move or None.
+    """
+    AI.next_move = None
+    AI.find_move_min_max(game_context, valid_moves, depth, game_context.white_to_move)
+    return AI.next_move
+
+
+def search_nega_max(game_context, valid_moves, depth):
+    """Nega max search to a fixed depth
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        depth (int): search depth.
+
+    Returns:
+        Move: best move or None.
+    """
+    AI.next_move = None
+    AI.find_move_nega_max(game_context, valid_moves, depth, 1 if game_context.white_to_move else -1)
+    return AI.next_move
+
+
+def search_min_max_no_recursion(game_context, valid_moves, depth):
+    """Two ply min max without recursion, the depth is ignored
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        depth (int): unused.
+
+    Returns:
+        Move: best move or None.
+    """
+    return AI.find_best_move_min_max_no_recursion(game_context, valid_moves)
+
+
+def search_alpha_beta(game_context, valid_moves, depth):
+    """The engine's search: opening book, then iterative deepening alpha beta to a fixed depth
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        depth (int): search depth.
+
+    Returns:
+        Move: best move or None.
+    """
+    return AI.find_best_move(game_context, valid_moves)
+
+
+def search_random(game_context, valid_moves, depth):
+    """Random move, a baseline opponent
+
+    Args:
+        game_context (GameContext): context of the game
+        valid_moves (list): list of possible moves
+        depth (int): unused.
+
+    Returns:
+        Move: random valid move.
+    """
+    return AI.find_random_move(valid_moves)
+
+
+SEARCH_FUNCTIONS = {"minmax": search_min_max, "negamax": search_nega_max, "nomax": search_min_max_no_recursion,
+                    "alphabeta": search_alpha_beta, "random": search_random}
+
+
+def parse_engine(text):
+    """Reads an engine configuration written as search:depth
+
+    Args:
+        text (str): configuration, e.g. "alphabeta:3".
+
+    Returns:
+        tuple: (name of the search function, depth).
+
+    Raises:
+        ValueError: when the search function is unknown.
+    """
+    search, _, depth = text.partition(":")
+    if search not in SEARCH_FUNCTIONS:
+        raise ValueError("Unknown search function: " + search)
+    return search, int(depth or AI.DEPTH)
+
+
+def count_moves_made(game_context, counter):
+    """Makes the context count the moves made on it, both the logged and the search ones
+
+    Args:
+        game_context (GameContext): context of the game
+        counter (list): one element list incremented for every move.
+    """
+    make_move = game_context.make_move
+    make_search_move = game_context.make_search_move
+
+    def counted_make_move(move):
+        counter[0] += 1
+        make_move(move)
+
+    def counted_make_search_move(move):
+        counter[0] += 1
+        make_search_move(move)
+
+    game_context.make_move = counted_make_move
+    game_context.make_search_move = counted_make_search_move
+
+
+def play_game(task):
+    """Plays one game, worker process entry point
+
+    Args:
+        task (tuple): game number, white and black engines as (search, depth), max plies, seed and book flag.
+
+    Returns:
+        dict: result, termination, plies, ids of the moves played and the moves, nodes and seconds of every side.
+    """
+    game_number, white_engine, black_engine, max_plies, seed, use_book = task
+    random.seed(seed)
+    AI.USE_OPENING_BOOK = use_book
+    AI.transposition_table.clear()
+    AI.move_orderer.clear()
+    game_context = BitboardGameContext()
+    nodes = [0]
+    count_moves_made(game_context, nodes)
+    statistics = {"white": {"moves": 0, "nodes": 0, "seconds": 0.0}, "black": {"moves": 0, "nodes": 0, "seconds": 0.0}}
+    positions = {}
+    result, termination = "1/2-1/2", "max plies"
+
+    for _ in range(max_plies):
+        valid_moves = game_context.get_valid_moves()
+        if game_context.checkmate:
+            result, termination = ("0-1" if game_context.white_to_move else "1-0"), "checkmate"
+            break
+        if game_context.stalemate:
+            termination = "stalemate"
+            break
+        positions[game_context.zobrist_key] = positions.get(game_context.zobrist_key, 0) + 1
+        if positions[game_context.zobrist_key] >= REPETITIONS:
+            termination = "repetition"
+            break
+
+        side = "white" if game_context.white_to_move else "black"
+        search, depth = white_engine if game_context.white_to_move else black_engine
+        # The legacy searches pick the root move by comparing the depth with DEPTH.
+        AI.DEPTH = depth
+        nodes_before = nodes[0]
+        start_time = time.perf_counter()
+        move = SEARCH_FUNCTIONS[search](game_context, list(valid_moves), depth)
+        statistics[side]["seconds"] += time.perf_counter() - start_time
+        statistics[side]["nodes"] += nodes[0] - nodes_before
+        statistics[side]["moves"] += 1
+        move = next((valid_move for valid_move in valid_moves if valid_move == move), None)
+        if move is None:
+            move = AI.find_random_move(valid_moves)
+        game_context.make_move(move)
+
+    return {"game": game_number, "white": "%s:%d" % white_engine, "black": "%s:%d" % black_engine,
+            "result": result, "termination": termination, "plies": len(game_context.moveLog),
+            "moves": [move.move_id for move in game_context.moveLog], "statistics": statistics}
+
+
+def summarize(games, first, second):
+    """Aggregates the games from the point of view of the first engine, which is white in even games
+
+    Args:
+        games (list): results of play_game.
+        first (str): first engine as search:depth.
+        second (str): second engine as search:depth.
+
+    Returns:
+        dict: wins, draws, losses, average game length and per engine averages of nodes and time per move.
+    """
+    summary = {"games": len(games), "first": first, "second": second, "wins": 0, "draws": 0, "losses": 0,
+               "average_plies": sum(game["plies"] for game in games) / len(games) if games else 0.0}
+    totals = {"first": {"moves": 0, "nodes": 0, "seconds": 0.0}, "second": {"moves": 0, "nodes": 0, "seconds": 0.0}}
+    for game in games:
+        first_side, second_side = ("white", "black") if game["game"] % 2 == 0 else ("black", "white")
+        if game["result"] == "1/2-1/2":
+            summary["draws"] += 1
+        elif (game["result"] == "1-0") == (first_side == "white"):
+            summary["wins"] += 1
+        else:
+            summary["losses"] += 1
+        for engine, side in (("first", first_side), ("second", second_side)):
+            for key in totals[engine]:
+                totals[engine][key] += game["statistics"][side][key]
+    for engine, engine_totals in totals.items():
+        moves = engine_totals["moves"] or 1
+        summary[engine + "_engine"] = {"moves": engine_totals["moves"], "nodes_per_move": engine_totals["nodes"] / moves,
+                                       "seconds_per_move": engine_totals["seconds"] / moves}
+    return summary
+
+
+def run_tournament(first, second, games, workers=None, max_plies=MAX_PLIES, seed=0, use_book=True):
+    """Plays the games over a process pool
+
+    Args:
+        first (str): first engine as search:depth, white in even games.
+        second (str): second engine as search:depth.
+        games (int): number of games.
+        workers (int, optional): processes, None for one per CPU. Defaults to None.
+        max_plies (int, optional): plies after which a game is a draw. Defaults to MAX_PLIES.
+        seed (int, optional): seed of the first game, game n uses seed + n. Defaults to 0.
+        use_book (bool, optional): True to let the alpha beta engine use the opening book. Defaults to True.
+
+    Returns:
+        tuple: (summary, list of game results).
+    """
+    engines = (parse_engine(first), parse_engine(second))
+    tasks = [(number, engines[number % 2], engines[1 - number % 2], max_plies, seed + number, use_book)
+             for number in range(games)]
+    with multiprocessing.Pool(workers or multiprocessing.cpu_count()) as pool:
+        results = pool.map(play_game, tasks)
+    return summarize(results, "%s:%d" % engines[0], "%s:%d" % engines[1]), results
+
+
+def record_games(path, results):
+    """Appends the games to the game record, played again in this process so only one process writes it
+
+    Args:
+        path (str): move file of the game record.
+        results (list): results of play_game.
+    """
+    # The games are complete already, they are written out in one go when the recorder is closed.
+    recorder = GameRecorder(path, flush_interval=None)
+    try:
+        for result in results:
+            game_context = BitboardGameContext()
+            game_context.recorder = recorder
+            recorder.start_game()
+            for move_id in result["moves"]:
+                game_context.make_move(next(move for move in game_context.get_valid_moves()
+                                            if move.move_id == move_id))
+    finally:
+        recorder.close()
+
+
+def write_games_csv(path, results):
+    """Writes one row per game
+
+    Args:
+        path (str): CSV file path.
+        results (list): results of play_game.
+    """
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["game", "white", "black", "result", "termination", "plies", "white_nodes_per_move",
+                         "black_nodes_per_move", "white_seconds_per_move", "black_seconds_per_move"])
+        for result in results:
+            white, black = result["statistics"]["white"], result["statistics"]["black"]
+            writer.writerow([result["game"], result["white"], result["black"], result["result"],
+                             result["termination"], result["plies"],
+                             "%.1f" % (white["nodes"] / max(white["moves"], 1)),
+                             "%.1f" % (black["nodes"] / max(black["moves"], 1)),
+                             "%.4f" % (white["seconds"] / max(white["moves"], 1)),
+                             "%.4f" % (black["seconds"] / max(black["moves"], 1))])
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Headless engine tournament")
+    parser.add_argument("--first", default="alphabeta:%d" % AI.DEPTH, help="first engine as search:depth")
+    parser.add_argument("--second", default="random:0", help="second engine as search:depth")
+    parser.add_argument("--games", type=int, default=4, help="number of games")
+    parser.add_argument("--workers", type=int, help="processes, one per CPU by default")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="plies after which a game is a draw")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the first game")
+    parser.add_argument("--no-book", action="store_true", help="do not use the opening book")
+    parser.add_argument("--json", help="file for the JSON report with the summary and every game")
+    parser.add_argument("--csv", help="file for the CSV report with one row per game")
+    parser.add_argument("--record", help="game record file the games are appended to")
+    args = parser.parse_args()
+
+    summary, results = run_tournament(args.first, args.second, args.games, args.workers, args.max_plies,
+                                      args.seed, not args.no_book)
+    print("%s vs %s: +%d =%d -%d in %d games, %.1f plies per game" % (
+        summary["first"], summary["second"], summary["wins"], summary["draws"], summary["losses"],
+        summary["games"], summary["average_plies"]))
+    for engine in ("first", "second"):
+        engine_summary = summary[engine + "_engine"]
+        print("  %-16s %10.1f nodes/move  %8.4f s/move" % (
+            summary[engine], engine_summary["nodes_per_move"], engine_summary["seconds_per_move"]))
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({"summary": summary, "games": results}, json_file, indent=2)
+    if args.csv:
+        write_games_csv(args.csv, results)
+    if args.record:
+        record_games(args.record, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+"""Texel tuning of the material and piece-square weights from recorded games.
+
+Every position of the games is labelled with the game's result for white (1, 0.5 or 0). The evaluation is
+linear in its weights: one value per piece and square, material included, read from white's side for white
+pieces and from the mirrored square with the opposite sign for black ones. The tuner minimizes the mean
+squared error between the results and sigmoid(K * score), first fitting K to the current weights, then
+moving all weights at once with full-batch Adam gradient steps.
+
+Positions are stored as NumPy feature matrices: per position the (up to 32) weight indices of its pieces
+and their signs, so a score is a gather and a row sum and the gradient is one bincount. The games are
+replayed on an int8 array of piece codes without generating moves, millions of positions load in minutes.
+
+Accepted inputs:
+    *.bin     game records written by game.game_record.GameRecorder, the result comes from the last position
+              (checkmate or stalemate); unfinished games are skipped, or counted as draws with --draws
+    *.json    reports of tools.tournament --json, which carry every game's moves and result
+
+The tuned weights are written to game.evaluation.WEIGHTS_PATH, loaded by the game at startup.
+
+Usage (from the game directory):
+    python3 -m tools.tune_evaluation game_records.bin report.json --steps 300
+    python3 -m tools.tune_evaluation game_records.bin --draws --skip-plies 8 --dry-run
+"""
+import argparse
+import json
+import time
+import numpy as np
+from game.bitboard import PIECE_CODES, EMPTY_CODE
+from game.bitboard_context import BitboardGameContext
+from game.evaluation import PIECE_VALUES, PIECE_SQUARE_TABLES, CENTIPAWNS, WEIGHTS_PATH
+from game.game_record import GameArchive
+
+PIECE_LETTERS = "PNBRQK"  # order of the piece types in the weights, the same as bitboard.PIECE_NAMES
+WEIGHT_COUNT = len(PIECE_LETTERS) * 64
+NO_FEATURE = WEIGHT_COUNT  # padding index of positions with fewer than MAX_PIECES pieces, its weight stays 0
+MAX_PIECES = 32
+DEFAULT_SKIP_PLIES = 8  # opening plies left out, they are mostly book moves
+DEFAULT_STEPS = 300
+DEFAULT_LEARNING_RATE = 2.0  # centipawns per Adam step
+# Weight of the squared distance to the starting weights in the error, so that the weights of squares seen in
+# few positions, which Adam would move as fast as any other, stay near their starting values.
+DEFAULT_REGULARIZATION = 1e-9
+CHUNK_POSITIONS = 1 << 18  # positions scored at a time, bounds the temporary arrays
+RESULTS = {"1-0": 1.0, "1/2-1/2": 0.5, "0-1": 0.0}
+PIECE_CODE_NAMES = {code: piece for piece, code in PIECE_CODES.items()}
+WHITE_PAWN, BLACK_PAWN = PIECE_CODES["wP"], PIECE_CODES["bP"]
+WHITE_QUEEN, BLACK_QUEEN = PIECE_CODES["wQ"], PIECE_CODES["bQ"]
+START_CODES = np.array([PIECE_CODES[piece] for row in BitboardGameContext().board for piece in row], dtype=np.int8)
+
+
+def read_games(paths):
+    """Reads the moves and results of the games of some files
+
+    Args:
+        paths (list): game records (*.bin) and tournament reports (*.json).
+
+    Yields:
+        tuple: (list of move ids, result for white, None when only the last position can tell).
+    """
+    for path in paths:
+        if path.endswith(".json"):
+            with open(path) as report_file:
+                for game in json.load(report_file)["games"]:
+                    yield game["moves"], RESULTS[game["result"]]
+            continue
+        archive = GameArchive(path)
+        for game_number in range(len(archive)):
+            yield archive.move_ids(game_number), None
+        archive.close()
+
+
+def final_result(codes, white_to_move):
+    """Tells the result of a game from its last position
+
+    Args:
+        codes (numpy.ndarray): (64,) piece codes of the last position.
+        white_to_move (bool): True when white is to move in it.
+
+    Returns:
+        float: 1 when white mated, 0 when black mated, 0.5 for stalemate, None when the game did not end.
+    """
+    game_context = BitboardGameContext()
+    game_context.board = [[PIECE_CODE_NAMES[code] for code in codes[row * 8:row * 8 + 8]] for row in range(8)]
+    game_context.white_to_move = white_to_move
+    game_context.load_fen(game_context.get_fen())
+    game_context.get_valid_moves()
+    if game_context.checkmate:
+        return 0.0 if white_to_move else 1.0
+    if game_context.stalemate:
+        return 0.5
+    return None
+
+
+def replay_codes(move_ids, skip_plies=0, quiet_only=False):
+    """Plays the moves of a game on piece codes, the moves are trusted to be legal
+
+    Args:
+        move_ids (list): moves of the game from the initial position.
+        skip_plies (int, optional): positions of the first plies left out. Defaults to 0.
+        quiet_only (bool, optional): True to leave out positions right after a capture or promotion, their
+            static score is off until the exchange is over. Defaults to False.
+
+    Returns:
+        list: (64,) int8 piece codes of the positions after each kept move, the last position always kept.
+    """
+    codes = START_CODES.copy()
+    positions = []
+    for ply, move_id in enumerate(move_ids, 1):
+        start_square = move_id // 1000 * 8 + move_id // 100 % 10
+        end_square = move_id // 10 % 10 * 8 + move_id % 10
+        piece = codes[start_square]
+        noisy = codes[end_square] != EMPTY_CODE
+        if piece == WHITE_PAWN or piece == BLACK_PAWN:
+            if start_square % 8 != end_square % 8 and not noisy:
+                # En passant, the taken pawn stands beside the start square.
+                codes[start_square - start_square % 8 + end_square % 8] = EMPTY_CODE
+                noisy = True
+            if end_square < 8 or end_square >= 56:
+                piece = WHITE_QUEEN if piece == WHITE_PAWN else BLACK_QUEEN
+                noisy = True
+        codes[start_square] = EMPTY_CODE
+        codes[end_square] = piece
+        if ply > skip_plies and not (quiet_only and noisy) or ply == len(move_ids):
+            positions.append(codes.copy())
+    if not move_ids:
+        positions.append(codes.copy())
+    return positions
+
+
+def load_positions(paths, skip_plies=DEFAULT_SKIP_PLIES, unfinished_as_draws=False):
+    """Loads the positions of the games with their results
+
+    Positions right after a capture or a promotion are left out, their static score is off until the
+    exchange is over, and so is the last position of every game.
+
+    Args:
+        paths (list): game records and tournament reports.
+        skip_plies (int, optional): opening plies left out of every game. Defaults to DEFAULT_SKIP_PLIES.
+        unfinished_as_draws (bool, optional): True to count recorded games ending without checkmate or
+            stalemate as draws, False to skip them. Defaults to False.
+
+    Returns:
+        tuple: ((N, 64) int8 piece codes, (N,) float32 results for white, number of games used).
+    """
+    chunks, results = [], []
+    games = 0
+    for move_ids, result in read_games(paths):
+        positions = replay_codes(move_ids, skip_plies, True)
+        if result is None:
+            result = final_result(positions[-1], len(move_ids) % 2 == 0)
+            if result is None:
+                if not unfinished_as_draws:
+                    continue
+                result = 0.5
+        games += 1
+        if len(positions) > 1:
+            chunks.append(np.array(positions[:-1], dtype=np.int8))
+            results.append(np.full(len(positions) - 1, result, dtype=np.float32))
+    if not chunks:
+        return np.zeros((0, 64), dtype=np.int8), np.zeros(0, dtype=np.float32), games
+    return np.concatenate(chunks), np.concatenate(results), games
+
+
+def build_features(codes):
+    """Converts piece codes to weight indices and signs
+
+    Args:
+        codes (numpy.ndarray): (N, 64) piece codes.
+
+    Returns:
+        tuple: ((N, MAX_PIECES) int16 weight indices padded with NO_FEATURE, (N, MAX_PIECES) int8 signs,
+            +1 for white pieces and -1 for black ones).
+    """
+    squares = np.arange(64)
+    codes = codes.astype(np.intp)
+    occupied = codes != EMPTY_CODE
+    black = codes >= len(PIECE_LETTERS)
+    # Black pieces use the vertically mirrored square, the board's row 0 is the 8th rank.
+    indices = np.where(occupied, (codes % len(PIECE_LETTERS)) * 64 + np.where(black, squares ^ 56, squares),
+                       NO_FEATURE)
+    signs = np.where(occupied, np.where(black, -1, 1), 0)
+    # Occupied squares first, the stable sort keeps them in square order.
+    order = np.argsort(~occupied, axis=1, kind="stable")[:, :MAX_PIECES]
+    return (np.take_along_axis(indices, order, axis=1).astype(np.int16),
+            np.take_along_axis(signs, order, axis=1).astype(np.int8))
+
+
+def initial_weights():
+    """Returns the weights the engine evaluates with now
+
+    Returns:
+        numpy.ndarray: (WEIGHT_COUNT + 1,) centipawns, material included, the last one the padding weight.
+    """
+    weights = np.zeros(WEIGHT_COUNT + 1)
+    for number, letter in enumerate(PIECE_LETTERS):
+        table = np.array(PIECE_SQUARE_TABLES[letter], dtype=float).reshape(64)
+        weights[number * 64:number * 64 + 64] = table + PIECE_VALUES[letter] * CENTIPAWNS
+    return weights
+
+
+def evaluate(weights, indices, signs):
+    """Scores positions with the given weights
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) centipawns.
+        indices (numpy.ndarray): weight indices from build_features.
+        signs (numpy.ndarray): signs from build_features.
+
+    Returns:
+        numpy.ndarray: (N,) scores for white in centipawns.
+    """
+    return (weights[indices] * signs).sum(axis=1)
+
+
+def sigmoid(scores, scaling):
+    """Turns scores into expected results for white
+
+    Args:
+        scores (numpy.ndarray): centipawns.
+        scaling (float): K, the steepness of the curve.
+
+    Returns:
+        numpy.ndarray: expected results between 0 and 1.
+    """
+    return 1 / (1 + np.power(10, -scaling * scores / 400))
+
+
+def mean_error(weights, indices, signs, results, scaling):
+    """Returns the mean squared error of the expected results
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) centipawns.
+        indices (numpy.ndarray): weight indices from build_features.
+        signs (numpy.ndarray): signs from build_features.
+        results (numpy.ndarray): results for white.
+        scaling (float): K.
+
+    Returns:
+        float: mean squared error.
+    """
+    error = 0.0
+    for start in range(0, len(results), CHUNK_POSITIONS):
+        chunk = slice(start, start + CHUNK_POSITIONS)
+        predicted = sigmoid(evaluate(weights, indices[chunk], signs[chunk]), scaling)
+        error += float(np.square(results[chunk] - predicted).sum())
+    return error / max(len(results), 1)
+
+
+def fit_scaling(weights, indices, signs, results):
+    """Finds the K that best fits the current weights to the results, by golden section search
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) centipawns.
+        indices (numpy.ndarray): weight indices from build_features.
+        signs (numpy.ndarray): signs from build_features.
+        results (numpy.ndarray): results for white.
+
+    Returns:
+        float: K.
+    """
+    low, high = 0.01, 10.0
+    ratio = (5 ** 0.5 - 1) / 2
+    for _ in range(40):
+        first, second = high - ratio * (high - low), low + ratio * (high - low)
+        if mean_error(weights, indices, signs, results, first) < mean_error(weights, indices, signs, results,
+                                                                               second):
+            high = second
+        else:
+            low = first
+    return (low + high) / 2
+
+
+def gradient(weights, indices, signs, results, scaling):
+    """Returns the gradient of the mean squared error
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) centipawns.
+        indices (numpy.ndarray): weight indices from build_features.
+        signs (numpy.ndarray): signs from build_features.
+        results (numpy.ndarray): results for white.
+        scaling (float): K.
+
+    Returns:
+        numpy.ndarray: (WEIGHT_COUNT + 1,) derivative of the error by every weight, 0 for the padding weight.
+    """
+    total = np.zeros(WEIGHT_COUNT + 1)
+    for start in range(0, len(results), CHUNK_POSITIONS):
+        chunk = slice(start, start + CHUNK_POSITIONS)
+        predicted = sigmoid(evaluate(weights, indices[chunk], signs[chunk]), scaling)
+        # d error / d score of every position, the score is linear in the weights.
+        slope = 2 * (predicted - results[chunk]) * predicted * (1 - predicted) * scaling * np.log(10) / 400
+        total += np.bincount(indices[chunk].ravel(), (signs[chunk] * slope[:, None]).ravel(),
+                             minlength=WEIGHT_COUNT + 1)
+    total[NO_FEATURE] = 0
+    return total / max(len(results), 1)
+
+
+def tune(weights, indices, signs, results, scaling, steps=DEFAULT_STEPS, learning_rate=DEFAULT_LEARNING_RATE,
+         regularization=DEFAULT_REGULARIZATION, progress_callback=None):
+    """Moves the weights down the gradient of the error with Adam
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) starting weights in centipawns.
+        indices (numpy.ndarray): weight indices from build_features.
+        signs (numpy.ndarray): signs from build_features.
+        results (numpy.ndarray): results for white.
+        scaling (float): K.
+        steps (int, optional): gradient steps. Defaults to DEFAULT_STEPS.
+        learning_rate (float, optional): centipawns per step. Defaults to DEFAULT_LEARNING_RATE.
+        regularization (float, optional): weight of the squared distance to the starting weights.
+            Defaults to DEFAULT_REGULARIZATION.
+        progress_callback (function, optional): called with the step number and the weights every 50 steps.
+            Defaults to None.
+
+    Returns:
+        numpy.ndarray: tuned weights.
+    """
+    starting_weights = weights
+    weights = weights.copy()
+    first_moment = np.zeros_like(weights)
+    second_moment = np.zeros_like(weights)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-12
+    for step in range(1, steps + 1):
+        step_gradient = gradient(weights, indices, signs, results, scaling) + \
+            2 * regularization * (weights - starting_weights)
+        first_moment = beta1 * first_moment + (1 - beta1) * step_gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * step_gradient ** 2
+        weights -= learning_rate * (first_moment / (1 - beta1 ** step)) / \
+            (np.sqrt(second_moment / (1 - beta2 ** step)) + epsilon)
+        if progress_callback is not None and step % 50 == 0:
+            progress_callback(step, weights)
+    return weights
+
+
+def weights_tables(weights):
+    """Splits tuned weights into piece values and piece-square tables
+
+    The value of a piece is its average weight over the squares it can stand on, the king's stays 0 as
+    both sides always have one.
+
+    Args:
+        weights (numpy.ndarray): (WEIGHT_COUNT + 1,) centipawns.
+
+    Returns:
+        dict: "piece_values" piece letter -> centipawns, "piece_square_tables" piece letter -> 8 rows of 8
+            centipawns, the format of game.evaluation.load_weights.
+    """
+    values, tables = {}, {}
+    for number, letter in enumerate(PIECE_LETTERS):
+        table = weights[number * 64:number * 64 + 64].reshape(8, 8)
+        squares = table[1:7] if letter == "P" else table
+        values[letter] = 0 if letter == "K" else int(round(squares.mean()))
+        table = np.rint(table - values[letter]).astype(int)
+        if letter == "P":
+            # A pawn never stands on the first or the last rank.
+            table[0] = table[7] = 0
+        tables[letter] = table.tolist()
+    return {"piece_values": values, "piece_square_tables": tables}
+
+
+def main():
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Texel tuning of the evaluation weights")
+    parser.add_argument("paths", nargs="+", help="game records (*.bin) and tournament reports (*.json)")
+    parser.add_argument("-o", "--output", default=WEIGHTS_PATH, help="weights file to write")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="gradient steps")
+    parser.add_argument("--learning-rate", type=float, default=DEFAULT_LEARNING_RATE, help="centipawns per step")
+    parser.add_argument("--regularization", type=float, default=DEFAULT_REGULARIZATION,
+                        help="pull towards the starting weights")
+    parser.add_argument("--skip-plies", type=int, default=DEFAULT_SKIP_PLIES, help="opening plies left out")
+    parser.add_argument("--draws", action="store_true", help="count unfinished recorded games as draws")
+    parser.add_argument("--dry-run", action="store_true", help="report the error only, write no weights")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    codes, results, games = load_positions(args.paths, args.skip_plies, args.draws)
+    if not len(results):
+        parser.error("no positions with a known result in the games")
+    indices, signs = build_features(codes)
+    del codes
+    print("%d positions of %d games loaded in %.1f s" % (len(results), games, time.perf_counter() - start_time))
+
+    weights = initial_weights()
+    scaling = fit_scaling(weights, indices, signs, results)
+    print("K = %.3f, error %.6f with the current weights" % (
+        scaling, mean_error(weights, indices, signs, results, scaling)))
+
+    def report(step, step_weights):
+        print("step %5d  error %.6f  %.1f s" % (step, mean_error(step_weights, indices, signs, results, scaling),
+                                                time.perf_counter() - start_time))
+
+    weights = tune(weights, indices, signs, results, scaling, args.steps, args.learning_rate, args.regularization,
+                   report)
+    tables = weights_tables(weights)
+    print("piece values: " + "  ".join("%s %d" % item for item in tables["piece_values"].items()))
+    if not args.dry_run:
+        with open(args.output, "w") as weights_file:
+            json.dump(dict(tables, positions=int(len(results)), games=games, scaling=scaling), weights_file)
+        print("written to %s" % args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Shared cache of the images and fonts used by the views.
+
+Every image is read from disk once and converted to the display format once, and every scaled variant of
+it is kept, so building a view or drawing a frame does not touch the disk again. Fonts are created once per
+name, size and style. Images can be read ahead of time in a background thread; the conversion, which needs
+the display, is done on first use in the thread drawing the views.
+"""
+import threading
+import time
+import pygame
+
+
+class AssetManager:
+    """Loads images and fonts on first use and keeps them for the rest of the session.
+    """
+    def __init__(self):
+        """Constructor
+        """
+        self.images = {}  # (path, size, alpha) -> surface in the display format, size None for the original
+        self.fonts = {}  # (name, size, bold, italic) -> pygame.font.Font
+        self.read_images = {}  # path -> surface read by the preload thread and not converted yet
+        self.loaded_paths = set()  # files taken by image, the preload thread skips them
+        self.load_seconds = 0.0  # time spent reading and converting images
+        self.lock = threading.Lock()
+        self.preload_thread = None
+
+    def image(self, path, size=None, alpha=True):
+        """Returns an image, loaded and converted on the first call
+
+        Args:
+            path (str): image file.
+            size (tuple, optional): (width, height) to scale the image to, None for its own size. Defaults to None.
+            alpha (bool, optional): True to keep the transparency, False for opaque images like backgrounds.
+                Defaults to True.
+
+        Returns:
+            pygame.Surface: the image, shared by every caller, so it must not be drawn on.
+        """
+        key = (path, size, alpha)
+        surface = self.images.get(key)
+        if surface is not None:
+            return surface
+        if size is not None:
+            surface = pygame.transform.scale(self.image(path, None, alpha), size)
+        else:
+            start_time = time.perf_counter()
+            surface = self.__read(path)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if alpha else surface.convert()
+            self.load_seconds += time.perf_counter() - start_time
+        self.images[key] = surface
+        return surface
+
+    def font(self, name, size, bold=False, italic=False):
+        """Returns a system font, created on the first call
+
+        Args:
+            name (str): font name.
+            size (int): font size.
+            bold (bool, optional): True for bold. Defaults to False.
+            italic (bool, optional): True for italic. Defaults to False.
+
+        Returns:
+            pygame.font.Font: the font.
+        """
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold, italic)
+            self.fonts[key] = font
+        return font
+
+    def preload(self, paths):
+        """Starts reading images from disk in a background thread
+
+        Args:
+            paths (list): image files, the ones already loaded are skipped.
+
+        Returns:
+            threading.Thread: the started thread.
+        """
+        self.preload_thread = threading.Thread(target=self.__preload, args=(list(paths),), daemon=True)
+        self.preload_thread.start()
+        return self.preload_thread
+
+    def __preload(self, paths):
+        """Preload thread entry point
+
+        Args:
+            paths (list): image files.
+        """
+        for path in paths:
+            with self.lock:
+                if path not in self.read_images and path not in self.loaded_paths:
+                    self.read_images[path] = pygame.image.load(path)
+
+    def __read(self, path):
+        """Returns the image read by the preload thread or reads it now
+
+        Args:
+            path (str): image file.
+
+        Returns:
+            pygame.Surface: image as read from disk.
+        """
+        # Waits for the preload thread when it is reading this very image.
+        with self.lock:
+            surface = self.read_images.pop(path, None)
+            self.loaded_paths.add(path)
+        if surface is None:
+            surface = pygame.image.load(path)
+        return surface
+
+
+assets = AssetManager()
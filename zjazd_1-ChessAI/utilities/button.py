@@ -1,4 +1,5 @@
 import pygame
+from utilities.asset_manager import assets
 
 SMALL_BUTTON_SIZE = [250, 100]
 LARGE_BUTTON_SIZE = [250, 200]
@@ -16,9 +17,10 @@ class Button:
         self.id = button_id
         self.box_color = box_color
         self.text_color = text_color
-        self.font = pygame.font.SysFont(font, font_size)
+        self.font = assets.font(font, font_size)
         self.text = text
         self.rect = pygame.Rect(size)
+        self.drawn_color = None  # box color on the screen, None when the button has to be drawn again
 
     def add_rect(self):
         """Adds button rectangle to the list
@@ -35,8 +37,16 @@ class Button:
         self.screen.blit(text_surface, text_position)
 
     def draw_button(self):
-        """Performs the button drawings
+        """Performs the button drawings when the box color changed since the last drawing
+
+        The screen is not updated, the view collects the drawn areas for one update per frame.
+
+        Returns:
+            bool: True when the button was drawn.
         """
+        if self.drawn_color == self.box_color:
+            return False
         self.add_rect()
         self.add_text()
-        pygame.display.update()
+        self.drawn_color = self.box_color
+        return True
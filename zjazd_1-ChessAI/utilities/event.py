@@ -1,6 +1,7 @@
 import pygame
 from game.move import Move
 import artificial_intelligence.SmartMoveFinder as AI
+from artificial_intelligence.search_worker import SearchWorker
 
 TILE_SIZE = (64, 64)
 BORDER_OFFSET = (128, 128)
@@ -15,6 +16,7 @@ EVENT_CODES = {
     7: "DENSE_PLAY",
     8: "MAIN_MENU"
 }
+PONDER = True  # search during the human's turn to answer faster
 
 
 class EventHandler:
@@ -23,6 +25,7 @@ class EventHandler:
     mouse_button_code = 0
     window_code = 0
     view_code = 0
+    search_worker = SearchWorker()
 
     @staticmethod
     def process_event(event):
@@ -99,38 +102,74 @@ class EventHandler:
                             current_view.player_clicks = [current_view.square_selected]
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_u:
+                        EventHandler.search_worker.stop()
                         current_view.game_context.undo_move()
                         current_view.move_made = True
                         current_view.present_animations = False
 
-            # AI handling below
-            if not current_view.is_game_over and not game_context.human_turn:
-                valid_moves = current_view.game_context.get_valid_moves()
-                AI_move = AI.find_best_move(game_context, valid_moves)
+            EventHandler.after_move_process(current_view)
+
+    @staticmethod
+    def ai_process(game_view):
+        """Drives the background AI search, called once per frame
+
+        Starts the search when the AI is to move and plays its move once found. During the human's turn the
+        worker ponders. Leaving the game view stops any search.
+
+        Args:
+            game_view (ViewHandler): handler of the current view.
+        """
+        worker = EventHandler.search_worker
+        if EventHandler.view_code != 1:
+            worker.stop()
+            return
+        current_view = game_view.current_view
+        game_context = current_view.game_context
+        game_context.human_turn = (game_context.white_to_move and game_context.player_one) or (
+                not game_context.white_to_move and game_context.player_two)
+        if current_view.is_game_over:
+            worker.stop()
+        elif not game_context.human_turn:
+            if worker.has_result():
+                # The worker's move belongs to its own copy of the board, the same move of the shown board is played.
+                found_move = worker.take_result()
+                AI_move = next((move for move in current_view.valid_moves if move == found_move), None)
                 if AI_move is None:
-                    AI_move = AI.find_random_move(valid_moves)
-                else:
-                    print("dupa")
+                    AI_move = AI.find_random_move(current_view.valid_moves)
                 current_view.game_context.make_move(AI_move)
                 current_view.move_made = True
                 current_view.present_animations = True
+            elif not worker.is_searching():
+                worker.start_search(game_context)
+        elif PONDER and worker.thread is None:
+            worker.start_ponder(game_context)
 
-            if current_view.move_made:
-                if current_view.present_animations:
-                    current_view.animate_move(game_view.current_view.game_context.moveLog[-1])
-                current_view.valid_moves = current_view.game_context.get_valid_moves()
-                current_view.move_made = False
-                current_view.present_animations = False
-
-            if current_view.game_context.checkmate:
-                current_view.is_game_over = True
-                if current_view.game_context.white_to_move:
-                    current_view.draw_text("Black Wins by checkmate!")
-                else:
-                    current_view.draw_text("White Wins by checkmate!")
-            elif current_view.game_context.stalemate:
-                current_view.is_game_over = True
-                current_view.draw_text("Stalemate")
+        current_view.search_status = worker.status_text()
+        EventHandler.after_move_process(current_view)
+
+    @staticmethod
+    def after_move_process(current_view):
+        """Animates the last move, refreshes the valid moves and checks for the end of the game
+
+        Args:
+            current_view (ChessGameView): game view.
+        """
+        if current_view.move_made:
+            if current_view.present_animations:
+                current_view.animate_move(current_view.game_context.moveLog[-1])
+            current_view.valid_moves = current_view.game_context.get_valid_moves()
+            current_view.move_made = False
+            current_view.present_animations = False
+
+        if current_view.game_context.checkmate:
+            current_view.is_game_over = True
+            if current_view.game_context.white_to_move:
+                current_view.draw_text("Black Wins by checkmate!")
+            else:
+                current_view.draw_text("White Wins by checkmate!")
+        elif current_view.game_context.stalemate:
+            current_view.is_game_over = True
+            current_view.draw_text("Stalemate")
 
     @staticmethod
     def on_mouse_button_down(event):
@@ -1,8 +1,11 @@
 import os
 from views.window import Window, WINDOW_SIZE, BORDER_GAP, DEFAULT_BACKGROUND_COLOR
 from game.chess_context import ChessGameContext
+from game.bitboard_context import BitboardGameContext
+from game.game_record import GameRecorder, GAME_RECORD_PATH
 from utilities.button import Button, SMALL_BUTTON_SIZE, ON_BUTTON_COLLISION_COLOR, DEFAULT_BUTTON_COLOR
 from utilities.event import EventHandler
+from utilities.asset_manager import assets
 import pygame
 
 IMG_PATH = "images/default_pieces_and_figures/"
@@ -10,22 +13,44 @@ CHESS_PIECE_SIZE = (64, 64)
 TILE_SIZE = (64, 64)
 BORDER_OFFSET = (128, 128)  # Change to ((WINDOWSIZE - TILE_SIZE[0] * 8) / 2), ... )
 BACKGROUND_PATH = "images/"
+SEARCH_STATUS_RECT = (BORDER_OFFSET[0], BORDER_OFFSET[1] + TILE_SIZE[1] * 8 + 8, TILE_SIZE[0] * 8, 32)
+BOARD_RECT = (BORDER_OFFSET[0], BORDER_OFFSET[1], TILE_SIZE[0] * 8, TILE_SIZE[1] * 8)
+LIGHT_SQUARE_COLOR = "white"
+DARK_SQUARE_COLOR = "gray"
+HIGHLIGHT_COLORS = {"selected": "blue", "target": "yellow"}
+HIGHLIGHT_ALPHA = 100
+USE_BITBOARD_CONTEXT = True  # False falls back to the numpy board context
+
+
+def preload_assets():
+    """Starts reading the images of the game view in the background, e.g. while the main menu is shown
+    """
+    assets.preload([IMG_PATH + filename for filename in os.listdir(IMG_PATH)] +
+                   [BACKGROUND_PATH + "game_background.jpg"])
 
 
 class ChessGameView(Window):
     """Class containing the info regarding view of the game - like window or board.
     """
+    game_recorder = None  # shared by the games of the session, opened by the first game view
+
     def __init__(self):
         super().__init__()
         self.images = {}
-        self.board_rects = []
         self.square_selected = ()
         self.player_clicks = []
         self.move_made = False
         self.present_animations = False
         self.is_game_over = False
         self.limited_draws = False
+        self.search_status = ""
+        self.status_font = assets.font("Helvitica", 24)
+        self.text_font = assets.font("Helvitica", 32, True)
+        self.drawn_search_status = None
+        self.drawn_text = None
+        self.text_rect = None
         self.__load_images()
+        self.__create_board_surface()
         self.__create_game_ontext()
         self.__calculate_rect_positions()
         self.__create_button_rect_list(self.screen)
@@ -33,110 +58,174 @@ class ChessGameView(Window):
     def __set_background(self):
         """Loads the image to backgrounds and blits the screen to show it
         """
-        background = pygame.image.load(BACKGROUND_PATH + "game_background.jpg")
-        self.screen.blit(background, (0, 0))
+        self.background = assets.image(BACKGROUND_PATH + "game_background.jpg", alpha=False)
+        self.screen.blit(self.background, (0, 0))
         self.limited_draws = True
+        self.mark_all_dirty()
+        self.__invalidate_board()
+        self.drawn_search_status = None
+        self.drawn_text = None
+        for button in self.window_buttons:
+            button.drawn_color = None
 
     def __load_images(self):
         """Loads the images of chess figures
         """
-        # Load pieces and figures as surfaces from image folder.
+        # Pieces and figures from image folder, read and scaled only by the first game view.
         for filename in os.listdir(IMG_PATH):
             image_name = os.path.splitext(filename)[0]
-            self.images[image_name] = pygame.transform.scale(pygame.image.load(IMG_PATH + filename), CHESS_PIECE_SIZE)
+            self.images[image_name] = assets.image(IMG_PATH + filename, CHESS_PIECE_SIZE)
 
     def __create_game_ontext(self):
         """Constructs the game context class used to play the game
         """
-        self.game_context = ChessGameContext()
+        self.game_context = BitboardGameContext() if USE_BITBOARD_CONTEXT else ChessGameContext()
+        if ChessGameView.game_recorder is None:
+            ChessGameView.game_recorder = GameRecorder(GAME_RECORD_PATH)
+        ChessGameView.game_recorder.start_game()
+        self.game_context.recorder = ChessGameView.game_recorder
         self.valid_moves = self.game_context.get_valid_moves()
 
-    def __draw_board(self):
-        """Draws the game board for a game view state
+    def __create_board_surface(self):
+        """Renders the empty board once, squares are repainted from it instead of being drawn again
         """
-        global colors
-        white_color = pygame.Color("white")
-        grey_color = pygame.Color("gray")
-        colors = [white_color, grey_color]
+        self.board_surface = pygame.Surface(BOARD_RECT[2:])
+        self.board_rects = []
         for i in range(8):
+            row_rects = []
             for j in range(8):
-                if (i + j) % 2 == 0:
-                    color = white_color
-                else:
-                    color = grey_color
+                color = LIGHT_SQUARE_COLOR if (i + j) % 2 == 0 else DARK_SQUARE_COLOR
+                pygame.draw.rect(self.board_surface, pygame.Color(color),
+                                 (j * TILE_SIZE[0], i * TILE_SIZE[1], TILE_SIZE[0], TILE_SIZE[1]))
+                row_rects.append(pygame.Rect(j * TILE_SIZE[0] + BORDER_OFFSET[0], i * TILE_SIZE[1] + BORDER_OFFSET[1],
+                                             TILE_SIZE[0], TILE_SIZE[1]))
+            self.board_rects.append(row_rects)
+        self.highlight_surfaces = {}
+        for highlight, color in HIGHLIGHT_COLORS.items():
+            square_surface = pygame.Surface(TILE_SIZE)
+            square_surface.set_alpha(HIGHLIGHT_ALPHA)
+            square_surface.fill(pygame.Color(color))
+            self.highlight_surfaces[highlight] = square_surface
+        self.__invalidate_board()
 
-                board_rect = pygame.Rect(j * TILE_SIZE[0] + BORDER_OFFSET[0], i * TILE_SIZE[1] + BORDER_OFFSET[1],
-                                         TILE_SIZE[0], TILE_SIZE[1])
-
-                self.board_rects.append(board_rect)
-                pygame.draw.rect(self.screen, color, board_rect)
+    def __invalidate_board(self):
+        """Forgets what the squares show, so the next frame repaints all of them
+        """
+        # (piece, highlight) drawn on every square, None when unknown.
+        self.drawn_squares = [[None] * 8 for _ in range(8)]
 
-    def __highlight_squares(self):
+    def __square_highlights(self):
         """For a specific available move - the square for a piece/figure is highlighted
+
+        Returns:
+            dict: (row, column) -> "selected" for the selected piece and "target" for the squares it can move to.
         """
+        highlights = {}
         if self.square_selected != ():
             row, column = self.square_selected
-            if 0 < row < 9 and 0 < column < 9:
+            if 0 <= row < 8 and 0 <= column < 8:
                 if self.game_context.board[row][column][0] == ("w" if self.game_context.white_to_move else "b"):
-                    square_surface = pygame.Surface(TILE_SIZE)
-                    square_surface.set_alpha(100)
-                    square_surface.fill(pygame.Color("blue"))
-                    self.screen.blit(square_surface,
-                                     ((column * TILE_SIZE[0]) + BORDER_OFFSET[0], (row * TILE_SIZE[1]) + BORDER_OFFSET[1]))
-                    square_surface.fill(pygame.Color("yellow"))
+                    highlights[(row, column)] = "selected"
                     for move in self.valid_moves:
                         if move.start_row == row and move.start_column == column:
-                            self.screen.blit(square_surface,
-                                             ((move.end_column * TILE_SIZE[0]) + BORDER_OFFSET[0],
-                                              (move.end_row * TILE_SIZE[1]) + BORDER_OFFSET[1]))
+                            highlights[(move.end_row, move.end_column)] = "target"
+        return highlights
+
+    def __draw_board(self):
+        """Repaints the squares whose piece or highlight changed since they were last drawn
+        """
+        highlights = self.__square_highlights()
+        board = self.game_context.board
+        for i in range(8):
+            drawn_row = self.drawn_squares[i]
+            for j in range(8):
+                square = (board[i][j], highlights.get((i, j)))
+                if drawn_row[j] != square:
+                    self.__draw_square(i, j, *square)
+                    drawn_row[j] = square
+
+    def __draw_square(self, row, column, piece, highlight):
+        """Paints one square with its highlight and piece
+
+        Args:
+            row (int): row of the square.
+            column (int): column of the square.
+            piece (str): piece on the square, "__" for none.
+            highlight (str): key of HIGHLIGHT_COLORS or None.
+        """
+        rect = self.board_rects[row][column]
+        self.screen.blit(self.board_surface, rect, rect.move(-BORDER_OFFSET[0], -BORDER_OFFSET[1]))
+        if highlight is not None:
+            self.screen.blit(self.highlight_surfaces[highlight], rect)
+        if piece != "__":
+            self.screen.blit(self.images[piece], rect)
+        self.mark_dirty(rect)
 
     def animate_move(self, move):
         """Performs the animation for a given move
+
+        The board without the moving piece is rendered once, every frame only repaints the area the piece
+        left and the area it moved to.
         """
-        global colors
+        still_surface = self.board_surface.copy()
+        for i in range(8):
+            for j in range(8):
+                piece = self.game_context.board[i][j]
+                if (i, j) == (move.end_row, move.end_column):
+                    piece = move.piece_captured
+                if piece != "__":
+                    still_surface.blit(self.images[piece], self.board_rects[i][j].move(-BORDER_OFFSET[0],
+                                                                                       -BORDER_OFFSET[1]))
         delta_row = move.end_row - move.start_row
         delta_column = move.end_column - move.start_column
         frames_per_square = 10
         frame_count = (abs(delta_row) + abs(delta_column)) * frames_per_square
+        clock = pygame.time.Clock()
+        # The first frame shows the whole still board.
+        previous_rect = pygame.Rect(BOARD_RECT)
         for frame in range(frame_count + 1):
             row, column = (
                 (move.start_row + delta_row * frame / frame_count,
                  move.start_column + delta_column * frame / frame_count))
-            self.__draw_board()
-            self.__draw_pieces()
-            color = colors[(move.end_row + move.end_column) % 2]
-            end_square = pygame.Rect(move.end_column * TILE_SIZE[0] + + BORDER_OFFSET[0],
-                                     move.end_row * TILE_SIZE[1] + + BORDER_OFFSET[1], TILE_SIZE[0], TILE_SIZE[1])
-            pygame.draw.rect(self.screen, color, end_square)
-            if move.piece_captured != "__":
-                self.screen.blit(self.images[move.piece_captured], end_square)
-            self.screen.blit(self.images[move.piece_moved], pygame.Rect(column * TILE_SIZE[0] + + BORDER_OFFSET[0],
-                                                                        row * TILE_SIZE[1] + + BORDER_OFFSET[1],
-                                                                        TILE_SIZE[0], TILE_SIZE[1]))
-            pygame.display.flip()
-            pygame.time.Clock().tick(60)
+            piece_rect = pygame.Rect(column * TILE_SIZE[0] + BORDER_OFFSET[0], row * TILE_SIZE[1] + BORDER_OFFSET[1],
+                                     TILE_SIZE[0], TILE_SIZE[1])
+            self.screen.blit(still_surface, previous_rect, previous_rect.move(-BORDER_OFFSET[0], -BORDER_OFFSET[1]))
+            self.screen.blit(self.images[move.piece_moved], piece_rect)
+            pygame.display.update([previous_rect, piece_rect])
+            previous_rect = piece_rect
+            clock.tick(60)
+        # The animation painted over the squares behind their drawn state.
+        self.__invalidate_board()
 
     def draw_text(self, text):
         """Draws a text on a screen
 
         Args:
-            text (_type_): _description_
+            text (str): text drawn in the top left corner, drawing the same text again does nothing.
         """
-        font = pygame.font.SysFont("Helvitica", 32, True, False)
-        text_obj = font.render(text, False, pygame.Color("Black"))
-        text_location = pygame.Rect(0, 0, 1024, 1080)
-        self.screen.blit(text_obj, text_location)
+        if text == self.drawn_text:
+            return
+        if self.text_rect is not None:
+            self.screen.blit(self.background, self.text_rect, self.text_rect)
+            self.mark_dirty(self.text_rect)
+        text_obj = self.text_font.render(text, False, pygame.Color("Black"))
+        self.text_rect = self.screen.blit(text_obj, (0, 0))
+        self.mark_dirty(self.text_rect)
+        self.drawn_text = text
 
-    def __draw_pieces(self):
-        """Drawing pieces and figures on a board
+    def __draw_search_status(self):
+        """Draws the progress of the AI search below the board, or clears it when the AI is not thinking
         """
-        for i in range(8):
-            for j in range(8):
-                piece = self.game_context.board[i][j]
-                if piece != "__":
-                    rect = pygame.Rect(j * TILE_SIZE[0] + BORDER_OFFSET[0], i * TILE_SIZE[1] + BORDER_OFFSET[1],
-                                       CHESS_PIECE_SIZE[0], CHESS_PIECE_SIZE[1])
-                    self.screen.blit(self.images[piece], rect)
+        if self.search_status == self.drawn_search_status:
+            return
+        self.drawn_search_status = self.search_status
+        status_rect = pygame.Rect(SEARCH_STATUS_RECT)
+        self.mark_dirty(status_rect)
+        self.screen.blit(self.background, status_rect, status_rect)
+        if self.search_status:
+            text_obj = self.status_font.render(self.search_status, True, pygame.Color("Black"))
+            # Clipped to the status area, which is all that is cleared on the next frame.
+            self.screen.blit(text_obj, status_rect, pygame.Rect((0, 0), status_rect.size))
 
     def __calculate_rect_positions(self):
         """Populates grid variables for buttons regarding their positions
@@ -176,6 +265,7 @@ class ChessGameView(Window):
         """
         self.background_colour = DEFAULT_BACKGROUND_COLOR
         self.screen.fill(self.background_colour)
+        self.mark_all_dirty()
 
     def draw_view(self):
         """Draws the whole view consisting on background, buttons etc.
@@ -183,8 +273,8 @@ class ChessGameView(Window):
         if not self.limited_draws:
             self.__set_background()
         self.__draw_board()
-        self.__highlight_squares()
-        self.__draw_pieces()
+        self.__draw_search_status()
         self.__check_button_mouse_collision()
         for button in self.window_buttons:
-            button.draw_button()
+            if button.draw_button():
+                self.mark_dirty(button.rect)
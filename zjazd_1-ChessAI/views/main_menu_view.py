@@ -1,6 +1,7 @@
 from utilities.button import Button, SMALL_BUTTON_SIZE, LARGE_BUTTON_SIZE, ON_BUTTON_COLLISION_COLOR, DEFAULT_BUTTON_COLOR
 from utilities.event import EventHandler
 from views.window import *
+from utilities.asset_manager import assets
 import pygame
 
 BACKGROUND_PATH = "images/"
@@ -20,9 +21,12 @@ class MainMenuView(Window):
     def __set_background(self):
         """Loads the image to backgrounds and blits the screen to show it
         """
-        background = pygame.image.load(BACKGROUND_PATH + "menu_background.jpg")
+        background = assets.image(BACKGROUND_PATH + "menu_background.jpg", alpha=False)
         self.screen.blit(background, (0, 0))
         self.limited_draws = True
+        self.mark_all_dirty()
+        for button in self.window_buttons:
+            button.drawn_color = None
 
     def __calculate_rect_positions(self):
         """Populates grid variables for buttons regarding their positions
@@ -80,13 +84,15 @@ class MainMenuView(Window):
         """
         self.__check_button_mouse_collision()
         for button in self.window_buttons:
-            button.draw_button()
+            if button.draw_button():
+                self.mark_dirty(button.rect)
 
     def reset_view(self):
         """Resets the whole view to the default background color
         """
         self.background_colour = DEFAULT_BACKGROUND_COLOR
         self.screen.fill(self.background_colour)
+        self.mark_all_dirty()
 
     def draw_view(self):
         """Draws the whole view consisting on background, buttons etc.
@@ -1,15 +1,29 @@
+import logging
+import time
 import pygame
 from views.main_menu_view import MainMenuView
-from views.chess_game_view import ChessGameView
+from views.chess_game_view import ChessGameView, preload_assets
 from utilities.event import EventHandler
+from utilities.asset_manager import assets
+
+LOGGER_NAME = "chess_ai.views"
+
+logger = logging.getLogger(LOGGER_NAME)
 
 
 class ViewHandler:
     """Class for view switching during the game.
     """
-    def __init__(self):
+    def __init__(self, start_time=None):
         """Constructor
+
+        Args:
+            start_time (float, optional): time.perf_counter() at the start of the game, the startup time is
+                reported from it. Defaults to None, the creation of the handler.
         """
+        # Set when a view is created, its first frame reports the time it took.
+        self.switch_start_time = time.perf_counter() if start_time is None else start_time
+        self.switch_event = "startup"
         self.current_view = self.create_main_menu_view()
         self.current_view_index = 0
 
@@ -32,6 +46,8 @@ class ViewHandler:
         """Draw the current view stacked in EventHandler
         """
         if self.current_view_index != EventHandler.view_code:
+            self.switch_start_time = time.perf_counter()
+            self.switch_event = "view switch"
             if EventHandler.view_code == 0:  # main menu
                 self.current_view = self.create_main_menu_view()
             if EventHandler.view_code == 1: #dense gampeplay
@@ -40,5 +56,16 @@ class ViewHandler:
             self.current_view.reset_view()
 
         self.current_view.draw_view()
-        pygame.display.update()
+
+    def update_display(self):
+        """Shows the areas of the screen the current view changed during the frame, once per frame
+        """
+        pygame.display.update(self.current_view.take_dirty_rects())
+        if self.switch_start_time is not None:
+            logger.info("%s to view %d: %.3f s (images loaded so far in %.3f s)", self.switch_event,
+                        self.current_view_index, time.perf_counter() - self.switch_start_time, assets.load_seconds)
+            if self.switch_event == "startup":
+                # The game view images are read while the first view is shown.
+                preload_assets()
+            self.switch_start_time = None
 
@@ -14,9 +14,32 @@ class Window:
         """Constructor
         """
         self.window_buttons = []
+        self.dirty_rects = []
         self.screen = pygame.display.set_mode(WINDOW_SIZE, WINDOW_MODE_FLAGS)
         self.background_colour = DEFAULT_BACKGROUND_COLOR
         self.screen.fill(self.background_colour)
         pygame.display.set_caption("ChessAI")
         pygame.display.flip()
 
+    def mark_dirty(self, rect):
+        """Adds an area of the screen to the next display update
+
+        Args:
+            rect (pygame.Rect): changed area of the screen.
+        """
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def mark_all_dirty(self):
+        """Makes the next display update show the whole screen
+        """
+        self.dirty_rects = [self.screen.get_rect()]
+
+    def take_dirty_rects(self):
+        """Returns the areas changed since the last call and forgets them
+
+        Returns:
+            list: pygame.Rect of every changed area.
+        """
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects